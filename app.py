@@ -1,9 +1,9 @@
-from flask import Flask, request, jsonify, render_template_string
-import subprocess
-import threading
+from flask import Flask, Response, request, jsonify, render_template_string
+import atexit
 import os
 import signal
 import sys
+import time
 
 app = Flask(__name__)
 
@@ -13,10 +13,121 @@ def after_request(response):
     response.headers.add('Access-Control-Allow-Origin', '*')
     response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization')
     response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
+    response.headers.add('Access-Control-Expose-Headers', 'X-Target-Height')
     return response
 
-# Global variable to track running processes
-running_processes = {}
+def load_job_manager():
+    """Job records live on disk so every worker process sees the same jobs"""
+    from src.config import Config
+    from src.job_registry import JobRegistry
+    from src.jobs import JobManager
+    return JobManager(JobRegistry(Config.JOBS_DIR),
+                      max_jobs=Config.MAX_JOBS,
+                      threads_per_job=Config.JOB_THREADS,
+                      stop_timeout=Config.JOB_STOP_TIMEOUT,
+                      output_events=Config.JOB_OUTPUT_EVENTS)
+
+
+# Detection subprocesses, capped and visible across all workers on this host
+job_manager = load_job_manager()
+atexit.register(job_manager.shutdown)
+
+
+def load_detector():
+    """Load the fire detector once at process start so requests only pay for inference"""
+    try:
+        from src.config import Config
+        from src.fire_detector import Detector
+        from src.batching import MicroBatcher
+        detector = Detector(Config.MODEL_PATH,
+                            backend=Config.INFERENCE_BACKEND,
+                            threads=Config.INFERENCE_THREADS)
+        batcher = MicroBatcher(
+            detector.detect_batch,
+            max_batch_size=Config.BATCH_MAX_SIZE,
+            max_wait_ms=Config.BATCH_MAX_WAIT_MS
+        ).start()
+        return detector, batcher
+    except Exception as e:
+        print(f"Detector unavailable, /detect-frame disabled: {str(e)}")
+        return None, None
+
+
+# Shared detector instance used by every request; concurrent frames are
+# grouped by the batcher into a single forward pass
+detector, batcher = load_detector()
+
+
+def load_stream_hub():
+    """Share the resident detector with live MJPEG streams"""
+    if detector is None:
+        return None
+    from src.config import Config
+    from src.streaming import StreamHub
+    return StreamHub(batcher, detector.annotate,
+                     qualities=Config.MJPEG_QUALITY_LEVELS,
+                     idle_timeout=Config.MJPEG_IDLE_TIMEOUT)
+
+
+# Live annotated streams; each source is captured, detected and encoded
+# once no matter how many browsers watch it
+stream_hub = load_stream_hub()
+
+
+def camera_in_use():
+    """Whether a YOLO process or a live stream currently holds the camera"""
+    if job_manager.running():
+        return True
+    return stream_hub is not None and stream_hub.is_streaming(0)
+
+
+def load_health_monitor():
+    """Start background health checks so /health never touches hardware"""
+    from src.config import Config
+    from src.health import HealthMonitor
+    return HealthMonitor(Config.MODEL_PATH, detector, batcher,
+                         interval=Config.HEALTH_INTERVAL,
+                         camera_interval=Config.HEALTH_CAMERA_INTERVAL,
+                         camera_busy=camera_in_use).start()
+
+
+health_monitor = load_health_monitor()
+
+
+def load_metrics_store():
+    """Under gunicorn, share metrics between workers so any of them answers a scrape for all"""
+    from src.config import Config
+    if not Config.METRICS_DIR:
+        return None
+    from src.metrics import SharedMetrics
+    return SharedMetrics(Config.METRICS_DIR).start()
+
+
+metrics_store = load_metrics_store()
+
+
+def start_background_services():
+    """Start the threads behind the shared detector (again in each forked worker)"""
+    # Counts recorded while the master loaded the app belong to no worker
+    from src.metrics import REGISTRY
+    REGISTRY.reset()
+    if metrics_store is not None:
+        metrics_store.start()
+    if batcher is not None:
+        batcher.start()
+    health_monitor.start()
+
+
+def stop_background_services():
+    """Stop those threads; they do not survive fork(), see gunicorn.conf.py"""
+    if batcher is not None:
+        batcher.stop(timeout=5)
+    if stream_hub is not None:
+        stream_hub.stop()
+    health_monitor.stop()
+    if metrics_store is not None:
+        # The master serves no requests; only workers report metrics
+        metrics_store.stop(discard=True)
 
 @app.route('/')
 def index():
@@ -26,36 +137,11 @@ def index():
 
 @app.route('/health', methods=['GET'])
 def health_check():
-    """Health check endpoint to verify backend is running"""
+    """Health check endpoint serving the monitor's cached state"""
     try:
-        # Check if YOLO model file exists
-        model_path = 'models/best_nano_111.pt'
-        model_exists = os.path.exists(model_path)
-        
-        # Check if camera is accessible (basic check)
-        camera_available = True
-        try:
-            import cv2
-            cap = cv2.VideoCapture(0)
-            if cap.isOpened():
-                ret, frame = cap.read()
-                camera_available = ret is not None
-                cap.release()
-            else:
-                camera_available = False
-        except Exception:
-            camera_available = False
-        
-        status = {
-            'status': 'healthy',
-            'backend': 'running',
-            'model_available': model_exists,
-            'camera_accessible': camera_available,
-            'timestamp': os.times()._asdict() if hasattr(os.times(), '_asdict') else 'unavailable'
-        }
-        
-        return jsonify(status), 200
-        
+        status = health_monitor.snapshot()
+        return jsonify(status), 503 if status['status'] == 'unhealthy' else 200
+
     except Exception as e:
         return jsonify({
             'status': 'unhealthy',
@@ -63,101 +149,351 @@ def health_check():
             'backend': 'running_with_issues'
         }), 500
 
+def yolo_command(data):
+    """
+    Validate a detection request and build its yolo command line.
+
+    Returns:
+        tuple: (command, None) or (None, error response)
+    """
+    model = data.get('model', 'models/best_nano_111.pt')
+    source = data.get('source', 0)
+    conf = data.get('conf', 0.35)
+    iou = data.get('iou', 0.1)
+    show = data.get('show', True)
+
+    # Check if model file exists
+    if not os.path.exists(model):
+        return None, (jsonify({
+            'status': 'error',
+            'message': f'Model file not found: {model}. Please ensure the YOLO model is available.'
+        }), 404)
+
+    # Camera state comes from the health monitor's last probe, so
+    # starting YOLO never waits on the device
+    camera = health_monitor.snapshot().get('camera')
+    if camera == 'unavailable':
+        return None, (jsonify({
+            'status': 'error',
+            'message': 'Camera not accessible. Please check if camera is connected and not in use by another application.'
+        }), 503)
+    if camera == 'no_frames':
+        return None, (jsonify({
+            'status': 'error',
+            'message': 'Camera detected but unable to capture frames. Please check camera permissions.'
+        }), 503)
+
+    # Build the YOLO command
+    return [
+        'yolo', 'detect', 'predict',
+        f'model={model}',
+        f'source={source}',
+        f'conf={conf}',
+        f'iou={iou}',
+        f'show={show}'
+    ], None
+
+def start_job(data):
+    """Start a yolo job from request data, returning (job, error response)"""
+    command, error = yolo_command(data)
+    if error is not None:
+        return None, error
+
+    from src.jobs import JobLimitError
+    try:
+        return job_manager.start(command, kind='yolo', source=data.get('source', 0)), None
+    except JobLimitError as e:
+        return None, (jsonify({
+            'status': 'error',
+            'message': f'Too many detection jobs running ({str(e)}). Stop one and try again.'
+        }), 429)
+
 @app.route('/run-yolo', methods=['POST'])
 def run_yolo():
     try:
-        data = request.json
-        model = data.get('model', 'models/best_nano_111.pt')
-        source = data.get('source', 0)
-        conf = data.get('conf', 0.35)
-        iou = data.get('iou', 0.1)
-        show = data.get('show', True)
+        job, error = start_job(request.json or {})
+        if error is not None:
+            return error
+
+        return jsonify({
+            'status': 'success',
+            'job_id': job['name'],
+            'message': 'YOLO detection started successfully! Check your camera window.'
+        })
         
-        # Check if model file exists
-        if not os.path.exists(model):
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': f'Failed to start YOLO detection: {str(e)}'
+        }), 500
+
+@app.route('/jobs', methods=['GET'])
+def list_jobs():
+    """Running and recently finished detection jobs of every worker"""
+    status = request.args.get('status')
+    return jsonify({
+        'status': 'success',
+        'jobs': job_manager.jobs(status),
+        'max_jobs': job_manager.max_jobs,
+        'threads_per_job': job_manager.threads_per_job
+    })
+
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    """Start a detection job; takes the same JSON body as /run-yolo"""
+    try:
+        job, error = start_job(request.json or {})
+        if error is not None:
+            return error
+        return jsonify({'status': 'success', 'job': job}), 202
+
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': f'Failed to start detection job: {str(e)}'
+        }), 500
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    try:
+        job = job_manager.get(job_id)
+    except ValueError:
+        job = None
+    if job is None:
+        return jsonify({
+            'status': 'error',
+            'message': f'Unknown job: {job_id}'
+        }), 404
+    output = job_manager.output(job_id)
+    return jsonify({
+        'status': 'success',
+        'job': job,
+        'output': output.stats() if output is not None else None
+    })
+
+@app.route('/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """Output lines and per-frame results of a job as Server-Sent Events"""
+    try:
+        job = job_manager.get(job_id)
+    except ValueError:
+        job = None
+    if job is None:
+        return jsonify({
+            'status': 'error',
+            'message': f'Unknown job: {job_id}'
+        }), 404
+
+    output = job_manager.output(job_id)
+    if output is None:
+        # Output is held in memory by the worker that started the job
+        return jsonify({
+            'status': 'error',
+            'message': f'Output of job {job_id} is not available from this worker.'
+        }), 409
+
+    # Reconnecting EventSource clients send the last id they received
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id', '0')
+    try:
+        after = int(last_event_id)
+    except ValueError:
+        after = 0
+
+    from src.job_output import CONTENT_TYPE
+    return Response(output.events(after), mimetype=CONTENT_TYPE, headers={
+        'Cache-Control': 'no-cache, no-store',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/jobs/<job_id>', methods=['DELETE'])
+def stop_job(job_id):
+    """Stop a job gracefully (SIGTERM, then SIGKILL after JOB_STOP_TIMEOUT)"""
+    try:
+        job = job_manager.stop(job_id)
+    except ValueError:
+        job = None
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': f'Failed to stop job {job_id}: {str(e)}'
+        }), 500
+    if job is None:
+        return jsonify({
+            'status': 'error',
+            'message': f'Unknown job: {job_id}'
+        }), 404
+    return jsonify({'status': 'success', 'job': job})
+
+@app.route('/model-info', methods=['GET'])
+def model_info():
+    """Describe the resident detection model"""
+    if detector is None:
+        return jsonify({
+            'status': 'error',
+            'message': 'Detection model is not loaded on the server.'
+        }), 503
+
+    return jsonify({
+        'status': 'success',
+        'backend': type(detector.model).__name__,
+        'classes': {int(k): v for k, v in detector.names.items()},
+        'target_height': detector.target_height,
+        'min_confidence': detector.min_confidence,
+        'smoke_confidence': detector.smoke_confidence,
+        'iou_threshold': detector.iou_threshold,
+        'batching': batcher.stats()
+    })
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus scrape endpoint for hot-path latency and counters"""
+    try:
+        from src.metrics import CONTENT_TYPE, REGISTRY
+
+        if batcher is not None:
+            stats = batcher.stats()
+            REGISTRY.gauge('fire_detector_batch_queue_depth',
+                           'Frames waiting for the micro-batcher').set(stats['queue_depth'])
+            REGISTRY.gauge('fire_detector_batch_mean_size',
+                           'Mean number of frames per forward pass').set(stats['mean_batch_size'])
+        if stream_hub is not None:
+            REGISTRY.gauge('fire_detector_stream_viewers',
+                           'Browsers watching MJPEG streams').set(stream_hub.viewers())
+
+        # Totals of every worker when running under gunicorn
+        body = metrics_store.render() if metrics_store is not None else REGISTRY.render()
+        return body, 200, {'Content-Type': CONTENT_TYPE}
+
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': f'Failed to collect metrics: {str(e)}'
+        }), 500
+
+# Content types accepted as a raw /detect-frame request body
+RAW_FRAME_TYPES = ('image/jpeg', 'image/webp', 'image/png', 'application/octet-stream')
+
+@app.route('/detect-frame', methods=['POST'])
+def detect_frame():
+    """Run the resident detector on a single uploaded frame (multipart or raw bytes)"""
+    if detector is None:
+        return jsonify({
+            'status': 'error',
+            'message': 'Detection model is not loaded on the server.'
+        }), 503
+
+    try:
+        import cv2
+        import numpy as np
+
+        if request.mimetype in RAW_FRAME_TYPES:
+            # Raw image bytes in the body skip multipart parsing entirely
+            data = request.get_data(cache=False)
+        else:
+            upload = request.files.get('frame')
+            data = upload.read() if upload is not None else b''
+        if not data:
             return jsonify({
                 'status': 'error',
-                'message': f'Model file not found: {model}. Please ensure the YOLO model is available.'
-            }), 404
-        
-        # Check if camera is accessible before starting YOLO
-        try:
-            import cv2
-            cap = cv2.VideoCapture(source if isinstance(source, int) else 0)
-            if not cap.isOpened():
-                cap.release()
-                return jsonify({
-                    'status': 'error',
-                    'message': 'Camera not accessible. Please check if camera is connected and not in use by another application.'
-                }), 503
-            
-            # Test camera read
-            ret, frame = cap.read()
-            cap.release()
-            
-            if not ret:
-                return jsonify({
-                    'status': 'error',
-                    'message': 'Camera detected but unable to capture frames. Please check camera permissions.'
-                }), 503
-                
-        except Exception as cam_error:
+                'message': "No frame uploaded. Send the image as multipart field 'frame' "
+                           "or as a raw image/jpeg or image/webp request body."
+            }), 400
+
+        from src.metrics import STAGE_SECONDS
+        with STAGE_SECONDS.time(stage='decode'):
+            buffer = np.frombuffer(data, dtype=np.uint8)
+            frame = cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+        if frame is None:
             return jsonify({
                 'status': 'error',
-                'message': f'Camera error: {str(cam_error)}'
-            }), 503
-        
-        # Build the YOLO command
-        cmd = [
-            'yolo', 'detect', 'predict',
-            f'model={model}',
-            f'source={source}',
-            f'conf={conf}',
-            f'iou={iou}',
-            f'show={show}'
-        ]
-        
-        # Start the process in a separate thread
-        def run_command():
-            try:
-                process = subprocess.Popen(
-                    cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True
-                )
-                running_processes['yolo'] = process
-                stdout, stderr = process.communicate()
-                
-                if process.returncode == 0:
-                    print(f"YOLO completed successfully: {stdout}")
-                else:
-                    print(f"YOLO failed: {stderr}")
-            except Exception as e:
-                print(f"Error running YOLO: {str(e)}")
-        
-        thread = threading.Thread(target=run_command)
-        thread.daemon = True
-        thread.start()
-        
+                'message': 'Uploaded frame could not be decoded as an image.'
+            }), 400
+
+        start = time.perf_counter()
+        boxes, class_ids, confidences, detection = batcher(frame)
+        inference_ms = (time.perf_counter() - start) * 1000
+
         return jsonify({
             'status': 'success',
-            'message': 'YOLO detection started successfully! Check your camera window.'
-        })
-        
+            'detection': detection,
+            'detections': [
+                {
+                    'box': [round(float(v), 1) for v in box],
+                    'class_name': detector.names[int(class_id)],
+                    'confidence': round(float(confidence), 4)
+                }
+                for box, class_id, confidence in zip(boxes, class_ids, confidences)
+            ],
+            'image_size': [int(frame.shape[1]), int(frame.shape[0])],
+            # Clients downscale frames to this height before uploading
+            'target_height': detector.target_height,
+            'inference_ms': round(inference_ms, 2)
+        }), 200, {'X-Target-Height': str(detector.target_height)}
+
     except Exception as e:
         return jsonify({
             'status': 'error',
-            'message': f'Failed to start YOLO detection: {str(e)}'
+            'message': f'Failed to process frame: {str(e)}'
         }), 500
 
+@app.route('/stream', methods=['GET'])
+def stream():
+    """Annotated MJPEG stream of a camera, usable directly as an <img> src"""
+    if stream_hub is None:
+        return jsonify({
+            'status': 'error',
+            'message': 'Detection model is not loaded on the server.'
+        }), 503
+
+    from src.config import Config
+    from src.streaming import CONTENT_TYPE
+
+    source = request.args.get('source', '0')
+    if source.isdigit():
+        source = int(source)
+    elif source not in [str(s) for s in Config.VIDEO_SOURCES]:
+        # Only cameras and configured sources, not arbitrary paths or URLs
+        return jsonify({
+            'status': 'error',
+            'message': f'Unknown video source: {source}'
+        }), 400
+
+    try:
+        body = stream_hub.open(source)
+    except IOError:
+        return jsonify({
+            'status': 'error',
+            'message': 'Camera not accessible. Please check if camera is connected and not in use by another application.'
+        }), 503
+
+    return Response(body, mimetype=CONTENT_TYPE, headers={
+        'Cache-Control': 'no-cache, no-store',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/stream-info', methods=['GET'])
+def stream_info():
+    """Viewers and frame counts of the live streams"""
+    if stream_hub is None:
+        return jsonify({
+            'status': 'error',
+            'message': 'Detection model is not loaded on the server.'
+        }), 503
+    return jsonify({'status': 'success', 'streams': stream_hub.stats()})
+
 @app.route('/stop-yolo', methods=['POST'])
 def stop_yolo():
     try:
-        if 'yolo' in running_processes:
-            process = running_processes['yolo']
-            process.terminate()
-            del running_processes['yolo']
+        # Stop the given job, or every running one; jobs may belong to
+        # other workers
+        job_id = (request.get_json(silent=True) or {}).get('job_id')
+        if job_id and not isinstance(job_id, str):
+            raise ValueError(f"Invalid job name: {job_id!r}")
+        job_ids = [job_id] if job_id else [job['name'] for job in job_manager.running()]
+        stopped = [job for job in map(job_manager.stop, job_ids) if job is not None]
+        if job_id and not stopped:
+            raise ValueError(f"Unknown job: {job_id}")
+        if stopped:
             return jsonify({
                 'status': 'success',
                 'message': 'YOLO detection stopped successfully!'
@@ -167,6 +503,12 @@ def stop_yolo():
                 'status': 'info',
                 'message': 'No YOLO process is currently running.'
             })
+    except ValueError:
+        # Unknown job ids and ones that are not valid registry names
+        return jsonify({
+            'status': 'error',
+            'message': f'Unknown job: {job_id}'
+        }), 404
     except Exception as e:
         return jsonify({
             'status': 'error',
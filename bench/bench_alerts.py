@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark alert fan-out through NotificationService.
+
+Starts a local mock webhook receiver, subscribes N webhook sinks to it and
+pushes alerts through the service, then reports delivery throughput and
+end-to-end latency (alert raised -> received) as JSON. No outside service
+is contacted.
+
+Usage:
+    python bench/bench_alerts.py --subscribers 50 --alerts 200 --delay-ms 20
+"""
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'src'))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from notification_service import NotificationService  # noqa: E402
+from tests.mock_receiver import MockReceiver  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark alert fan-out to many subscribers")
+    parser.add_argument('--subscribers', type=int, default=20, help="Webhook sinks per alert")
+    parser.add_argument('--alerts', type=int, default=100)
+    parser.add_argument('--rate', type=float, default=0.0,
+                        help="Alerts per second to submit, 0 for as fast as possible")
+    parser.add_argument('--workers', type=int, default=8, help="Alert worker threads")
+    parser.add_argument('--queue-size', type=int, default=0,
+                        help="Max pending alerts, 0 to accept all")
+    parser.add_argument('--retries', type=int, default=2)
+    parser.add_argument('--delay-ms', type=float, default=0.0, help="Receiver delay per request")
+    parser.add_argument('--failure-rate', type=float, default=0.0,
+                        help="Fraction of receiver responses that fail with HTTP 503")
+    parser.add_argument('--output', type=Path, help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    # Failed deliveries are counted in the report rather than logged
+    logging.basicConfig(level=logging.CRITICAL)
+    frame = np.random.default_rng(0).integers(0, 256, (480, 640, 3), dtype=np.uint8)
+
+    with MockReceiver(delay_ms=args.delay_ms, failure_rate=args.failure_rate) as receiver, \
+            tempfile.TemporaryDirectory() as output_dir:
+        config = SimpleNamespace(
+            DETECTED_FIRES_DIR=Path(output_dir),
+            ALERT_WEBHOOKS=[f'{receiver.url}/subscriber/{i}' for i in range(args.subscribers)],
+            ALERT_LOG_FILE='',
+            ALERT_WORKERS=args.workers,
+            ALERT_QUEUE_SIZE=args.queue_size or args.alerts,
+            ALERT_RETRIES=args.retries,
+            ALERT_RETRY_BACKOFF=0.05,
+            ALERT_TIMEOUT=10,
+        )
+        service = NotificationService(config)
+
+        start = time.perf_counter()
+        for i in range(args.alerts):
+            service.submit_alert(frame, 'Fire', prefix='bench')
+            if args.rate:
+                time.sleep(max(0.0, start + (i + 1) / args.rate - time.perf_counter()))
+        submit_seconds = time.perf_counter() - start
+
+        service.cleanup(timeout=600)
+        elapsed = time.perf_counter() - start
+        stats = service.stats()
+        records = receiver.received()
+
+    latencies = np.array([(record['received_at'] - record['payload']['timestamp']) * 1000
+                          for record in records if record['payload']])
+    sink_counts = stats.pop('sinks')
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'subscribers': args.subscribers,
+        'alerts': args.alerts,
+        'workers': args.workers,
+        'receiver_delay_ms': args.delay_ms,
+        'receiver_failure_rate': args.failure_rate,
+        'submit_seconds': submit_seconds,
+        'elapsed_seconds': elapsed,
+        'deliveries': len(records),
+        'deliveries_per_second': len(records) / elapsed if elapsed else None,
+        'receiver_failures': receiver.failures,
+        'service': stats,
+        'sink_failures': sum(counts['failed'] for counts in sink_counts.values()),
+        'latency_ms': {
+            'mean': float(latencies.mean()),
+            'p50': float(np.percentile(latencies, 50)),
+            'p90': float(np.percentile(latencies, 90)),
+            'p99': float(np.percentile(latencies, 99)),
+            'max': float(latencies.max()),
+        } if len(latencies) else None,
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text)
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
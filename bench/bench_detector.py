@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Benchmark the detection hot path.
+
+Times the Detector stages (resize_frame, detect, annotate, draw_detection,
+_add_frame_info and process_frame) on the images in data/ and on synthetic
+frames at several resolutions and detection counts, and writes per-stage
+latency percentiles, FPS and peak RSS as JSON.
+
+Usage:
+    python bench/bench_detector.py --output bench.json
+    python bench/bench_detector.py --baseline bench.json --tolerance 0.15
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'src'))
+
+from config import Config  # noqa: E402
+from fire_detector import Detections, Detector  # noqa: E402
+
+IMAGE_SUFFIXES = ('.jpg', '.jpeg', '.png', '.bmp', '.webp')
+PERCENTILES = (50, 90, 99)
+
+
+def time_stage(fn: Callable[[], object], iterations: int, warmup: int) -> Dict[str, float]:
+    """
+    Time repeated calls of fn.
+
+    Returns:
+        dict: Mean, min, max and percentile latencies in milliseconds plus FPS
+    """
+    for _ in range(warmup):
+        fn()
+
+    samples = np.empty(iterations)
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples[i] = (time.perf_counter() - start) * 1000
+
+    stats = {
+        'mean_ms': float(samples.mean()),
+        'min_ms': float(samples.min()),
+        'max_ms': float(samples.max()),
+    }
+    for p, value in zip(PERCENTILES, np.percentile(samples, PERCENTILES)):
+        stats[f'p{p}_ms'] = float(value)
+    stats['fps'] = 1000 / stats['mean_ms'] if stats['mean_ms'] > 0 else None
+    return stats
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MiB, None where unsupported"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB on Linux
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+
+def synthetic_frame(width: int, height: int, seed: int = 0) -> np.ndarray:
+    """Noise frame so codecs and resizers cannot take shortcuts on flat input"""
+    return np.random.default_rng(seed).integers(0, 256, (height, width, 3), dtype=np.uint8)
+
+
+def synthetic_detections(width: int, height: int, count: int, seed: int = 0) -> Detections:
+    """Random fire/smoke boxes in frame coordinates, sorted by confidence"""
+    rng = np.random.default_rng(seed)
+    x1 = rng.uniform(0, width * 0.8, count)
+    y1 = rng.uniform(0, height * 0.8, count)
+    w = rng.uniform(0.05, 0.2, count) * width
+    h = rng.uniform(0.05, 0.2, count) * height
+    boxes = np.stack([x1, y1, x1 + w, y1 + h], axis=1).astype(np.float32).reshape(-1, 4)
+    confidences = np.sort(rng.uniform(0.5, 1.0, count))[::-1].astype(np.float32)
+    class_ids = rng.integers(0, 2, count)
+    return Detections(boxes, class_ids, confidences, "Fire" if count else None)
+
+
+def bench_frame(
+    detector: Detector,
+    frame: np.ndarray,
+    detection_counts: List[int],
+    iterations: int,
+    warmup: int
+) -> Dict[str, object]:
+    """Benchmark every stage on one frame"""
+    height, width = frame.shape[:2]
+    resized = detector.resize_frame(frame)
+    scratch = resized.copy()
+
+    stages = {
+        'resize_frame': time_stage(lambda: detector.resize_frame(frame), iterations, warmup),
+        'detect': time_stage(lambda: detector.detect(frame), iterations, warmup),
+        'process_frame': time_stage(lambda: detector.process_frame(frame), iterations, warmup),
+        '_add_frame_info': time_stage(
+            lambda: detector._add_frame_info(scratch, "Fire"), iterations, warmup),
+    }
+
+    single = synthetic_detections(resized.shape[1], resized.shape[0], 1)
+    box = single.boxes[0].astype(int)
+    stages['draw_detection'] = time_stage(
+        lambda: detector.draw_detection(scratch, box, detector.names[int(single.class_ids[0])],
+                                        float(single.confidences[0])),
+        iterations, warmup)
+
+    for count in detection_counts:
+        detections = synthetic_detections(width, height, count, seed=count)
+        stages[f'annotate_{count}'] = time_stage(
+            lambda: detector.annotate(frame, detections), iterations, warmup)
+
+    return {'width': width, 'height': height, 'stages': stages}
+
+
+def compare(report: Dict[str, object], baseline: Dict[str, object], tolerance: float) -> List[str]:
+    """
+    Find stages whose median latency regressed against a baseline report.
+
+    Returns:
+        list: One message per regression, empty when none
+    """
+    regressions = []
+    previous = {case['name']: case['stages'] for case in baseline.get('cases', [])}
+    for case in report['cases']:
+        for stage, stats in case['stages'].items():
+            before = previous.get(case['name'], {}).get(stage)
+            if not before or before['p50_ms'] <= 0:
+                continue
+            change = stats['p50_ms'] / before['p50_ms'] - 1
+            if change > tolerance:
+                regressions.append(
+                    f"{case['name']} {stage}: p50 {before['p50_ms']:.2f} -> "
+                    f"{stats['p50_ms']:.2f} ms ({change:+.0%})")
+    return regressions
+
+
+def parse_resolutions(value: str) -> List[tuple]:
+    resolutions = []
+    for item in value.split(','):
+        width, height = item.lower().split('x')
+        resolutions.append((int(width), int(height)))
+    return resolutions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the fire/smoke detection hot path")
+    parser.add_argument('--model', type=Path, default=Config.MODEL_PATH)
+    parser.add_argument('--backend', default=Config.INFERENCE_BACKEND)
+    parser.add_argument('--threads', type=int, default=Config.INFERENCE_THREADS)
+    parser.add_argument('--images', type=Path, default=Config.PROJECT_ROOT / 'data',
+                        help="Directory of real images to benchmark (skipped if missing)")
+    parser.add_argument('--resolutions', type=parse_resolutions,
+                        default='640x480,1280x720,1920x1080,3840x2160',
+                        help="Comma separated WIDTHxHEIGHT synthetic frame sizes")
+    parser.add_argument('--detections', default='0,1,5,20',
+                        help="Comma separated detection counts for the annotate stage")
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--output', type=Path, help="Write the JSON report to this file")
+    parser.add_argument('--baseline', type=Path,
+                        help="Earlier report; exit with status 1 if a stage regressed")
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help="Allowed relative p50 slowdown against the baseline")
+    args = parser.parse_args()
+
+    detection_counts = [int(count) for count in args.detections.split(',')]
+    detector = Detector(args.model, backend=args.backend, threads=args.threads)
+
+    cases = []
+    for width, height in args.resolutions:
+        result = bench_frame(detector, synthetic_frame(width, height), detection_counts,
+                             args.iterations, args.warmup)
+        cases.append({'name': f'synthetic_{width}x{height}', **result})
+        print(f"synthetic {width}x{height}: process_frame "
+              f"{result['stages']['process_frame']['p50_ms']:.1f} ms p50", file=sys.stderr)
+
+    if args.images.is_dir():
+        for path in sorted(args.images.iterdir()):
+            frame = cv2.imread(str(path)) if path.suffix.lower() in IMAGE_SUFFIXES else None
+            if frame is None:
+                continue
+            result = bench_frame(detector, frame, detection_counts, args.iterations, args.warmup)
+            cases.append({'name': f'image_{path.name}', **result})
+            print(f"{path.name}: process_frame "
+                  f"{result['stages']['process_frame']['p50_ms']:.1f} ms p50", file=sys.stderr)
+
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'numpy': np.__version__,
+            'opencv': cv2.__version__,
+            'opencv_threads': cv2.getNumThreads(),
+        },
+        'model': str(args.model),
+        'backend': type(detector.model).__name__,
+        'iterations': args.iterations,
+        'cases': cases,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text)
+    else:
+        print(text)
+
+    if args.baseline:
+        regressions = compare(report, json.loads(args.baseline.read_text()), args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -12,6 +12,7 @@ export const API_CONFIG = {
     DETECT_FRAME: "/detect-frame",
     MODEL_INFO: "/model-info",
     HEALTH: "/health",
+    STREAM: "/stream",
   },
 };
 
@@ -0,0 +1,107 @@
+// Send frames from the browser's own camera to /detect-frame as raw image
+// bytes, downscaled on the device to the height the model runs at
+import { API_CONFIG, getApiUrl } from "./config.js";
+
+// Detector.target_height, used until the backend reports its own
+const DEFAULT_TARGET_HEIGHT = 640;
+
+let targetHeightRequest = null;
+// Reused for every frame instead of allocating a canvas per upload
+let canvas = null;
+
+export const getTargetHeight = () => {
+  if (!targetHeightRequest) {
+    targetHeightRequest = fetch(getApiUrl(API_CONFIG.ENDPOINTS.MODEL_INFO))
+      .then((response) => (response.ok ? response.json() : {}))
+      .then((info) => info.target_height || DEFAULT_TARGET_HEIGHT)
+      .catch(() => {
+        // Ask again next time instead of caching the failure
+        targetHeightRequest = null;
+        return DEFAULT_TARGET_HEIGHT;
+      });
+  }
+  return targetHeightRequest;
+};
+
+const toBlob = (type, quality) =>
+  new Promise((resolve, reject) => {
+    canvas.toBlob(
+      (blob) =>
+        blob ? resolve(blob) : reject(new Error("Failed to encode frame")),
+      type,
+      quality
+    );
+  });
+
+// Draw a <video>, <img> or <canvas> at no more than targetHeight pixels
+// high and encode it as WebP (JPEG where WebP encoding is unsupported)
+export const downscaleFrame = async (source, targetHeight, quality = 0.8) => {
+  const width = source.videoWidth || source.naturalWidth || source.width;
+  const height = source.videoHeight || source.naturalHeight || source.height;
+  if (!width || !height) {
+    throw new Error("Camera frame is not available yet");
+  }
+
+  const scale = Math.min(1, targetHeight / height);
+  canvas = canvas || document.createElement("canvas");
+  canvas.width = Math.round(width * scale);
+  canvas.height = Math.round(height * scale);
+  canvas.getContext("2d").drawImage(source, 0, 0, canvas.width, canvas.height);
+
+  let blob = await toBlob("image/webp", quality);
+  if (blob.type !== "image/webp") {
+    // Safari falls back to PNG, which is far larger than JPEG
+    blob = await toBlob("image/jpeg", quality);
+  }
+  return { blob, scale };
+};
+
+// Detect fire/smoke in one frame; boxes are returned in source pixels
+export const detectFrame = async (source) => {
+  const targetHeight = await getTargetHeight();
+  const { blob, scale } = await downscaleFrame(source, targetHeight);
+
+  const response = await fetch(getApiUrl(API_CONFIG.ENDPOINTS.DETECT_FRAME), {
+    method: "POST",
+    headers: { "Content-Type": blob.type },
+    body: blob,
+  });
+  const result = await response.json().catch(() => ({}));
+  if (!response.ok) {
+    throw new Error(result.message || `HTTP ${response.status}`);
+  }
+
+  result.detections = (result.detections || []).map((detection) => ({
+    ...detection,
+    box: detection.box.map((value) => value / scale),
+  }));
+  return result;
+};
+
+// Upload frames one at a time for as long as the source plays. Only one
+// request is in flight, so a slow connection lowers the frame rate instead
+// of building up a backlog. Returns a function that stops the loop
+export const startFrameUploads = (source, onResult, onError, intervalMs = 0) => {
+  let running = true;
+
+  const loop = async () => {
+    while (running) {
+      try {
+        const result = await detectFrame(source);
+        if (running) onResult(result);
+      } catch (error) {
+        if (running) onError(error);
+        // Back off before trying again
+        await new Promise((resolve) => setTimeout(resolve, 1000));
+      }
+      if (intervalMs) {
+        await new Promise((resolve) => setTimeout(resolve, intervalMs));
+      }
+    }
+  };
+  loop();
+
+  return () => {
+    running = false;
+  };
+};
@@ -0,0 +1,111 @@
+"""
+Gunicorn configuration for production serving:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Concurrency model:
+
+- Workers are processes. Inference is CPU bound and each worker runs one
+  forward pass at a time through its micro-batcher, so throughput scales
+  with GUNICORN_WORKERS. Cores are split evenly between workers
+  (INFERENCE_THREADS / OMP_NUM_THREADS) so workers do not oversubscribe
+  the CPU.
+- Each worker serves requests on GUNICORN_THREADS threads (gthread), so
+  slow uploads and long-lived /stream responses do not block other
+  requests, and concurrent /detect-frame calls are batched together.
+- With the PyTorch backend the app is preloaded in the master: the model is
+  loaded once and forked workers share its weights copy-on-write. The
+  loaded objects are moved out of the garbage collector's reach with
+  gc.freeze(), so collections in the workers do not write to (and copy)
+  those pages. ONNX Runtime and OpenVINO start their thread pools with the
+  session, which fork() loses, so with those backends every worker loads
+  its own copy (set GUNICORN_PRELOAD to override).
+- Background threads (micro-batcher, health monitor) do not survive fork();
+  they are stopped before workers are forked and started again in each one.
+- Detection jobs (/jobs, /run-yolo) are recorded in JOBS_DIR, so MAX_JOBS
+  holds across workers and any worker can report on or stop any job. A
+  worker stops the jobs it started when it exits.
+- Every worker records metrics in its own process. Workers write them to
+  METRICS_DIR (run/metrics by default) and /metrics merges them, so a
+  scrape of any worker returns the totals of all workers: counters and
+  latency histograms are summed, and gauges are reported per worker with a
+  worker="<pid>" label. The directory is emptied when the server starts.
+"""
+import gc
+import multiprocessing
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.backends import resolve_backend  # noqa: E402
+from src.config import Config  # noqa: E402
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('GUNICORN_WORKERS', 0)) or max(1, min(4, multiprocessing.cpu_count() // 2))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+# gthread workers heartbeat independently of requests, so this only bounds
+# hung workers, not long streams
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+graceful_timeout = 30
+keepalive = 5
+accesslog = '-'
+
+# Split the cores between workers before any runtime is imported; torch
+# reads OMP_NUM_THREADS when it starts its thread pool
+_cores_per_worker = max(1, multiprocessing.cpu_count() // workers)
+if not Config.INFERENCE_THREADS:
+    Config.INFERENCE_THREADS = _cores_per_worker
+os.environ.setdefault('OMP_NUM_THREADS', str(Config.INFERENCE_THREADS))
+
+# Workers inherit the configuration, so they all share this directory
+if not Config.METRICS_DIR:
+    Config.METRICS_DIR = str(Config.PROJECT_ROOT / 'run' / 'metrics')
+
+_preload = os.getenv('GUNICORN_PRELOAD', 'auto').lower()
+if _preload == 'auto':
+    preload_app = resolve_backend(Config.MODEL_PATH, Config.INFERENCE_BACKEND) == 'ultralytics'
+else:
+    preload_app = _preload in ('1', 'true', 'yes')
+
+if preload_app:
+    # Keep the collector from running while the app loads; everything
+    # allocated until when_ready() is then frozen in one go
+    gc.disable()
+
+
+def on_starting(server):
+    """Runs in the master before the app is loaded"""
+    from src.metrics import SharedMetrics
+    # Counters restart with the server, as Prometheus expects
+    SharedMetrics.clear(Config.METRICS_DIR)
+
+
+def when_ready(server):
+    """Runs in the master after the app is loaded, before workers are forked"""
+    if not server.cfg.preload_app:
+        return
+    import app
+    app.stop_background_services()
+    gc.freeze()
+    gc.enable()
+    server.log.info(f"Preloaded model shared by {server.cfg.workers} workers "
+                    f"({gc.get_freeze_count()} objects frozen)")
+
+
+def post_fork(server, worker):
+    """Runs in every new worker"""
+    if not server.cfg.preload_app:
+        return
+    import app
+    app.start_background_services()
+
+
+def worker_exit(server, worker):
+    """Runs in a worker as it shuts down"""
+    import app
+    app.job_manager.shutdown()
+    if app.metrics_store is not None:
+        # Final snapshot, so the worker's counts outlive it
+        app.metrics_store.stop()
@@ -0,0 +1,200 @@
+import threading
+import time
+from typing import Any, Dict, NamedTuple, Optional
+
+import numpy as np
+
+try:
+    from .tracker import box_iou
+except ImportError:  # Imported as a top-level module by src/main.py
+    from tracker import box_iou
+
+
+class AlertDecision(NamedTuple):
+    """An alert the policy let through"""
+    detection: str  # "Fire" or "Smoke"
+    reason: str     # "new" or "escalation" (smoke followed by fire)
+
+
+class TokenBucket:
+    """Token bucket whose rate and burst live on the policy, not the bucket"""
+
+    __slots__ = ('tokens', 'updated')
+
+    def __init__(self, burst: float, now: float):
+        self.tokens = float(burst)
+        self.updated = now
+
+    def refill(self, now: float, rate: float, burst: float) -> float:
+        if rate == float('inf'):
+            self.tokens = max(self.tokens, float(burst))
+        else:
+            self.tokens = min(burst, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        return self.tokens
+
+
+class _StreamAlertState:
+    """Constant-size alert state of one stream"""
+
+    __slots__ = ('camera', 'classes', 'last_detection', 'last_box', 'last_alert_time')
+
+    def __init__(self, camera: TokenBucket):
+        self.camera = camera
+        self.classes: Dict[str, TokenBucket] = {}  # One bucket per class (Fire, Smoke)
+        self.last_detection: Optional[str] = None
+        self.last_box: Optional[np.ndarray] = None
+        self.last_alert_time = 0.0
+
+
+class AlertPolicy:
+    def __init__(
+        self,
+        camera_cooldown: float = 45.0,
+        camera_burst: int = 1,
+        class_cooldown: float = 90.0,
+        class_burst: int = 1,
+        dedup_iou: float = 0.5,
+        dedup_window: float = 300.0,
+        escalation: bool = True,
+        names: Optional[Dict[int, str]] = None
+        ):
+        """
+        Shared alert policy for any number of streams.
+
+        Every stream gets two kinds of token buckets: one for the camera as a
+        whole and one per class, refilled at one token per cooldown up to the
+        burst size. An alert needs a token from both. On top of that:
+
+        - Escalation: fire on a stream whose last alert was smoke is always
+          reported, bypassing rate limits and deduplication.
+        - Deduplication: a detection of the same class whose top box overlaps
+          the last alerted box by at least dedup_iou within dedup_window
+          seconds is the same event and is suppressed.
+
+        Rates are stored once on the policy and each stream only keeps its
+        bucket levels and last alert, so state is O(1) per stream.
+
+        Args:
+            camera_cooldown (float): Seconds per camera token
+            camera_burst (int): Camera alerts allowed back to back
+            class_cooldown (float): Seconds per token of each class
+            class_burst (int): Alerts of one class allowed back to back
+            dedup_iou (float): Overlap above which a box repeats the last alert
+            dedup_window (float): Seconds an alerted region stays suppressed
+            escalation (bool): Report smoke -> fire regardless of limits
+            names (Optional[Dict[int, str]]): Class id -> name, used to pick
+                the top box of the alerted class; the top box overall is used
+                when omitted
+        """
+        self.camera_rate = 1.0 / camera_cooldown if camera_cooldown > 0 else float('inf')
+        self.camera_burst = camera_burst
+        self.class_rate = 1.0 / class_cooldown if class_cooldown > 0 else float('inf')
+        self.class_burst = class_burst
+        self.dedup_iou = dedup_iou
+        self.dedup_window = dedup_window
+        self.escalation = escalation
+        self.names = names
+
+        self._streams: Dict[str, _StreamAlertState] = {}
+        self._lock = threading.Lock()
+
+        self.alerts = 0
+        self.escalations = 0
+        self.suppressed_rate = 0
+        self.suppressed_duplicate = 0
+
+    def _state(self, stream: str, now: float) -> _StreamAlertState:
+        state = self._streams.get(stream)
+        if state is None:
+            state = self._streams[stream] = _StreamAlertState(TokenBucket(self.camera_burst, now))
+        return state
+
+    def _top_box(self, detections: Any, detection: str) -> Optional[np.ndarray]:
+        boxes = np.asarray(detections.boxes).reshape(-1, 4)
+        if not len(boxes):
+            return None
+        if self.names is None:
+            return boxes[0]
+        for box, class_id in zip(boxes, detections.class_ids):
+            if self.names[int(class_id)].lower() == detection.lower():
+                return box
+        return boxes[0]
+
+    def _is_duplicate(self, state: _StreamAlertState, detection: str,
+                      box: Optional[np.ndarray], now: float) -> bool:
+        if state.last_detection != detection or now - state.last_alert_time > self.dedup_window:
+            return False
+        if box is None or state.last_box is None:
+            return True
+        iou = box_iou(box[None].astype(np.float32), state.last_box[None])[0, 0]
+        return iou >= self.dedup_iou
+
+    def evaluate(self, stream: str, detections: Any,
+                 now: Optional[float] = None) -> Optional[AlertDecision]:
+        """
+        Decide whether a stream's detections raise an alert, and record it.
+
+        Args:
+            stream (str): Stream name
+            detections: Detections with boxes, class_ids and the overall
+                detection ("Fire", "Smoke" or None)
+            now (Optional[float]): Current time, defaults to time.time()
+
+        Returns:
+            Optional[AlertDecision]: The alert to raise, or None
+        """
+        detection = detections.detection
+        if not detection:
+            return None
+
+        now = time.time() if now is None else now
+        box = self._top_box(detections, detection)
+
+        with self._lock:
+            state = self._state(stream, now)
+            bucket = state.classes.get(detection)
+            if bucket is None:
+                bucket = state.classes[detection] = TokenBucket(self.class_burst, now)
+
+            camera_tokens = state.camera.refill(now, self.camera_rate, self.camera_burst)
+            class_tokens = bucket.refill(now, self.class_rate, self.class_burst)
+
+            escalated = (self.escalation and detection == "Fire"
+                         and state.last_detection == "Smoke")
+            if not escalated:
+                if self._is_duplicate(state, detection, box, now):
+                    self.suppressed_duplicate += 1
+                    return None
+                if camera_tokens < 1 or class_tokens < 1:
+                    self.suppressed_rate += 1
+                    return None
+
+            # Escalations may overdraw the buckets, which delays the next
+            # routine alert instead of letting it through early
+            state.camera.tokens -= 1
+            bucket.tokens -= 1
+            state.last_detection = detection
+            state.last_box = None if box is None else np.asarray(box, dtype=np.float32)
+            state.last_alert_time = now
+
+            self.alerts += 1
+            if escalated:
+                self.escalations += 1
+                return AlertDecision(detection, "escalation")
+            return AlertDecision(detection, "new")
+
+    def forget(self, stream: str) -> None:
+        """Drop the state of a stream that went away"""
+        with self._lock:
+            self._streams.pop(stream, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'streams': len(self._streams),
+                'alerts': self.alerts,
+                'escalations': self.escalations,
+                'suppressed_rate': self.suppressed_rate,
+                'suppressed_duplicate': self.suppressed_duplicate,
+            }
@@ -0,0 +1,456 @@
+import ast
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# (boxes [x1, y1, x2, y2], class_ids, confidences) for one frame, unsorted
+Prediction = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+BACKENDS = ('auto', 'ultralytics', 'onnx', 'openvino')
+
+logger = logging.getLogger(__name__)
+
+
+def _empty_prediction() -> Prediction:
+    return (np.empty((0, 4), dtype=np.float32), np.empty(0, dtype=int),
+            np.empty(0, dtype=np.float32))
+
+
+def nms(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """
+    Greedy non-maximum suppression.
+
+    Args:
+        boxes (np.ndarray): (N, 4) boxes [x1, y1, x2, y2]
+        scores (np.ndarray): (N,) scores
+        iou_threshold (float): Boxes overlapping a kept box by more than this are dropped
+
+    Returns:
+        np.ndarray: Indices of kept boxes, highest score first
+    """
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1) * (y2 - y1)
+    order = np.argsort(-scores, kind='stable')
+
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        inter_w = np.clip(np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]), 0, None)
+        inter_h = np.clip(np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]), 0, None)
+        inter = inter_w * inter_h
+        iou = inter / np.maximum(areas[i] + areas[rest] - inter, 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.array(keep, dtype=int)
+
+
+def _letterbox_geometry(shape: Tuple[int, int], size: int) -> Tuple[float, Tuple[int, int], Tuple[int, int]]:
+    """Scale ratio, resized (width, height) and (left, top) padding for a frame shape"""
+    height, width = shape
+    ratio = min(size / height, size / width)
+    new_width, new_height = round(width * ratio), round(height * ratio)
+    left = round((size - new_width) / 2 - 0.1)
+    top = round((size - new_height) / 2 - 0.1)
+    return ratio, (new_width, new_height), (left, top)
+
+
+def letterbox(frame: np.ndarray, size: int) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+    """
+    Resize keeping aspect ratio and pad to a square model input.
+
+    Args:
+        frame (np.ndarray): BGR input frame
+        size (int): Model input size
+
+    Returns:
+        tuple: (padded BGR image, scale ratio, (left, top) padding)
+    """
+    height, width = frame.shape[:2]
+    ratio, (new_width, new_height), (left, top) = _letterbox_geometry((height, width), size)
+
+    resized = frame
+    if (new_width, new_height) != (width, height):
+        resized = cv2.resize(frame, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
+    padded = cv2.copyMakeBorder(resized, top, size - new_height - top, left, size - new_width - left,
+                                cv2.BORDER_CONSTANT, value=(114, 114, 114))
+    return padded, ratio, (left, top)
+
+
+class LetterboxBuffer:
+    def __init__(self, size: int, capacity: int = 1):
+        """
+        Reusable letterbox canvases and model input tensor.
+
+        Frames are resized straight into the image area of a preallocated
+        square canvas, and the canvas is converted into a preallocated
+        float32 NCHW tensor. The padding is only repainted when the frame
+        geometry changes, so a steady stream allocates nothing per frame.
+
+        Args:
+            size (int): Model input size
+            capacity (int): Number of frames to allocate for up front; grows
+                on demand for larger batches
+        """
+        self.size = size
+        self._canvases: List[np.ndarray] = []
+        self._geometry: List[Optional[Tuple[int, int, int, int]]] = []
+        self._tensor = np.empty((0, 3, size, size), dtype=np.float32)
+        self._reserve(capacity)
+
+    def _reserve(self, count: int) -> None:
+        while len(self._canvases) < count:
+            self._canvases.append(np.full((self.size, self.size, 3), 114, dtype=np.uint8))
+            self._geometry.append(None)
+        if self._tensor.shape[0] < count:
+            self._tensor = np.empty((count, 3, self.size, self.size), dtype=np.float32)
+
+    def fill(self, frames: List[np.ndarray]) -> Tuple[np.ndarray, List[Tuple[float, Tuple[int, int]]]]:
+        """
+        Letterbox frames into the shared tensor.
+
+        The returned tensor is a view of the buffer and is overwritten by the
+        next call, so callers must finish inference (or copy) first.
+
+        Args:
+            frames (List[np.ndarray]): BGR frames of any size
+
+        Returns:
+            tuple: ((N, 3, size, size) RGB float32 tensor in [0, 1], one
+            (ratio, (left, top)) transform per frame)
+        """
+        self._reserve(len(frames))
+        transforms = []
+        for index, frame in enumerate(frames):
+            height, width = frame.shape[:2]
+            ratio, (new_width, new_height), (left, top) = _letterbox_geometry(
+                (height, width), self.size)
+
+            canvas = self._canvases[index]
+            geometry = (new_width, new_height, left, top)
+            if self._geometry[index] != geometry:
+                canvas[:] = 114
+                self._geometry[index] = geometry
+
+            roi = canvas[top:top + new_height, left:left + new_width]
+            if (new_width, new_height) == (width, height):
+                roi[:] = frame
+            else:
+                cv2.resize(frame, (new_width, new_height), dst=roi,
+                           interpolation=cv2.INTER_LINEAR)
+
+            # BGR HWC uint8 -> RGB CHW float32 in [0, 1]
+            tensor = self._tensor[index]
+            for channel in range(3):
+                np.divide(canvas[:, :, 2 - channel], np.float32(255), out=tensor[channel])
+            transforms.append((ratio, (left, top)))
+
+        return self._tensor[:len(frames)], transforms
+
+
+def scale_boxes(
+    boxes: np.ndarray,
+    ratio: float,
+    pad: Tuple[int, int],
+    shape: Tuple[int, int]
+) -> np.ndarray:
+    """
+    Map boxes from letterboxed model input back to original frame pixels.
+
+    Args:
+        boxes (np.ndarray): (N, 4) boxes [x1, y1, x2, y2], modified in place
+        ratio (float): Letterbox scale ratio
+        pad (tuple): Letterbox (left, top) padding
+        shape (tuple): Original frame (height, width)
+
+    Returns:
+        np.ndarray: The scaled boxes, clipped to the frame
+    """
+    left, top = pad
+    boxes -= np.array([left, top, left, top], dtype=boxes.dtype)
+    boxes /= ratio
+    height, width = shape
+    boxes[:, [0, 2]] = np.clip(boxes[:, [0, 2]], 0, width)
+    boxes[:, [1, 3]] = np.clip(boxes[:, [1, 3]], 0, height)
+    return boxes
+
+
+def postprocess(
+    output: np.ndarray,
+    ratio: float,
+    pad: Tuple[int, int],
+    shape: Tuple[int, int],
+    conf: float,
+    iou: float,
+    max_det: int = 300
+) -> Prediction:
+    """
+    Decode one raw YOLO head output into boxes in original frame pixels.
+
+    Args:
+        output (np.ndarray): (4 + num_classes, anchors) raw output for one image
+        ratio (float): Letterbox scale ratio
+        pad (tuple): Letterbox (left, top) padding
+        shape (tuple): Original frame (height, width)
+        conf (float): Confidence threshold
+        iou (float): NMS IoU threshold
+        max_det (int): Maximum detections kept
+
+    Returns:
+        Prediction: (boxes, class_ids, confidences)
+    """
+    predictions = output.T
+    scores = predictions[:, 4:]
+    class_ids = scores.argmax(axis=1)
+    confidences = scores[np.arange(len(scores)), class_ids]
+
+    mask = confidences >= conf
+    if not mask.any():
+        return _empty_prediction()
+
+    xywh = predictions[mask, :4]
+    class_ids = class_ids[mask]
+    confidences = confidences[mask]
+    boxes = np.empty_like(xywh)
+    boxes[:, :2] = xywh[:, :2] - xywh[:, 2:] / 2
+    boxes[:, 2:] = xywh[:, :2] + xywh[:, 2:] / 2
+
+    # Class-aware NMS by offsetting each class into its own coordinate range
+    offsets = class_ids[:, None].astype(boxes.dtype) * 7680
+    keep = nms(boxes + offsets, confidences, iou)[:max_det]
+    boxes, class_ids, confidences = boxes[keep], class_ids[keep], confidences[keep]
+
+    boxes = scale_boxes(boxes, ratio, pad, shape)
+    return boxes.astype(np.float32), class_ids.astype(int), confidences.astype(np.float32)
+
+
+class UltralyticsBackend:
+    # Weights are plain tensors and torch starts its thread pool on the first
+    # forward pass, so a loaded model can be shared by forked workers
+    fork_safe = True
+
+    def __init__(self, model_path: Path, imgsz: int = 640):
+        """
+        Eager PyTorch inference through ultralytics.YOLO.
+
+        Frames are letterboxed into a reusable buffer and passed to the model
+        as a tensor, which skips ultralytics' own per-frame letterbox copy.
+
+        Args:
+            model_path (Path): Path to the .pt weights
+            imgsz (int): Model input size
+        """
+        import torch
+        from ultralytics import YOLO
+
+        self._torch = torch
+        self.model = YOLO(str(model_path))
+        self.names = self.model.model.names
+        self.imgsz = imgsz
+        self._letterbox = LetterboxBuffer(imgsz)
+        self._lock = threading.Lock()
+
+    def __call__(self, frames: List[np.ndarray], iou: float, conf: float) -> List[Prediction]:
+        with self._lock:
+            tensor, transforms = self._letterbox.fill(frames)
+            # torch.from_numpy shares memory with the buffer
+            results = self.model(self._torch.from_numpy(tensor), iou=iou, conf=conf,
+                                 imgsz=self.imgsz, verbose=False)
+
+        predictions = []
+        for result, (ratio, pad), frame in zip(results, transforms, frames):
+            if len(result.boxes) == 0:
+                predictions.append(_empty_prediction())
+                continue
+            boxes = result.boxes.xyxy.cpu().numpy().astype(np.float32)
+            predictions.append((scale_boxes(boxes, ratio, pad, frame.shape[:2]),
+                                result.boxes.cls.cpu().numpy().astype(int),
+                                result.boxes.conf.cpu().numpy()))
+        return predictions
+
+
+class ExportedModelBackend:
+    """Shared letterbox preprocessing and NumPy decoding for exported YOLO models"""
+
+    imgsz = 640
+    batch_size: Optional[int] = None  # None when the batch dimension is dynamic
+    # Runtimes start their thread pools with the session, which fork() loses
+    fork_safe = False
+    names: Dict[int, str] = {}
+
+    def _init_preprocessing(self) -> None:
+        """Allocate the letterbox buffer once the input size is known"""
+        self._letterbox = LetterboxBuffer(self.imgsz, self.batch_size or 1)
+        self._lock = threading.Lock()
+
+    def _run(self, tensor: np.ndarray) -> np.ndarray:
+        """Run the raw model on an (N, 3, H, W) float32 tensor"""
+        raise NotImplementedError
+
+    def __call__(self, frames: List[np.ndarray], iou: float, conf: float) -> List[Prediction]:
+        # The input buffer (and OpenVINO's output tensors) are reused, so the
+        # whole call runs under one lock
+        with self._lock:
+            tensor, transforms = self._letterbox.fill(frames)
+            if self.batch_size is None:
+                outputs = self._run(tensor)
+            else:
+                # Static batch size: run the exported graph one image at a time
+                outputs = np.concatenate([self._run(tensor[i:i + 1]) for i in range(len(frames))])
+
+            return [postprocess(output, ratio, pad, frame.shape[:2], conf, iou)
+                    for output, (ratio, pad), frame in zip(outputs, transforms, frames)]
+
+
+def _parse_names(value) -> Dict[int, str]:
+    names = ast.literal_eval(value) if isinstance(value, str) else value
+    return {int(k): v for k, v in names.items()}
+
+
+class OnnxBackend(ExportedModelBackend):
+    def __init__(self, model_path: Path, providers: Optional[List[str]] = None, threads: int = 0):
+        """
+        CPU inference through ONNX Runtime without importing torch.
+
+        Args:
+            model_path (Path): Path to the .onnx model exported by ultralytics
+            providers (Optional[List[str]]): ONNX Runtime execution providers
+            threads (int): Intra-op threads, 0 lets ONNX Runtime decide
+        """
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError(
+                "ONNX backend requires onnxruntime: pip install onnxruntime") from e
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+
+        self.session = ort.InferenceSession(
+            str(model_path), options, providers=providers or ['CPUExecutionProvider'])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.imgsz = int(model_input.shape[2]) if isinstance(model_input.shape[2], int) else 640
+        self.batch_size = model_input.shape[0] if isinstance(model_input.shape[0], int) else None
+
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.names = _parse_names(metadata['names']) if 'names' in metadata else {0: 'Fire', 1: 'Smoke'}
+        self._init_preprocessing()
+
+    def _run(self, tensor: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self.input_name: tensor})[0]
+
+
+class OpenVINOBackend(ExportedModelBackend):
+    def __init__(self, model_dir: Path, device: str = 'CPU', threads: int = 0):
+        """
+        CPU inference through the OpenVINO runtime.
+
+        Args:
+            model_dir (Path): ultralytics OpenVINO export directory (or its .xml file)
+            device (str): OpenVINO device name
+            threads (int): Inference threads, 0 lets OpenVINO decide
+        """
+        try:
+            import openvino as ov
+        except ImportError as e:
+            raise ImportError(
+                "OpenVINO backend requires openvino: pip install openvino") from e
+
+        model_dir = Path(model_dir)
+        xml_path = model_dir if model_dir.suffix == '.xml' else next(model_dir.glob('*.xml'))
+
+        core = ov.Core()
+        model = core.read_model(str(xml_path))
+        config = {'INFERENCE_NUM_THREADS': threads} if threads else {}
+        self.compiled = core.compile_model(model, device, config)
+        self.output = self.compiled.output(0)
+
+        shape = model.input(0).partial_shape
+        self.imgsz = shape[2].get_length() if shape[2].is_static else 640
+        self.batch_size = shape[0].get_length() if shape[0].is_static else None
+
+        self.names = {0: 'Fire', 1: 'Smoke'}
+        metadata_path = xml_path.parent / 'metadata.yaml'
+        if metadata_path.exists():
+            import yaml
+            with open(metadata_path, 'r', encoding='utf-8') as f:
+                self.names = _parse_names(yaml.safe_load(f)['names'])
+        self._init_preprocessing()
+
+    def _run(self, tensor: np.ndarray) -> np.ndarray:
+        return self.compiled(tensor)[self.output]
+
+
+def export_model(model_path: Path, fmt: str = 'onnx', imgsz: int = 640, **kwargs) -> Path:
+    """
+    Export .pt weights with ultralytics (only needed once per model).
+
+    Args:
+        model_path (Path): Path to the .pt weights
+        fmt (str): 'onnx' or 'openvino'
+        imgsz (int): Model input size
+        **kwargs: Extra ultralytics export arguments (e.g. int8=True)
+
+    Returns:
+        Path: Exported .onnx file or OpenVINO directory
+    """
+    from ultralytics import YOLO
+
+    kwargs.setdefault('dynamic', fmt == 'onnx')
+    logger.info(f"Exporting {model_path} to {fmt}")
+    return Path(YOLO(str(model_path)).export(format=fmt, imgsz=imgsz, **kwargs))
+
+
+def resolve_backend(model_path: Path, backend: str = 'auto') -> str:
+    """Name of the backend load_backend() uses for a model, resolving 'auto'"""
+    if backend != 'auto':
+        return backend
+    model_path = Path(model_path)
+    if model_path.suffix == '.onnx':
+        return 'onnx'
+    if model_path.suffix == '.xml' or model_path.is_dir():
+        return 'openvino'
+    return 'ultralytics'
+
+
+def load_backend(model_path: Path, backend: str = 'auto', threads: int = 0):
+    """
+    Create an inference backend for a model.
+
+    Args:
+        model_path (Path): .pt weights, .onnx model or OpenVINO export directory
+        backend (str): 'ultralytics', 'onnx', 'openvino' or 'auto' (pick from
+            the model path)
+        threads (int): CPU threads for the exported backends, 0 for default
+
+    Returns:
+        Callable backend mapping (frames, iou, conf) to predictions
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{backend}', expected one of {BACKENDS}")
+
+    model_path = Path(model_path)
+    backend = resolve_backend(model_path, backend)
+
+    if backend == 'ultralytics':
+        return UltralyticsBackend(model_path)
+
+    if backend == 'onnx':
+        onnx_path = model_path if model_path.suffix == '.onnx' else model_path.with_suffix('.onnx')
+        if not onnx_path.exists():
+            onnx_path = export_model(model_path, 'onnx')
+        return OnnxBackend(onnx_path, threads=threads)
+
+    ov_path = model_path
+    if model_path.suffix == '.pt':
+        ov_path = model_path.parent / f'{model_path.stem}_openvino_model'
+        if not ov_path.exists():
+            ov_path = export_model(model_path, 'openvino')
+    return OpenVINOBackend(ov_path, threads=threads)
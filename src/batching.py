@@ -0,0 +1,153 @@
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10.0,
+        max_queue_size: int = 0
+        ):
+        """
+        Collect items from many callers and run them through one batched call.
+
+        Args:
+            batch_fn (Callable): Function mapping a list of items to a list of
+                results of the same length, e.g. Detector.detect_batch
+            max_batch_size (int): Largest batch handed to batch_fn
+            max_wait_ms (float): Longest time the first queued item waits for
+                the batch to fill up
+            max_queue_size (int): Bound on pending items, 0 for unbounded
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+
+        self.logger = logging.getLogger(__name__)
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._stats_lock = threading.Lock()
+        self._batch_sizes = Counter()
+        self._items = 0
+        self._worker = None
+
+    def start(self) -> 'MicroBatcher':
+        """Start the background worker thread if it is not running yet"""
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(
+                target=self._run, name="micro-batcher", daemon=True)
+            self._worker.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the worker after the items already queued are processed"""
+        if self._worker is not None and self._worker.is_alive():
+            self._queue.put(None)
+            self._worker.join(timeout)
+        self._worker = None
+
+    def submit(self, item: Any, timeout: Optional[float] = None) -> Future:
+        """
+        Queue an item for the next batch.
+
+        Args:
+            item (Any): Item passed to batch_fn
+            timeout (Optional[float]): Seconds to wait for queue space
+
+        Returns:
+            Future: Resolves to the result for this item
+        """
+        if self._worker is None:
+            self.start()
+
+        future = Future()
+        self._queue.put((item, future), timeout=timeout)
+        return future
+
+    def __call__(self, item: Any, timeout: Optional[float] = None) -> Any:
+        """Submit an item and block until its result is ready"""
+        return self.submit(item).result(timeout)
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of items waiting for a batch"""
+        return self._queue.qsize()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of batching statistics.
+
+        Returns:
+            dict: Queue depth, batch and item counts, and the batch size histogram
+        """
+        with self._stats_lock:
+            batches = sum(self._batch_sizes.values())
+            return {
+                'queue_depth': self.queue_depth,
+                'batches': batches,
+                'items': self._items,
+                'mean_batch_size': self._items / batches if batches else 0.0,
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000,
+                'batch_size_histogram': dict(sorted(self._batch_sizes.items()))
+            }
+
+    def _collect(self, first: Any) -> List[Any]:
+        """Gather a batch starting with the first item until it is full or the wait expires"""
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    entry = self._queue.get(timeout=remaining)
+                else:
+                    # Wait is over, but still take whatever is already queued
+                    entry = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is None:
+                # Re-queue the stop marker so the loop exits after this batch
+                self._queue.put(None)
+                break
+            batch.append(entry)
+
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            entry = self._queue.get()
+            if entry is None:
+                break
+
+            batch = self._collect(entry)
+            items = [item for item, _ in batch]
+            futures = [future for _, future in batch]
+
+            with self._stats_lock:
+                self._batch_sizes[len(batch)] += 1
+                self._items += len(batch)
+
+            try:
+                results = self.batch_fn(items)
+                if len(results) != len(items):
+                    raise RuntimeError(
+                        f"Batch function returned {len(results)} results for {len(items)} items")
+            except Exception as e:
+                self.logger.error(f"Batch of {len(items)} failed: {e}")
+                for future in futures:
+                    future.set_exception(e)
+                continue
+
+            for future, result in zip(futures, results):
+                future.set_result(result)
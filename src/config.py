@@ -27,16 +27,121 @@ def setup_logging():
     console_handler.setFormatter(formatter)
     logging.getLogger().addHandler(console_handler)
 
+def _parse_sources(value):
+    """Parse a comma separated list of camera indices, paths or URLs"""
+    sources = []
+    for item in value.split(','):
+        item = item.strip()
+        if item:
+            sources.append(int(item) if item.isdigit() else item)
+    return sources
+
 # Environment variables configuration
 
 
 class Config:
     PROJECT_ROOT = Path(__file__).parent.parent
-    MODEL_PATH = PROJECT_ROOT / 'models' / 'best_nano_111.pt'
+    # Point MODEL_PATH at an .onnx file (e.g. the INT8 model written by
+    # src/quantization.py) to run it through ONNX Runtime
+    MODEL_PATH = Path(os.getenv('MODEL_PATH', PROJECT_ROOT / 'models' / 'best_nano_111.pt'))
     VIDEO_SOURCE = PROJECT_ROOT / 'data' / 'police_car_fire_ccvt.mp4'
     DETECTED_FIRES_DIR = PROJECT_ROOT / 'detected_fires'
 
-    ALERT_COOLDOWN = 45  # Seconds between alerts
+    # Several cameras/videos served by one process and one model instance
+    VIDEO_SOURCES = _parse_sources(os.getenv('VIDEO_SOURCES', '')) or [VIDEO_SOURCE]
+    STREAM_BATCH_SIZE = int(os.getenv('STREAM_BATCH_SIZE', 8))
+
+    # Alert policy shared by all streams: token buckets per camera and per
+    # class (one token per cooldown, up to the burst size), suppression of
+    # repeats over the same region and smoke -> fire escalation
+    ALERT_COOLDOWN = float(os.getenv('ALERT_COOLDOWN', 45))  # Seconds between alerts per camera
+    ALERT_BURST = int(os.getenv('ALERT_BURST', 1))
+    ALERT_CLASS_COOLDOWN = float(os.getenv('ALERT_CLASS_COOLDOWN', 90))
+    ALERT_DEDUP_IOU = float(os.getenv('ALERT_DEDUP_IOU', 0.5))
+    ALERT_DEDUP_WINDOW = float(os.getenv('ALERT_DEDUP_WINDOW', 300))
+    ALERT_ESCALATION = os.getenv('ALERT_ESCALATION', 'true').lower() in ('1', 'true', 'yes')
+
+    # WhatsApp alerts (Twilio) with the frame hosted on Imgur; alerts are
+    # only saved to disk while these are empty. Optional, so they default to
+    # '' rather than None, which validate() reports as missing
+    TWILIO_ACCOUNT_SID = os.getenv('TWILIO_ACCOUNT_SID', '')
+    TWILIO_AUTH_TOKEN = os.getenv('TWILIO_AUTH_TOKEN', '')
+    TWILIO_WHATSAPP_NUMBER = os.getenv('TWILIO_WHATSAPP_NUMBER', '')
+    RECEIVER_WHATSAPP_NUMBER = os.getenv('RECEIVER_WHATSAPP_NUMBER', '')
+    IMGUR_CLIENT_ID = os.getenv('IMGUR_CLIENT_ID', '')
+
+    # Extra alert sinks: comma separated webhook URLs receiving JSON POSTs,
+    # and a JSON lines file with one record per alert
+    ALERT_WEBHOOKS = [url.strip() for url in os.getenv('ALERT_WEBHOOKS', '').split(',') if url.strip()]
+    ALERT_LOG_FILE = os.getenv('ALERT_LOG_FILE', '')
+
+    # Alert delivery runs on a background pool; at most ALERT_QUEUE_SIZE
+    # alerts wait at once and failed uploads/messages are retried
+    ALERT_WORKERS = int(os.getenv('ALERT_WORKERS', 4))
+    ALERT_QUEUE_SIZE = int(os.getenv('ALERT_QUEUE_SIZE', 16))
+    ALERT_RETRIES = int(os.getenv('ALERT_RETRIES', 3))
+    ALERT_RETRY_BACKOFF = float(os.getenv('ALERT_RETRY_BACKOFF', 1.0))
+    ALERT_TIMEOUT = float(os.getenv('ALERT_TIMEOUT', 10))
+
+    # Skip the display window and only draw overlays for saved alerts
+    HEADLESS = os.getenv('HEADLESS', 'false').lower() in ('1', 'true', 'yes')
+
+    # Threaded capture/inference/output pipeline. Drop policy is one of
+    # 'block', 'oldest', 'newest' or 'auto' (block for files, oldest for cameras)
+    PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', 2))
+    FRAME_DROP_POLICY = os.getenv('FRAME_DROP_POLICY', 'auto')
+
+    # Motion-gated inference: run the model on every Nth frame unless the
+    # scene changes. Disabled by default so every frame is inferred
+    MOTION_GATING = os.getenv('MOTION_GATING', 'false').lower() in ('1', 'true', 'yes')
+    INFER_EVERY_N = int(os.getenv('INFER_EVERY_N', 10))
+    MOTION_THRESHOLD = float(os.getenv('MOTION_THRESHOLD', 0.01))
+
+    # Temporal tracking: confirm fire/smoke only after K of N detector runs
+    # and interpolate boxes on frames the detector skips
+    TRACKING = os.getenv('TRACKING', 'false').lower() in ('1', 'true', 'yes')
+    TRACK_CONFIRM_HITS = int(os.getenv('TRACK_CONFIRM_HITS', 3))
+    TRACK_WINDOW = int(os.getenv('TRACK_WINDOW', 5))
+
+    # Inference backend: 'auto' (from the model file), 'ultralytics', 'onnx'
+    # or 'openvino'. ONNX/OpenVINO models are exported next to the weights on
+    # first use. INFERENCE_THREADS=0 keeps the runtime default
+    INFERENCE_BACKEND = os.getenv('INFERENCE_BACKEND', 'auto')
+    INFERENCE_THREADS = int(os.getenv('INFERENCE_THREADS', 0))
+
+    # Serve Prometheus metrics from src/main.py on this port (0 disables);
+    # the web app always exposes them on /metrics
+    METRICS_PORT = int(os.getenv('METRICS_PORT', 0))
+    # Directory where server workers share their metrics, so /metrics
+    # reports all of them; empty keeps metrics per process (gunicorn.conf.py
+    # sets it for production mode)
+    METRICS_DIR = os.getenv('METRICS_DIR', '')
+
+    # Micro-batching of concurrent inference requests
+    BATCH_MAX_SIZE = int(os.getenv('BATCH_MAX_SIZE', 8))
+    BATCH_MAX_WAIT_MS = float(os.getenv('BATCH_MAX_WAIT_MS', 10))
+
+    # Annotated MJPEG streams served on /stream: JPEG quality levels that
+    # slow viewers step down through, and seconds a camera keeps running
+    # after its last viewer leaves
+    MJPEG_QUALITY_LEVELS = [int(q) for q in os.getenv('MJPEG_QUALITY_LEVELS', '80,60,40').split(',')]
+    MJPEG_IDLE_TIMEOUT = float(os.getenv('MJPEG_IDLE_TIMEOUT', 5))
+
+    # Records of running detection jobs, shared by all server workers
+    JOBS_DIR = Path(os.getenv('JOBS_DIR', PROJECT_ROOT / 'run' / 'jobs'))
+    # Detection jobs (/jobs, /run-yolo): jobs running at once on this host,
+    # CPU threads per job (0 splits the cores between MAX_JOBS) and seconds
+    # a stopping job gets before it is killed
+    MAX_JOBS = int(os.getenv('MAX_JOBS', 2))
+    JOB_THREADS = int(os.getenv('JOB_THREADS', 0))
+    JOB_STOP_TIMEOUT = float(os.getenv('JOB_STOP_TIMEOUT', 10))
+    # Output lines and results of a job kept for /jobs/<id>/events clients
+    JOB_OUTPUT_EVENTS = int(os.getenv('JOB_OUTPUT_EVENTS', 1000))
+
+    # Background health checks behind /health: seconds between checks and
+    # between camera probes (skipped while a detection uses the camera)
+    HEALTH_INTERVAL = float(os.getenv('HEALTH_INTERVAL', 10))
+    HEALTH_CAMERA_INTERVAL = float(os.getenv('HEALTH_CAMERA_INTERVAL', 60))
 
     @classmethod
     def validate(cls):
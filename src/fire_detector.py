@@ -1,10 +1,24 @@
 import cv2
 import numpy as np
-from ultralytics import YOLO
 import cvzone
 import logging
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import List, NamedTuple, Tuple, Optional
+
+try:
+    from .backends import load_backend
+    from .metrics import DETECTIONS, FRAMES, STAGE_SECONDS
+except ImportError:  # Imported as a top-level module by src/main.py
+    from backends import load_backend
+    from metrics import DETECTIONS, FRAMES, STAGE_SECONDS
+
+
+class Detections(NamedTuple):
+    """Detections for one frame, sorted by descending confidence"""
+    boxes: np.ndarray        # (N, 4) float32 [x1, y1, x2, y2] in input frame pixels
+    class_ids: np.ndarray    # (N,) int class ids
+    confidences: np.ndarray  # (N,) float32 confidences
+    detection: Optional[str]  # Overall verdict: "Fire", "Smoke" or None
 
 
 class Detector:
@@ -14,7 +28,9 @@ class Detector:
         target_height: int = 640,
         iou_threshold: float = 0.2,
         min_confidence: float = 0.5,
-        smoke_confidence: float = 0.75
+        smoke_confidence: float = 0.75,
+        backend: str = 'auto',
+        threads: int = 0
         ):
         """
         Initialize the FireDetector with a YOLO model.
@@ -24,16 +40,19 @@ class Detector:
             target_height (int): Target height for frame resizing
             iou_threshold (float): IOU threshold for non-maximum suppression
             min_confidence (float): Minimum confidence threshold for detections
+            backend (str): Inference backend: 'ultralytics', 'onnx', 'openvino'
+                or 'auto' to pick one from the model file
+            threads (int): CPU threads for the ONNX/OpenVINO backends, 0 for default
         """
         self.logger = logging.getLogger(__name__)
 
         try:
-            self.model = YOLO(str(model_path))
+            self.model = load_backend(model_path, backend, threads)
             self.target_height = target_height
             self.iou_threshold = iou_threshold
             self.min_confidence = min_confidence
             self.smoke_confidence = smoke_confidence
-            self.names = self.model.model.names
+            self.names = self.model.names
 
             # Define colors for different classes
             self.colors = {
@@ -61,6 +80,39 @@ class Detector:
         new_width = int(self.target_height * aspect_ratio)
         return cv2.resize(frame, (new_width, self.target_height))
 
+    def _blend_box(
+        self,
+        frame: np.ndarray,
+        box: Tuple[int, int, int, int],
+        color: Tuple[int, int, int],
+        alpha: float = 0.2
+    ) -> None:
+        """
+        Blend a translucent fill into the box region only.
+
+        Pixels outside the box are left untouched, so there is no need to
+        copy and blend the whole frame for every detection.
+
+        Args:
+            frame (np.ndarray): Frame, modified in place
+            box (tuple): Box coordinates [x1, y1, x2, y2]
+            color (tuple): BGR fill color
+            alpha (float): Opacity of the fill
+        """
+        x1, y1, x2, y2 = box
+        height, width = frame.shape[:2]
+
+        # Clip the same way cv2.rectangle does for a filled box
+        left, right = max(min(x1, x2), 0), min(max(x1, x2), width - 1)
+        top, bottom = max(min(y1, y2), 0), min(max(y1, y2), height - 1)
+        if left > right or top > bottom:
+            return
+
+        roi = frame[top:bottom + 1, left:right + 1]
+        fill = np.empty_like(roi)
+        fill[:] = color
+        cv2.addWeighted(fill, alpha, roi, 1 - alpha, 0, roi)
+
     def draw_detection(
         self,
         frame: np.ndarray,
@@ -94,11 +146,7 @@ class Detector:
             rect_y = y1
 
         # Draw semi-transparent background for box
-        overlay = frame.copy()
-        cv2.rectangle(overlay, (x1, y1), (x2, y2),
-                      color, -1)  # Filled rectangle
-        cv2.addWeighted(overlay, 0.2, frame, 0.8, 0,
-                        frame)  # Transparency effect
+        self._blend_box(frame, (x1, y1, x2, y2), color)
 
         # Draw box outline
         cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
@@ -134,6 +182,136 @@ class Detector:
             colorB=(0, 0, 0),  # Black border
         )
 
+    def _predict_batch(self, frames: List[np.ndarray]) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Run one batched forward pass.
+
+        The backend letterboxes each frame into its reusable input buffer and
+        returns boxes in the frame's own pixel coordinates.
+
+        Args:
+            frames (List[np.ndarray]): Input frames of any size
+
+        Returns:
+            list: One (boxes, class_ids, confidences) tuple per frame, each
+            sorted by descending confidence
+        """
+        predictions = []
+        for boxes, class_ids, confidences in self.model(
+                frames, iou=self.iou_threshold, conf=self.min_confidence):
+            # Sort detections by confidence
+            sort_idx = np.argsort(-confidences)  # Descending order
+            predictions.append(
+                (boxes[sort_idx], class_ids[sort_idx], confidences[sort_idx]))
+
+        return predictions
+
+    def classify(self, class_ids: np.ndarray, confidences: np.ndarray) -> Optional[str]:
+        """
+        Derive the overall detection status from sorted detections.
+
+        Args:
+            class_ids (np.ndarray): Class ids sorted by descending confidence
+            confidences (np.ndarray): Matching confidences
+
+        Returns:
+            Optional[str]: "Fire", "Smoke" or None
+        """
+        for class_id, confidence in zip(class_ids, confidences):
+            class_name = self.names[class_id].lower()
+            if class_name == "fire" and confidence >= self.min_confidence:
+                return "Fire"
+            if class_name == "smoke" and confidence >= self.smoke_confidence:
+                return "Smoke"
+        return None
+
+    def detect(self, frame: np.ndarray) -> Detections:
+        """
+        Detect fire and smoke without drawing anything on the frame.
+
+        Args:
+            frame (np.ndarray): Input frame of any size
+
+        Returns:
+            Detections: Boxes in the coordinates of the input frame, class ids,
+            confidences and the overall detection status
+        """
+        return self.detect_batch([frame])[0]
+
+    def detect_batch(self, frames: List[np.ndarray]) -> List[Detections]:
+        """
+        Batched variant of detect() that runs a single forward pass.
+
+        Args:
+            frames (List[np.ndarray]): Input frames of any size
+
+        Returns:
+            list: One Detections per input frame
+        """
+        if not frames:
+            return []
+
+        # Frames go to the backend at full size; it letterboxes them once
+        with STAGE_SECONDS.time(stage='inference'):
+            predictions = self._predict_batch(frames)
+        FRAMES.inc(len(frames))
+
+        outputs = []
+        for boxes, class_ids, confidences in predictions:
+            for class_id in class_ids:
+                DETECTIONS.inc(class_name=self.names[int(class_id)])
+            outputs.append(Detections(
+                boxes.astype(np.float32),
+                class_ids,
+                confidences.astype(np.float32),
+                self.classify(class_ids, confidences)
+            ))
+        return outputs
+
+    def annotate(self, frame: np.ndarray, detections: Detections) -> np.ndarray:
+        """
+        Render detections onto a resized copy of the frame.
+
+        Only needed when a consumer wants pixels (display, saved alerts,
+        streams); headless callers can use detect() alone.
+
+        Args:
+            frame (np.ndarray): Frame the detections were computed on
+            detections (Detections): Result of detect() for this frame
+
+        Returns:
+            np.ndarray: Resized frame with boxes, labels and status footer
+        """
+        with STAGE_SECONDS.time(stage='draw'):
+            annotated = self.resize_frame(frame)
+            scale = annotated.shape[0] / frame.shape[0]
+            self._render(annotated, detections.boxes * scale, detections.class_ids,
+                         detections.confidences, detections.detection)
+        return annotated
+
+    def draw_detections(
+        self,
+        frame: np.ndarray,
+        boxes: np.ndarray,
+        class_ids: np.ndarray,
+        confidences: np.ndarray
+    ) -> None:
+        """
+        Draw all detections of a frame in a single pass.
+
+        Fills are blended per box region in detection order, which gives the
+        same pixels as blending the full frame once per box without any
+        full-frame copies.
+
+        Args:
+            frame (np.ndarray): Frame, modified in place
+            boxes (np.ndarray): Detection boxes [x1, y1, x2, y2] in frame coordinates
+            class_ids (np.ndarray): Detection class ids
+            confidences (np.ndarray): Detection confidences
+        """
+        for box, class_id, confidence in zip(boxes.astype(int), class_ids, confidences):
+            self.draw_detection(frame, box, self.names[class_id], confidence)
+
     def process_frame(self, frame: np.ndarray) -> Tuple[np.ndarray, Optional[str]]:
         """
         Process a video frame to detect fire and smoke with enhanced visualization.
@@ -145,42 +323,53 @@ class Detector:
             tuple: (processed_frame, detection: str)
         """
         try:
-            frame = self.resize_frame(frame)
-            results = self.model(
-                frame, iou=self.iou_threshold, conf=self.min_confidence)
-            detection = None
+            detections = self.detect(frame)
+            return self.annotate(frame, detections), detections.detection
 
-            if results and len(results[0].boxes) > 0:
-                boxes = results[0].boxes.xyxy.cpu().numpy().astype(int)
-                class_ids = results[0].boxes.cls.cpu().numpy().astype(int)
-                confidences = results[0].boxes.conf.cpu().numpy()
+        except Exception as e:
+            self.logger.error(f"Error processing frame: {e}")
+            return frame, None
 
-                # Sort detections by confidence
-                sort_idx = np.argsort(-confidences)  # Descending order
-                boxes = boxes[sort_idx]
-                class_ids = class_ids[sort_idx]
-                confidences = confidences[sort_idx]
+    def process_batch(self, frames: List[np.ndarray]) -> List[Tuple[np.ndarray, Optional[str]]]:
+        """
+        Batched variant of process_frame() that runs a single forward pass.
 
-                for box, class_id, confidence in zip(boxes, class_ids, confidences):
-                    class_name = self.names[class_id]
+        Args:
+            frames (List[np.ndarray]): Input frames
 
-                    # Update overall detection status
-                    if detection is None:  # Only update if not already set
-                        if "fire" == class_name.lower() and confidence >= self.min_confidence:
-                            detection = "Fire"
-                        elif "smoke" == class_name.lower() and confidence >= self.smoke_confidence:
-                            detection = "Smoke"
+        Returns:
+            list: One (processed_frame, detection) tuple per input frame
+        """
+        try:
+            return [(self.annotate(frame, detections), detections.detection)
+                    for frame, detections in zip(frames, self.detect_batch(frames))]
 
-                    self.draw_detection(frame, box, class_name, confidence)
+        except Exception as e:
+            self.logger.error(f"Error processing batch: {e}")
+            return [(frame, None) for frame in frames]
 
-            # Add frame metadata
-            self._add_frame_info(frame, detection)
+    def _render(
+        self,
+        frame: np.ndarray,
+        boxes: np.ndarray,
+        class_ids: np.ndarray,
+        confidences: np.ndarray,
+        detection: Optional[str]
+    ) -> None:
+        """
+        Draw all detections and the status footer onto a resized frame.
 
-            return frame, detection
+        Args:
+            frame (np.ndarray): Resized frame, modified in place
+            boxes (np.ndarray): Detection boxes in frame coordinates
+            class_ids (np.ndarray): Detection class ids
+            confidences (np.ndarray): Detection confidences
+            detection (Optional[str]): Overall detection status
+        """
+        self.draw_detections(frame, boxes, class_ids, confidences)
 
-        except Exception as e:
-            self.logger.error(f"Error processing frame: {e}")
-            return frame, None
+        # Add frame metadata
+        self._add_frame_info(frame, detection)
 
     def _add_frame_info(self, frame: np.ndarray, detection: Optional[str]) -> None:
         """
@@ -0,0 +1,191 @@
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+import cv2
+
+try:
+    from .metrics import STAGE_SECONDS
+except ImportError:  # Imported as a top-level module by src/main.py
+    from metrics import STAGE_SECONDS
+
+# Camera states reported by the monitor
+CAMERA_OK = 'ok'
+CAMERA_IN_USE = 'in_use'          # Held by a running detection; not probed
+CAMERA_NO_FRAMES = 'no_frames'    # Opens but cannot capture
+CAMERA_UNAVAILABLE = 'unavailable'
+CAMERA_UNKNOWN = 'unknown'        # Not probed yet
+
+
+class HealthMonitor:
+    def __init__(
+        self,
+        model_path: Union[str, Path],
+        detector: Any = None,
+        batcher: Any = None,
+        camera_source: Union[int, str] = 0,
+        interval: float = 10.0,
+        camera_interval: float = 60.0,
+        camera_busy: Optional[Callable[[], bool]] = None,
+        max_queue_depth: int = 32,
+        max_inference_ms: float = 1000.0
+        ):
+        """
+        Background health checks with a cached result.
+
+        Every interval seconds a daemon thread checks the model file, the
+        resident detector, the batcher queue depth and the mean inference
+        latency since the previous check (from the metrics registry). The
+        camera is probed less often, every camera_interval seconds, and not
+        at all while camera_busy() reports it is in use, so health checks
+        never compete with a running detection for the device. Requests
+        read the cached snapshot and never touch hardware.
+
+        Args:
+            model_path (Union[str, Path]): Model weights that should exist
+            detector: Resident Detector, None if it failed to load
+            batcher: MicroBatcher in front of the detector, if any
+            camera_source (Union[int, str]): Camera index (or video path) to probe
+            interval (float): Seconds between checks
+            camera_interval (float): Seconds between camera probes
+            camera_busy (Optional[Callable[[], bool]]): True while a detection
+                is using the camera
+            max_queue_depth (int): Queue depth above which health is degraded
+            max_inference_ms (float): Mean latency above which health is degraded
+        """
+        self.logger = logging.getLogger(__name__)
+        self.model_path = Path(model_path)
+        self.detector = detector
+        self.batcher = batcher
+        self.camera_source = camera_source
+        self.interval = interval
+        self.camera_interval = camera_interval
+        self.camera_busy = camera_busy
+        self.max_queue_depth = max_queue_depth
+        self.max_inference_ms = max_inference_ms
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._camera = CAMERA_UNKNOWN
+        self._camera_checked = 0.0
+        self._inference = (STAGE_SECONDS.total(stage='inference'),
+                           STAGE_SECONDS.count(stage='inference'))
+        self._inference_ms: Optional[float] = None
+        self._snapshot: Dict[str, Any] = {}
+        self._updated = 0.0
+        self.checks = 0
+
+    def start(self) -> 'HealthMonitor':
+        """Run a first check now and keep checking in the background"""
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self.refresh(probe_camera=False)
+        self._thread = threading.Thread(target=self._run, daemon=True, name='health-monitor')
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                self.logger.error(f"Health check failed: {e}")
+            self._stop.wait(self.interval)
+
+    def probe_camera(self) -> str:
+        """Open the camera and read one frame"""
+        capture = cv2.VideoCapture(self.camera_source)
+        try:
+            if not capture.isOpened():
+                return CAMERA_UNAVAILABLE
+            ret, _ = capture.read()
+            return CAMERA_OK if ret else CAMERA_NO_FRAMES
+        finally:
+            capture.release()
+
+    def _update_latency(self) -> None:
+        total = STAGE_SECONDS.total(stage='inference')
+        count = STAGE_SECONDS.count(stage='inference')
+        last_total, last_count = self._inference
+        if count > last_count:
+            self._inference_ms = (total - last_total) / (count - last_count) * 1000
+        self._inference = (total, count)
+
+    def refresh(self, probe_camera: bool = True) -> Dict[str, Any]:
+        """
+        Run the checks and replace the cached snapshot.
+
+        Args:
+            probe_camera (bool): Probe the camera if its interval has elapsed
+
+        Returns:
+            Dict[str, Any]: The new snapshot
+        """
+        now = time.time()
+        if probe_camera:
+            if self.camera_busy is not None and self.camera_busy():
+                self._camera = CAMERA_IN_USE
+            elif (self._camera in (CAMERA_UNKNOWN, CAMERA_IN_USE)
+                  or now - self._camera_checked >= self.camera_interval):
+                self._camera = self.probe_camera()
+                self._camera_checked = now
+        self._update_latency()
+
+        queue_depth = self.batcher.queue_depth if self.batcher is not None else 0
+        model_available = self.model_path.exists()
+        camera_accessible = self._camera in (CAMERA_OK, CAMERA_IN_USE)
+        problems = []
+        if not model_available:
+            problems.append('model file missing')
+        if self.detector is None:
+            problems.append('detector not loaded')
+        if self._camera in (CAMERA_NO_FRAMES, CAMERA_UNAVAILABLE):
+            problems.append('camera not accessible')
+        if queue_depth > self.max_queue_depth:
+            problems.append('inference queue backed up')
+        if self._inference_ms is not None and self._inference_ms > self.max_inference_ms:
+            problems.append('inference slow')
+
+        snapshot = {
+            'status': 'degraded' if problems else 'healthy',
+            'backend': 'running',
+            'problems': problems,
+            'model_available': model_available,
+            'detector_loaded': self.detector is not None,
+            'camera': self._camera,
+            'camera_accessible': camera_accessible,
+            'camera_checked_at': self._camera_checked or None,
+            'inference_ms': None if self._inference_ms is None else round(self._inference_ms, 2),
+            'queue_depth': queue_depth,
+            'timestamp': now,
+        }
+        with self._lock:
+            self._snapshot = snapshot
+            self._updated = time.monotonic()
+            self.checks += 1
+        return snapshot
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Cached result of the last check.
+
+        A snapshot older than three intervals means the monitor stopped, and
+        is reported as unhealthy.
+        """
+        with self._lock:
+            snapshot = dict(self._snapshot)
+            age = time.monotonic() - self._updated
+        snapshot['age_seconds'] = round(age, 3)
+        if not self._updated or age > 3 * self.interval:
+            snapshot['status'] = 'unhealthy'
+        return snapshot
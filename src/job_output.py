@@ -0,0 +1,177 @@
+import json
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+CONTENT_TYPE = 'text/event-stream'
+
+# Longest output line kept; longer lines are truncated
+MAX_LINE_LENGTH = 1000
+
+ANSI_ESCAPE = re.compile(r'\x1b\[[0-9;]*[A-Za-z]')
+
+# Per-frame line printed by `yolo predict`, e.g.
+#   video 1/1 (frame 12/300) /data/cam.mp4: 384x640 1 Fire, 2 Smokes, 45.2ms
+#   image 1/3 /data/house.png: 480x640 (no detections), 12.0ms
+#   0: 480x640 1 Smoke, 30.1ms  (camera streams)
+RESULT_LINE = re.compile(
+    r'^(?:(?:video|image) \d+/\d+ (?:\(frame (?P<frame>\d+)/(?P<frames>\d+)\) )?(?P<path>.+?)'
+    r'|(?P<stream>\d+)): (?P<height>\d+)x(?P<width>\d+) (?P<objects>.*), (?P<ms>[\d.]+)ms$'
+)
+OBJECT_COUNT = re.compile(r'^(?P<count>\d+) (?P<name>.+)$')
+
+
+def parse_result(line: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse a per-frame result line of `yolo predict`.
+
+    Args:
+        line (str): Output line without ANSI colors
+
+    Returns:
+        Optional[Dict[str, Any]]: Source, frame number (None for camera
+            streams), frame count, shape [height, width], detections per
+            class and inference time, or None if the line is not a result
+    """
+    match = RESULT_LINE.match(line)
+    if match is None:
+        return None
+
+    detections = {}
+    if match['objects'] != '(no detections)':
+        for part in match['objects'].split(', '):
+            count = OBJECT_COUNT.match(part)
+            if count is None:
+                return None
+            name, number = count['name'], int(count['count'])
+            # yolo pluralizes class names ("2 Smokes")
+            if number > 1 and name.endswith('s'):
+                name = name[:-1]
+            detections[name] = number
+
+    return {
+        'source': match['path'] if match['stream'] is None else int(match['stream']),
+        'frame': int(match['frame']) if match['frame'] else None,
+        'frames': int(match['frames']) if match['frames'] else None,
+        'shape': [int(match['height']), int(match['width'])],
+        'detections': detections,
+        'inference_ms': float(match['ms'])
+    }
+
+
+class JobOutput:
+    def __init__(self, maxlen: int = 1000, keepalive: float = 15.0):
+        """
+        Output of one detection job as a stream of numbered events.
+
+        Every output line becomes a 'log' event, and per-frame detection
+        results are parsed into 'result' events; an 'end' event with the
+        job's final record closes the stream. Only the last maxlen events are
+        kept, so memory stays constant however long the job runs, and a
+        client that (re)connects is sent what is still buffered after the
+        last event id it saw.
+
+        Args:
+            maxlen (int): Events kept for late joiners
+            keepalive (float): Seconds between keepalive comments on an idle
+                event stream
+        """
+        self.keepalive = keepalive
+        self._events: Deque[Tuple[int, str, str]] = deque(maxlen=maxlen)
+        self._cond = threading.Condition()
+        self._last_id = 0
+        self.closed = False
+
+        self.lines = 0
+        self.results = 0
+        self.detections: Dict[str, int] = {}
+        self.last_result: Optional[Dict[str, Any]] = None
+
+    def append(self, event: str, data: Dict[str, Any]) -> int:
+        """Add an event, returning its id"""
+        payload = json.dumps(data)
+        with self._cond:
+            self._last_id += 1
+            self._events.append((self._last_id, event, payload))
+            self._cond.notify_all()
+            return self._last_id
+
+    def append_line(self, line: str) -> None:
+        """Add an output line of the job, and its result if it has one"""
+        line = ANSI_ESCAPE.sub('', line.rstrip())[:MAX_LINE_LENGTH]
+        if not line:
+            return
+        now = time.time()
+        self.lines += 1
+        self.append('log', {'line': line, 'time': now})
+
+        result = parse_result(line)
+        if result is not None:
+            self.results += 1
+            if result['frame'] is None:
+                result['frame'] = self.results
+            for name, count in result['detections'].items():
+                self.detections[name] = self.detections.get(name, 0) + count
+            result['time'] = now
+            self.last_result = result
+            self.append('result', result)
+
+    def close(self, record: Optional[Dict[str, Any]] = None) -> None:
+        """End the stream with the job's final record"""
+        with self._cond:
+            if self.closed:
+                return
+            self.append('end', record or {})
+            self.closed = True
+            self._cond.notify_all()
+
+    def since(self, after: int) -> List[Tuple[int, str, str]]:
+        """Buffered events with ids greater than after"""
+        with self._cond:
+            return [event for event in self._events if event[0] > after]
+
+    def wait(self, after: int, timeout: Optional[float] = None) -> List[Tuple[int, str, str]]:
+        """Wait for events newer than after, returning them (empty on timeout)"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._last_id > after or self.closed, timeout)
+            return [event for event in self._events if event[0] > after]
+
+    def events(self, after: int = 0) -> Iterator[bytes]:
+        """
+        Server-Sent Events body starting after event id after.
+
+        Ends after the 'end' event; sends a 'gap' event first if events the
+        client has not seen were already dropped from the buffer.
+        """
+        with self._cond:
+            first = self._events[0][0] if self._events else self._last_id + 1
+        if after < first - 1:
+            yield f'event: gap\ndata: {json.dumps({"missed": first - 1 - after})}\n\n'.encode()
+
+        while True:
+            events = self.wait(after, self.keepalive)
+            if not events:
+                if self.closed:
+                    return
+                yield b': keepalive\n\n'
+                continue
+            for event_id, event, payload in events:
+                yield f'id: {event_id}\nevent: {event}\ndata: {payload}\n\n'.encode()
+                after = event_id
+                if event == 'end':
+                    return
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            buffered = len(self._events)
+            last_id = self._last_id
+        return {
+            'lines': self.lines,
+            'results': self.results,
+            'detections': dict(self.detections),
+            'last_result': self.last_result,
+            'last_event_id': last_id,
+            'buffered_events': buffered
+        }
@@ -0,0 +1,162 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: locking is per process only
+    fcntl = None
+
+
+def pid_alive(pid: int) -> bool:
+    """Whether a process exists (it may be a child not reaped yet)"""
+    if os.name == 'nt':
+        # os.kill() terminates processes on Windows; records are updated by
+        # their owner when the job exits instead
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobRegistry:
+    def __init__(self, directory: Path):
+        """
+        Detection jobs shared by every worker process on the host.
+
+        Each job is a small JSON file named after the job, written atomically
+        (temp file + os.replace) under a lock shared by all workers, so any
+        gunicorn worker can list or stop a job another worker started without
+        updates overwriting each other. Records stay after the job ends, with its
+        status and exit code, until removed. The worker that started a job
+        records its exit; if that worker is gone too, a running record whose
+        process no longer exists is marked as exited when read.
+
+        Args:
+            directory (Path): Directory holding one file per job
+        """
+        self.logger = logging.getLogger(__name__)
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._lock_depth = 0
+        self._lock_path = self.directory / '.lock'
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """Exclusive lock across threads and worker processes, reentrant"""
+        with self._lock:
+            self._lock_depth += 1
+            try:
+                # flock() on a second descriptor would wait for ourselves
+                if fcntl is None or self._lock_depth > 1:
+                    yield
+                    return
+                with open(self._lock_path, 'a') as lock_file:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                    try:
+                        yield
+                    finally:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+            finally:
+                self._lock_depth -= 1
+
+    def _path(self, name: str) -> Path:
+        if not name or '/' in name or '\\' in name or name.startswith('.'):
+            raise ValueError(f"Invalid job name: {name!r}")
+        return self.directory / f'{name}.json'
+
+    def _read(self, name: str) -> Optional[Dict[str, Any]]:
+        # Invalid names raise ValueError rather than reading as unknown jobs
+        path = self._path(name)
+        try:
+            return json.loads(path.read_text(encoding='utf-8'))
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        path = self._path(record['name'])
+        tmp_path = path.with_name(f'.{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+        tmp_path.write_text(json.dumps(record), encoding='utf-8')
+        os.replace(tmp_path, path)
+
+    def register(self, name: str, pid: int, **info: Any) -> Dict[str, Any]:
+        """
+        Record a running job, replacing any record of the same name.
+
+        Args:
+            name (str): Job name
+            pid (int): Process id of the job
+            **info: Extra JSON-serializable fields, e.g. the command
+
+        Returns:
+            Dict[str, Any]: The stored record
+        """
+        record = {'name': name, 'pid': pid, 'owner': os.getpid(), 'status': 'running',
+                  'started_at': time.time(), **info}
+        with self.lock():
+            self._write(record)
+        return record
+
+    def update(self, name: str, **fields: Any) -> Optional[Dict[str, Any]]:
+        """Change fields of a record, returning it (None if it does not exist)"""
+        with self.lock():
+            record = self._read(name)
+            if record is None:
+                return None
+            record.update(fields)
+            self._write(record)
+            return record
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        """Record of a job, or None"""
+        record = self._read(name)
+        if (record is not None and record['status'] == 'running'
+                and not pid_alive(record['pid']) and not pid_alive(record['owner'])):
+            # A live owner records the exit itself; this one is gone
+            record = self.update(name, status='exited', returncode=None,
+                                 ended_at=time.time()) or record
+        return record
+
+    def running(self, name: str) -> Optional[Dict[str, Any]]:
+        """Record of a job if it is still running, or None"""
+        record = self.get(name)
+        return record if record is not None and record['status'] == 'running' else None
+
+    def remove(self, name: str, pid: Optional[int] = None) -> None:
+        """
+        Forget a job.
+
+        Args:
+            name (str): Job name
+            pid (Optional[int]): Only remove the record if it still belongs
+                to this process, so a finished job cannot remove its successor
+        """
+        path = self._path(name)
+        with self.lock():
+            if pid is not None:
+                record = self._read(name)
+                if record is None or record['pid'] != pid:
+                    return
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def jobs(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Records of all jobs, oldest first, optionally only those with a status"""
+        records = []
+        for path in self.directory.glob('*.json'):
+            record = self.get(path.stem)
+            if record is not None and (status is None or record['status'] == status):
+                records.append(record)
+        return sorted(records, key=lambda record: record['started_at'])
@@ -0,0 +1,277 @@
+import logging
+import os
+import signal
+import subprocess
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    from .job_output import JobOutput
+    from .job_registry import JobRegistry
+except ImportError:  # Imported as a top-level module by src/main.py
+    from job_output import JobOutput
+    from job_registry import JobRegistry
+
+# Thread pool sizes honoured by torch, OpenMP and the BLAS libraries
+THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS')
+
+
+class JobLimitError(RuntimeError):
+    """Raised when starting a job would exceed the concurrency cap"""
+
+
+def _available_cpus() -> List[int]:
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+class JobManager:
+    def __init__(
+        self,
+        registry: JobRegistry,
+        max_jobs: int = 2,
+        threads_per_job: int = 0,
+        stop_timeout: float = 10.0,
+        history: int = 20,
+        output_events: int = 1000
+        ):
+        """
+        Start, track and stop detection subprocesses.
+
+        Every job gets a unique id and a record in the shared JobRegistry, so
+        the cap of max_jobs running jobs holds across all worker processes and
+        any worker can stop any job. Each job is limited to threads_per_job
+        CPU threads (through the OpenMP/BLAS environment variables) and, on
+        Linux, pinned to its own set of cores, so parallel jobs do not fight
+        over the CPU.
+
+        Jobs run in their own process group. Stopping sends SIGTERM to the
+        group, waits up to stop_timeout seconds and then sends SIGKILL. A
+        watcher thread per job reads its output line by line into a bounded
+        JobOutput, which clients can follow as it is produced, and reaps the
+        process as soon as it exits, so no zombies are left behind.
+
+        Args:
+            registry (JobRegistry): Shared job records
+            max_jobs (int): Jobs allowed to run at once on this host
+            threads_per_job (int): CPU threads per job, 0 splits the cores
+                evenly between max_jobs jobs
+            stop_timeout (float): Seconds to wait after SIGTERM before SIGKILL
+            history (int): Finished jobs to keep records and output of
+            output_events (int): Output events buffered per job
+        """
+        self.logger = logging.getLogger(__name__)
+        self.registry = registry
+        self.max_jobs = max_jobs
+        self.cpus = _available_cpus()
+        self.threads_per_job = threads_per_job or max(1, len(self.cpus) // max_jobs)
+        self.stop_timeout = stop_timeout
+        self.history = history
+        self.output_events = output_events
+
+        self._lock = threading.Lock()
+        self._processes: Dict[str, subprocess.Popen] = {}
+        self._watchers: Dict[str, threading.Thread] = {}
+        self._outputs: Dict[str, JobOutput] = {}
+
+    def _cpu_set(self, slot: int) -> List[int]:
+        """Cores for the job in a slot; slots get disjoint sets while cores last"""
+        count = min(self.threads_per_job, len(self.cpus))
+        start = slot * count
+        return [self.cpus[(start + i) % len(self.cpus)] for i in range(count)]
+
+    def start(self, command: Sequence[str], **info: Any) -> Dict[str, Any]:
+        """
+        Start a job.
+
+        Args:
+            command (Sequence[str]): Command line to run
+            **info: Extra JSON-serializable fields stored with the job
+
+        Returns:
+            Dict[str, Any]: The job's record
+
+        Raises:
+            JobLimitError: If max_jobs jobs are already running
+        """
+        env = os.environ.copy()
+        for var in THREAD_ENV_VARS:
+            env[var] = str(self.threads_per_job)
+        # Line by line through the pipe, not in 8 KB blocks
+        env['PYTHONUNBUFFERED'] = '1'
+
+        with self.registry.lock():
+            running = self.registry.jobs('running')
+            if len(running) >= self.max_jobs:
+                raise JobLimitError(f"{len(running)} of {self.max_jobs} jobs already running")
+            taken = {record.get('slot') for record in running}
+            slot = next(i for i in range(self.max_jobs + 1) if i not in taken)
+
+            process = subprocess.Popen(
+                list(command),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                errors='replace',
+                bufsize=1,
+                env=env,
+                # Own process group, so stopping reaches the job's children too
+                start_new_session=os.name != 'nt'
+            )
+            cpus = None
+            if hasattr(os, 'sched_setaffinity'):
+                cpus = self._cpu_set(slot)
+                try:
+                    os.sched_setaffinity(process.pid, cpus)
+                except OSError:
+                    cpus = None
+
+            job_id = uuid.uuid4().hex[:12]
+            record = self.registry.register(
+                job_id, process.pid, command=list(command), slot=slot,
+                threads=self.threads_per_job, cpus=cpus, **info)
+
+        watcher = threading.Thread(target=self._watch, args=(job_id, process),
+                                   daemon=True, name=f'job-{job_id}')
+        with self._lock:
+            self._processes[job_id] = process
+            self._watchers[job_id] = watcher
+            self._outputs[job_id] = JobOutput(self.output_events)
+        watcher.start()
+        self.logger.info(f"Started job {job_id} (pid {process.pid}): {' '.join(command)}")
+        self._prune()
+        return record
+
+    def _drain(self, job_id: str, process: subprocess.Popen) -> None:
+        """Feed the job's output to its JobOutput as each line arrives"""
+        output = self.output(job_id)
+        for line in process.stdout:
+            self.logger.debug(f"[{job_id}] {line.rstrip()}")
+            output.append_line(line)
+
+    def _watch(self, job_id: str, process: subprocess.Popen) -> None:
+        try:
+            self._drain(job_id, process)
+        except Exception as e:
+            self.logger.error(f"Reading output of job {job_id} failed: {e}")
+        finally:
+            process.stdout.close()
+            # Reap the process as soon as it exits
+            returncode = process.wait()
+
+        # Locked so a stop request from another worker is not lost
+        with self.registry.lock():
+            record = self.registry.get(job_id) or {}
+            if record.get('stop_requested'):
+                status = 'stopped'
+            else:
+                status = 'completed' if returncode == 0 else 'failed'
+            record = self.registry.update(job_id, status=status, returncode=returncode,
+                                          ended_at=time.time())
+        self.output(job_id).close(record)
+        self.logger.info(f"Job {job_id} {status} (exit code {returncode})")
+        with self._lock:
+            self._processes.pop(job_id, None)
+            self._watchers.pop(job_id, None)
+
+    def _signal(self, record: Dict[str, Any], sig: int) -> None:
+        with self._lock:
+            process = self._processes.get(record['name'])
+        try:
+            if os.name == 'nt':
+                # No process groups or cross-process signals; only local jobs
+                if process is not None:
+                    process.terminate()
+                return
+            os.killpg(record['pid'], sig)
+        except ProcessLookupError:
+            pass
+
+    def _wait(self, job_id: str, timeout: float) -> bool:
+        """Wait until a job is no longer running, True if it stopped in time"""
+        with self._lock:
+            watcher = self._watchers.get(job_id)
+        if watcher is not None:
+            watcher.join(timeout)
+            return not watcher.is_alive()
+
+        # Started by another worker, which records the exit
+        deadline = time.monotonic() + timeout
+        while self.registry.running(job_id) is not None:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.1)
+        return True
+
+    def stop(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Stop a job gracefully, killing it if it does not exit in time.
+
+        Args:
+            job_id (str): Job id
+            timeout (Optional[float]): Seconds between SIGTERM and SIGKILL,
+                defaults to stop_timeout
+
+        Returns:
+            Optional[Dict[str, Any]]: The job's final record, None if unknown
+        """
+        timeout = self.stop_timeout if timeout is None else timeout
+        record = self.registry.running(job_id)
+        if record is None:
+            return self.registry.get(job_id)
+
+        self.registry.update(job_id, stop_requested=True)
+        self._signal(record, signal.SIGTERM)
+        if not self._wait(job_id, timeout):
+            self.logger.warning(f"Job {job_id} ignored SIGTERM, killing it")
+            self._signal(record, getattr(signal, 'SIGKILL', signal.SIGTERM))
+            self._wait(job_id, 5.0)
+        return self.registry.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.registry.get(job_id)
+
+    def output(self, job_id: str) -> Optional[JobOutput]:
+        """Output of a job started by this process, or None"""
+        with self._lock:
+            return self._outputs.get(job_id)
+
+    def jobs(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self.registry.jobs(status)
+
+    def running(self) -> List[Dict[str, Any]]:
+        return self.registry.jobs('running')
+
+    def _prune(self) -> None:
+        """Forget the oldest finished jobs beyond the history size"""
+        records = self.registry.jobs()
+        finished = [record for record in records if record['status'] != 'running']
+        pruned = finished[:max(0, len(finished) - self.history)]
+        for record in pruned:
+            self.registry.remove(record['name'], record['pid'])
+
+        # Output goes with the record, whichever worker pruned it
+        kept = {record['name'] for record in records} - {record['name'] for record in pruned}
+        with self._lock:
+            for job_id in [job_id for job_id, output in self._outputs.items()
+                           if output.closed and job_id not in kept]:
+                del self._outputs[job_id]
+
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        """Stop every job started by this process, e.g. when the worker exits"""
+        timeout = self.stop_timeout if timeout is None else timeout
+        with self._lock:
+            job_ids = list(self._processes)
+        records = [record for record in map(self.registry.running, job_ids) if record]
+        for record in records:
+            self.registry.update(record['name'], stop_requested=True)
+            self._signal(record, signal.SIGTERM)
+
+        deadline = time.monotonic() + timeout
+        for record in records:
+            if not self._wait(record['name'], max(0.0, deadline - time.monotonic())):
+                self._signal(record, getattr(signal, 'SIGKILL', signal.SIGTERM))
+                self._wait(record['name'], 5.0)
@@ -4,7 +4,93 @@ import sys
 from pathlib import Path
 from config import Config, setup_logging
 from fire_detector import Detector
-import time
+from pipeline import FramePipeline
+from multi_stream import MultiStreamMonitor
+from motion import MotionGate
+from tracker import DetectionTracker
+from alert_policy import AlertPolicy
+from metrics import ALERTS, STAGE_SECONDS, start_http_server
+from notification_service import NotificationService
+
+
+def save_alert(logger, notifier, frame, detection, prefix="alert", reason="new"):
+    """Hand an annotated alert frame to the background notification service"""
+    if reason == "escalation":
+        logger.warning(f"🐦‍🔥 Smoke escalated to {detection}!")
+    else:
+        logger.warning(f"🐦‍🔥 {detection} Detected!")
+    ALERTS.inc(detection=detection)
+    # Saving, uploading and messaging happen off the frame loop
+    notifier.submit_alert(frame, detection, prefix=prefix)
+
+
+def make_gate():
+    """Build a motion gate from configuration"""
+    return MotionGate(infer_every=Config.INFER_EVERY_N,
+                      motion_threshold=Config.MOTION_THRESHOLD)
+
+
+def make_policy(detector):
+    """Build the alert policy shared by all streams from configuration"""
+    return AlertPolicy(camera_cooldown=Config.ALERT_COOLDOWN,
+                       camera_burst=Config.ALERT_BURST,
+                       class_cooldown=Config.ALERT_CLASS_COOLDOWN,
+                       dedup_iou=Config.ALERT_DEDUP_IOU,
+                       dedup_window=Config.ALERT_DEDUP_WINDOW,
+                       escalation=Config.ALERT_ESCALATION,
+                       names=detector.names)
+
+
+def make_tracker(detector):
+    """Build a detection tracker from configuration"""
+    return DetectionTracker(detector.classify,
+                            confirm_hits=Config.TRACK_CONFIRM_HITS,
+                            window=Config.TRACK_WINDOW)
+
+
+def monitor_streams(detector, notifier, policy, logger):
+    """Serve every configured source from one process and one shared model"""
+    monitor = MultiStreamMonitor(
+        Config.VIDEO_SOURCES, detector.detect_batch,
+        max_batch_size=Config.STREAM_BATCH_SIZE,
+        gate_factory=make_gate if Config.MOTION_GATING else None,
+        tracker_factory=(lambda: make_tracker(detector)) if Config.TRACKING else None
+    )
+    logger.info(f"Monitoring {len(monitor.readers)} streams: {Config.VIDEO_SOURCES}")
+    monitor.start()
+    try:
+        for reader, frame, detections in monitor:
+            processed_frame = None
+            if not Config.HEADLESS:
+                processed_frame = detector.annotate(frame, detections)
+
+            # One policy holds the rate limits and last alert of every stream
+            decision = policy.evaluate(reader.name, detections)
+            if decision:
+                if processed_frame is None:
+                    processed_frame = detector.annotate(frame, detections)
+                save_alert(logger, notifier, processed_frame, decision.detection,
+                           prefix=f"alert_{reader.name}", reason=decision.reason)
+
+            if Config.HEADLESS:
+                continue
+
+            with STAGE_SECONDS.time(stage='display'):
+                cv2.imshow(f"Fire Detection System - {reader.name}", processed_frame)
+                key = cv2.waitKey(1) & 0xFF
+            if key == ord("q"):
+                logger.info("🛑 User initiated shutdown")
+                break
+        else:
+            logger.info("✅ All streams completed")
+    finally:
+        monitor.stop()
+        for reader in monitor.readers:
+            logger.info(f"{reader.name}: frames read {reader.frames_read}, "
+                        f"dropped {reader.frames_dropped}")
+            if reader.gate is not None:
+                logger.info(f"{reader.name}: inferred {reader.gate.frames_inferred}"
+                            f"/{reader.gate.frames_seen} frames")
 
 
 def main():
@@ -17,59 +103,105 @@ def main():
         # Validate configuration        # Config.validate()
         logger.debug("Configuration validation successful")
 
+        if Config.METRICS_PORT:
+            start_http_server(Config.METRICS_PORT)
+
         # Initialize detection components
-        detector = Detector(Config.MODEL_PATH, iou_threshold=0.20)
-        logger.info(f"Loaded detection model: {Config.MODEL_PATH.name}")
+        detector = Detector(Config.MODEL_PATH, iou_threshold=0.20,
+                            backend=Config.INFERENCE_BACKEND,
+                            threads=Config.INFERENCE_THREADS)
+        logger.info(f"Loaded detection model: {Config.MODEL_PATH.name} "
+                    f"({type(detector.model).__name__})")
+        notifier = NotificationService(Config)
+        policy = make_policy(detector)
+
+        if len(Config.VIDEO_SOURCES) > 1:
+            monitor_streams(detector, notifier, policy, logger)
+            return
 
         # Video processing setup
-        cap = cv2.VideoCapture(str(Config.VIDEO_SOURCE))
+        source = Config.VIDEO_SOURCES[0]
+        cap = cv2.VideoCapture(source if isinstance(source, int) else str(source))
         # cap = cv2.VideoCapture(0) # for webcam
         if not cap.isOpened():
-            logger.error(f"Failed to open video source: {Config.VIDEO_SOURCE}")
+            logger.error(f"Failed to open video source: {source}")
             sys.exit(1)
-        logger.info(f"Processing video source: {Config.VIDEO_SOURCE}")
-
-        # State management
-        alert_cooldown = Config.ALERT_COOLDOWN  # Seconds between alerts
-        last_alert_time = 0
-
-        next_detection_to_report = "any"  # "Fire" or "Smoke"
-        # Main processing loop
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                logger.info("✅ Video processing completed")
-                break
+        logger.info(f"Processing video source: {source}")
+
+        # Capture and inference run on their own threads; this loop is the
+        # output stage. Live cameras drop stale frames, files are read in full
+        drop_policy = Config.FRAME_DROP_POLICY
+        if drop_policy == "auto":
+            drop_policy = "block" if Path(str(source)).is_file() else "oldest"
+        detect_fn = detector.detect
+        if Config.MOTION_GATING:
+            gate = make_gate()
+            detect_fn = gate.wrap(detector.detect)
+            logger.info(f"Motion gating enabled (infer every {gate.infer_every} frames "
+                        f"unless motion is detected)")
+        if Config.TRACKING:
+            # Alerts use confirmed tracks; skipped frames are interpolated
+            tracker = make_tracker(detector)
+            detect_fn = tracker.wrap(
+                detector.detect, gate.should_infer if Config.MOTION_GATING else None)
+            logger.info(f"Tracking enabled (confirm after {tracker.confirm_hits} "
+                        f"of {tracker.window} detections)")
+        pipeline = FramePipeline(
+            cap, detect_fn,
+            queue_size=Config.PIPELINE_QUEUE_SIZE,
+            drop_policy=drop_policy
+        ).start()
+        logger.info(f"Frame pipeline started (drop policy: {drop_policy})")
+
+        # Main processing loop; overlays are only drawn when pixels are needed
+        for frame, detections in pipeline:
+            processed_frame = None
+            if not Config.HEADLESS:
+                processed_frame = detector.annotate(frame, detections)
+
+            # Alert logic with rate limits, deduplication and escalation
+            decision = policy.evaluate("main", detections)
+            if decision:
+                if processed_frame is None:
+                    processed_frame = detector.annotate(frame, detections)
+                save_alert(logger, notifier, processed_frame, decision.detection,
+                           reason=decision.reason)
 
-            # Detection pipeline
-            processed_frame, detection = detector.process_frame(frame)            # Alert logic with cooldown
-            if detection:
-                current_time = time.time()
-                if (next_detection_to_report == "any" or detection == next_detection_to_report) \
-                        and (current_time - last_alert_time) > alert_cooldown:
-                    logger.warning(f"🐦‍🔥 {detection} Detected!")
-                    # Save detection frame for reference
-                    timestamp = time.strftime("%Y%m%d-%H%M%S")
-                    filename = Config.DETECTED_FIRES_DIR / f'alert_{timestamp}.jpg'
-                    cv2.imwrite(str(filename), processed_frame)
-                    logger.info(f"Detection saved to: {filename}")
-                    last_alert_time = current_time
-                    next_detection_to_report = "Smoke" if detection == "Fire" else "Fire"
+            if Config.HEADLESS:
+                continue
 
             # Display output
-            cv2.imshow("Fire Detection System", processed_frame)
-            if cv2.waitKey(1) & 0xFF == ord("q"):
+            with STAGE_SECONDS.time(stage='display'):
+                cv2.imshow("Fire Detection System", processed_frame)
+                key = cv2.waitKey(1) & 0xFF
+            if key == ord("q"):
                 logger.info("🛑 User initiated shutdown")
                 break
+        else:
+            logger.info("✅ Video processing completed")
 
     except Exception as e:
         logger.critical(f"🚨 Critical system failure: {str(e)}")
         sys.exit(1)
     finally:
         # Cleanup resources
+        if 'pipeline' in locals():
+            pipeline.stop()
+            logger.info(f"Frames read: {pipeline.frames_read}, "
+                        f"processed: {pipeline.frames_processed}, "
+                        f"dropped: {pipeline.frames_dropped}")
+        if 'gate' in locals():
+            logger.info(f"Motion gate inferred {gate.frames_inferred}/{gate.frames_seen} frames")
         if 'cap' in locals():
             cap.release()
-        cv2.destroyAllWindows()
+        if 'notifier' in locals():
+            # Let queued alerts finish before exiting
+            notifier.cleanup()
+            logger.info(f"Alerts: {notifier.stats()}")
+        if 'policy' in locals():
+            logger.info(f"Alert policy: {policy.stats()}")
+        if not Config.HEADLESS:
+            cv2.destroyAllWindows()
         logger.info("🛑 System shutdown complete")
 
 
@@ -0,0 +1,437 @@
+"""
+Minimal in-process metrics with Prometheus text exposition.
+
+The detector, pipeline and alert loop record into the module-level REGISTRY;
+app.py serves it on /metrics and src/main.py can expose it on METRICS_PORT.
+Under gunicorn every worker has its own REGISTRY, so SharedMetrics writes
+each worker's values to a shared directory and /metrics reports the sum.
+"""
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    from .job_registry import pid_alive
+except ImportError:  # Imported as a top-level module by src/main.py
+    from job_registry import pid_alive
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds; covers a fast resize up to a slow CPU forward pass
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._init_values()
+
+    def _init_values(self) -> None:
+        if not self.labelnames and self.kind in ('counter', 'gauge'):
+            # Unlabelled series exist from the start so scrapes see a 0
+            self._values[()] = 0
+
+    def reset(self) -> None:
+        """Forget all recorded values"""
+        with self._lock:
+            self._values.clear()
+            self._init_values()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Definition and values of the metric, JSON serializable"""
+        with self._lock:
+            values = [[list(key), self._copy(value)] for key, value in self._values.items()]
+        return {'kind': self.kind, 'documentation': self.documentation,
+                'labelnames': list(self.labelnames), 'values': values}
+
+    def _copy(self, value: Any) -> Any:
+        return value
+
+    def merge(self, key: Tuple[str, ...], value: Any) -> None:
+        """Add a series value from another process's snapshot"""
+        raise NotImplementedError
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            lines.extend(self._samples())
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, e.g. frames processed"""
+
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def merge(self, key: Tuple[str, ...], value: float) -> None:
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def _samples(self) -> Iterator[str]:
+        for key, value in sorted(self._values.items()):
+            labels = _format_labels(dict(zip(self.labelnames, key)))
+            yield f'{self.name}_total{labels} {_format_value(value)}'
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, e.g. a queue depth"""
+
+    kind = 'gauge'
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def merge(self, key: Tuple[str, ...], value: float) -> None:
+        with self._lock:
+            self._values[key] = value
+
+    def _samples(self) -> Iterator[str]:
+        for key, value in sorted(self._values.items()):
+            labels = _format_labels(dict(zip(self.labelnames, key)))
+            yield f'{self.name}{labels} {_format_value(value)}'
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets, e.g. stage latency"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket counts (last one is +Inf), sum, count
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Observe the wall time of the enclosed block in seconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return state[2] if state else 0
+
+    def total(self, **labels) -> float:
+        """Sum of all observations"""
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return state[1] if state else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return dict(super().snapshot(), buckets=list(self.buckets))
+
+    def _copy(self, value: Any) -> Any:
+        counts, total, count = value
+        return [list(counts), total, count]
+
+    def merge(self, key: Tuple[str, ...], value: Any) -> None:
+        counts, total, count = value
+        if len(counts) != len(self.buckets) + 1:
+            raise ValueError(f"{self.name} snapshot has {len(counts) - 1} buckets, expected {len(self.buckets)}")
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0] = [a + b for a, b in zip(state[0], counts)]
+            state[1] += total
+            state[2] += count
+
+    def _samples(self) -> Iterator[str]:
+        for key, (counts, total, count) in sorted(self._values.items()):
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                bucket_labels = _format_labels({**labels, 'le': _format_value(bound)})
+                yield f'{self.name}_bucket{bucket_labels} {cumulative}'
+            yield f'{self.name}_sum{_format_labels(labels)} {_format_value(total)}'
+            yield f'{self.name}_count{_format_labels(labels)} {count}'
+
+
+class MetricsRegistry:
+    def __init__(self):
+        """Collection of named metrics rendered together"""
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric):
+                    raise ValueError(f"Metric {metric.name} already registered as {existing.kind}")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def reset(self) -> None:
+        """Forget the values of every metric, e.g. those inherited over fork()"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Definitions and values of every metric, JSON serializable"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: metric.snapshot() for metric in metrics}
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    'fire_detector_stage_seconds',
+    'Latency of each hot-path stage (capture, decode, inference, draw, write, display)',
+    ('stage',))
+FRAMES = REGISTRY.counter(
+    'fire_detector_frames', 'Frames run through the detector')
+DETECTIONS = REGISTRY.counter(
+    'fire_detector_detections', 'Detections above the confidence threshold by class',
+    ('class_name',))
+ALERTS = REGISTRY.counter(
+    'fire_detector_alerts', 'Alerts raised after cooldown', ('detection',))
+DROPPED_FRAMES = REGISTRY.counter(
+    'fire_detector_dropped_frames', 'Frames dropped because a later stage fell behind')
+
+
+class SharedMetrics:
+    def __init__(self, directory: Path, registry: Optional[MetricsRegistry] = None,
+                 interval: float = 5.0):
+        """
+        Metrics of every worker process, for /metrics under gunicorn.
+
+        Each worker writes a snapshot of its registry to <pid>.json in a
+        shared directory every interval seconds, at every scrape and when it
+        stops; snapshots are written atomically (temp file + os.replace).
+        collect() merges all snapshots, so any worker answers a scrape with
+        the totals of all of them: counters and histograms are summed,
+        including those of workers that have exited, so they never go
+        backwards; gauges are reported per live worker with a 'worker' label.
+
+        Args:
+            directory (Path): Directory shared by the workers
+            registry (Optional[MetricsRegistry]): Registry of this process,
+                REGISTRY by default
+            interval (float): Seconds between snapshots
+        """
+        self.logger = logging.getLogger(__name__)
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.registry = registry or REGISTRY
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def clear(directory: Path) -> None:
+        """Remove the snapshots of a previous server run"""
+        for path in Path(directory).glob('*.json'):
+            path.unlink(missing_ok=True)
+
+    @property
+    def path(self) -> Path:
+        return self.directory / f'{os.getpid()}.json'
+
+    def write(self) -> None:
+        """Write this process's snapshot"""
+        path = self.path
+        tmp_path = path.with_name(f'.{path.name}.{threading.get_ident()}.tmp')
+        tmp_path.write_text(json.dumps({'pid': os.getpid(), 'metrics': self.registry.snapshot()}),
+                            encoding='utf-8')
+        os.replace(tmp_path, path)
+
+    def collect(self) -> MetricsRegistry:
+        """Registry with the merged metrics of every worker, this one's up to date"""
+        self.write()
+        merged = MetricsRegistry()
+        for path in sorted(self.directory.glob('*.json')):
+            try:
+                snapshot = json.loads(path.read_text(encoding='utf-8'))
+            except (FileNotFoundError, ValueError):
+                continue
+            pid = snapshot['pid']
+            alive = pid_alive(pid)
+            for name, metric in snapshot['metrics'].items():
+                labelnames = metric['labelnames']
+                try:
+                    if metric['kind'] == 'counter':
+                        target = merged.counter(name, metric['documentation'], labelnames)
+                    elif metric['kind'] == 'histogram':
+                        target = merged.histogram(name, metric['documentation'], labelnames,
+                                                  metric['buckets'])
+                    elif alive:
+                        # The current value of an exited worker means nothing
+                        target = merged.gauge(name, metric['documentation'], labelnames + ['worker'])
+                    else:
+                        continue
+                    for key, value in metric['values']:
+                        if metric['kind'] == 'gauge':
+                            key = key + [str(pid)]
+                        target.merge(tuple(key), value)
+                except ValueError as e:
+                    # Metric definitions changed between server versions
+                    self.logger.warning(f"Skipping {name} of worker {pid}: {e}")
+        return merged
+
+    def render(self) -> str:
+        return self.collect().render()
+
+    def start(self) -> 'SharedMetrics':
+        """Write snapshots in the background"""
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name='shared-metrics')
+        self._thread.start()
+        return self
+
+    def stop(self, discard: bool = False, timeout: float = 2.0) -> None:
+        """
+        Stop writing snapshots.
+
+        Args:
+            discard (bool): Remove this process's snapshot instead of writing
+                a final one, e.g. in the gunicorn master before forking
+            timeout (float): Seconds to wait for the writer thread
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if discard:
+            self.path.unlink(missing_ok=True)
+        else:
+            self.write()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.write()
+            except Exception as e:
+                self.logger.error(f"Writing metrics snapshot failed: {e}")
+            self._stop.wait(self.interval)
+
+
+def start_http_server(port: int, host: str = '0.0.0.0',
+                      registry: Optional[MetricsRegistry] = None) -> ThreadingHTTPServer:
+    """
+    Serve /metrics from a daemon thread for processes without Flask.
+
+    Args:
+        port (int): Port to listen on
+        host (str): Interface to bind
+        registry (Optional[MetricsRegistry]): Registry to expose, REGISTRY by default
+
+    Returns:
+        ThreadingHTTPServer: The running server; call shutdown() to stop it
+    """
+    registry = registry or REGISTRY
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = registry.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True, name='metrics-http').start()
+    logging.getLogger(__name__).info(f"Metrics available at http://{host}:{port}/metrics")
+    return server
@@ -0,0 +1,118 @@
+import cv2
+import numpy as np
+from typing import Any, Callable, Optional
+
+
+class MotionGate:
+    def __init__(
+        self,
+        infer_every: int = 10,
+        motion_threshold: float = 0.01,
+        pixel_threshold: int = 25,
+        downscale_width: int = 64
+        ):
+        """
+        Cheap change detector deciding which frames need full inference.
+
+        Frames are shrunk to a small grayscale thumbnail and compared with the
+        thumbnail of the last inferred frame. Inference runs when enough pixels
+        changed, and otherwise only on every Nth frame, so idle cameras cost
+        almost nothing while a fire starting still triggers inference at once.
+        Comparing against the last inferred frame (not the previous frame)
+        also catches slow changes such as smoke building up.
+
+        Args:
+            infer_every (int): Run inference at least every N frames; 1
+                disables gating
+            motion_threshold (float): Fraction of thumbnail pixels that must
+                change to count as motion
+            pixel_threshold (int): Gray level difference for a pixel to count
+                as changed
+            downscale_width (int): Width of the comparison thumbnail
+        """
+        self.infer_every = max(1, infer_every)
+        self.motion_threshold = motion_threshold
+        self.pixel_threshold = pixel_threshold
+        self.downscale_width = downscale_width
+
+        self._reference = None
+        self._since_inference = 0
+
+        self.frames_seen = 0
+        self.frames_inferred = 0
+        self.motion_triggers = 0
+
+    def _thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        height, width = frame.shape[:2]
+        thumb_height = max(1, round(height * self.downscale_width / width))
+        small = cv2.resize(frame, (self.downscale_width, thumb_height),
+                           interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return small
+
+    def _changed_fraction(self, thumb: np.ndarray) -> float:
+        if self._reference is None or thumb.shape != self._reference.shape:
+            return 1.0
+        diff = cv2.absdiff(thumb, self._reference)
+        return np.count_nonzero(diff > self.pixel_threshold) / diff.size
+
+    def motion_score(self, frame: np.ndarray) -> float:
+        """
+        Fraction of thumbnail pixels that changed since the last inferred frame.
+
+        Args:
+            frame (np.ndarray): Input frame
+
+        Returns:
+            float: Value in [0, 1]; 1.0 when there is no reference yet
+        """
+        return self._changed_fraction(self._thumbnail(frame))
+
+    def should_infer(self, frame: np.ndarray) -> bool:
+        """
+        Decide whether this frame needs full inference.
+
+        Args:
+            frame (np.ndarray): Input frame
+
+        Returns:
+            bool: True to run the detector, False to reuse the last result
+        """
+        self.frames_seen += 1
+        thumb = self._thumbnail(frame)
+
+        motion = self._changed_fraction(thumb) >= self.motion_threshold
+        due = self._since_inference + 1 >= self.infer_every
+
+        if motion or due:
+            if motion:
+                self.motion_triggers += 1
+            self._reference = thumb
+            self._since_inference = 0
+            self.frames_inferred += 1
+            return True
+
+        self._since_inference += 1
+        return False
+
+    def wrap(self, detect_fn: Callable[[np.ndarray], Any]) -> Callable[[np.ndarray], Any]:
+        """
+        Gate a single-frame inference function.
+
+        Args:
+            detect_fn (Callable): Inference function, e.g. Detector.detect
+
+        Returns:
+            Callable: Function returning a fresh result for frames that need
+            inference and the previous result otherwise
+        """
+        last: Optional[Any] = None
+
+        def gated(frame: np.ndarray) -> Any:
+            nonlocal last
+            if self.should_infer(frame) or last is None:
+                last = detect_fn(frame)
+            return last
+
+        return gated
@@ -0,0 +1,225 @@
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Callable, Iterator, List, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+try:
+    from .metrics import DROPPED_FRAMES, STAGE_SECONDS
+except ImportError:  # Imported as a top-level module by src/main.py
+    from metrics import DROPPED_FRAMES, STAGE_SECONDS
+
+Source = Union[int, str, Path]
+
+
+class StreamReader:
+    def __init__(self, name: str, source: Source, blocking: bool = False):
+        """
+        Capture thread for one source that keeps only its newest frame.
+
+        Args:
+            name (str): Stream name used in logs and alert file names
+            source (Source): Camera index, file path or stream URL
+            blocking (bool): Wait for each frame to be consumed before reading
+                the next (video files) instead of overwriting it (live cameras)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.name = name
+        self.source = source
+        self.blocking = blocking
+        self.gate = None
+        self.tracker = None
+        self.last_result = None
+
+        self.capture = cv2.VideoCapture(
+            source if isinstance(source, int) else str(source))
+        if not self.capture.isOpened():
+            raise IOError(f"Failed to open video source: {source}")
+
+        self.frames_read = 0
+        self.frames_dropped = 0
+        self.ended = False
+
+        self._frame = None
+        self._lock = threading.Lock()
+        self._consumed = threading.Event()
+        self._consumed.set()
+        self._stop = threading.Event()
+        self._notify = None
+        self._thread = None
+
+    def start(self, notify: threading.Event) -> None:
+        """Start reading; notify is set whenever a new frame is available"""
+        self._notify = notify
+        self._thread = threading.Thread(
+            target=self._run, name=f"stream-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        self._consumed.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.capture.release()
+
+    def take(self) -> Optional[np.ndarray]:
+        """Return the newest unread frame, or None if there is none"""
+        with self._lock:
+            frame, self._frame = self._frame, None
+        if frame is not None:
+            self._consumed.set()
+        return frame
+
+    @property
+    def has_frame(self) -> bool:
+        return self._frame is not None
+
+    def _run(self) -> None:
+        try:
+            while not self._stop.is_set():
+                if self.blocking:
+                    self._consumed.wait()
+                    if self._stop.is_set():
+                        break
+
+                with STAGE_SECONDS.time(stage='capture'):
+                    ret, frame = self.capture.read()
+                if not ret:
+                    break
+
+                with self._lock:
+                    if self._frame is not None:
+                        self.frames_dropped += 1
+                        DROPPED_FRAMES.inc()
+                    self._frame = frame
+                    self.frames_read += 1
+                    self._consumed.clear()
+                self._notify.set()
+        except Exception as e:
+            self.logger.error(f"Stream {self.name} capture failed: {e}")
+        finally:
+            self.ended = True
+            self._notify.set()
+
+
+class MultiStreamMonitor:
+    def __init__(
+        self,
+        sources: List[Source],
+        batch_fn: Callable[[List[np.ndarray]], List[Any]],
+        max_batch_size: int = 8,
+        blocking: Optional[bool] = None,
+        gate_factory: Optional[Callable[[], Any]] = None,
+        tracker_factory: Optional[Callable[[], Any]] = None
+        ):
+        """
+        Serve many cameras/videos from one process and one shared model.
+
+        Each source gets a lightweight capture thread holding at most one
+        frame. The scheduler walks the streams round-robin, collects up to
+        max_batch_size fresh frames and runs them through a single batched
+        inference call, so every stream gets a fair share of the model.
+
+        Args:
+            sources (List[Source]): Camera indices, file paths or URLs
+            batch_fn (Callable): Batched inference, e.g. Detector.detect_batch
+            max_batch_size (int): Most frames per inference call
+            blocking (Optional[bool]): Read every frame instead of only the
+                newest; defaults to True for video files and False otherwise
+            gate_factory (Optional[Callable]): Builds a per-stream MotionGate;
+                frames the gate skips reuse that stream's last result
+            tracker_factory (Optional[Callable]): Builds a per-stream
+                DetectionTracker that smooths results and interpolates the
+                frames the gate skips
+
+        Raises:
+            IOError: If none of the sources can be opened; sources that fail
+                to open are logged and skipped
+        """
+        self.logger = logging.getLogger(__name__)
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+
+        self.readers = []
+        for index, source in enumerate(sources):
+            is_file = not isinstance(source, int) and Path(str(source)).is_file()
+            try:
+                reader = StreamReader(f"stream{index}", source,
+                                      blocking=is_file if blocking is None else blocking)
+            except IOError as e:
+                # One unreachable camera must not take down the others
+                self.logger.error(f"Skipping stream{index}: {e}")
+                continue
+            self.readers.append(reader)
+            if gate_factory is not None:
+                self.readers[-1].gate = gate_factory()
+            if tracker_factory is not None:
+                self.readers[-1].tracker = tracker_factory()
+
+        if sources and not self.readers:
+            raise IOError(f"Failed to open any of {len(sources)} video sources")
+
+        self._next = 0
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+
+    def start(self) -> 'MultiStreamMonitor':
+        for reader in self.readers:
+            reader.start(self._ready)
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        for reader in self.readers:
+            reader.stop()
+
+    def _schedule(self) -> List[Tuple[StreamReader, np.ndarray]]:
+        """Take up to max_batch_size fresh frames, round-robin from the last position"""
+        batch = []
+        count = len(self.readers)
+        for offset in range(count):
+            reader = self.readers[(self._next + offset) % count]
+            frame = reader.take()
+            if frame is None:
+                continue
+            batch.append((reader, frame))
+            if len(batch) == self.max_batch_size:
+                self._next = (self._next + offset + 1) % count
+                return batch
+        self._next = (self._next + 1) % count if count else 0
+        return batch
+
+    def __iter__(self) -> Iterator[Tuple[StreamReader, np.ndarray, Any]]:
+        """Yield (reader, frame, result) until every stream has ended or stop() is called"""
+        while not self._stop.is_set():
+            self._ready.clear()
+            batch = self._schedule()
+
+            if not batch:
+                if all(reader.ended and not reader.has_frame for reader in self.readers):
+                    return
+                self._ready.wait(0.1)
+                continue
+
+            # Only frames the motion gate lets through reach the model
+            pending = [(reader, frame) for reader, frame in batch
+                       if reader.gate is None or reader.gate.should_infer(frame)
+                       or reader.last_result is None]
+            if pending:
+                try:
+                    results = self.batch_fn([frame for _, frame in pending])
+                except Exception as e:
+                    self.logger.error(f"Error processing batch of {len(pending)} frames: {e}")
+                    continue
+                for (reader, _), result in zip(pending, results):
+                    reader.last_result = result
+
+            fresh = {reader for reader, _ in pending}
+            for reader, frame in batch:
+                result = reader.last_result
+                if reader.tracker is not None:
+                    result = reader.tracker.update(result) if reader in fresh \
+                        else reader.tracker.predict()
+                yield reader, frame, result
@@ -0,0 +1,271 @@
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+try:
+    from .metrics import STAGE_SECONDS
+    from .notification_sinks import (Alert, NotificationSink, WhatsAppSink,
+                                     make_session, sinks_from_config)
+except ImportError:  # Imported as a top-level module by src/main.py
+    from metrics import STAGE_SECONDS
+    from notification_sinks import (Alert, NotificationSink, WhatsAppSink,
+                                    make_session, sinks_from_config)
+
+
+class NotificationService:
+    def __init__(self, config, sinks: Optional[List[NotificationSink]] = None):
+        """
+        Asynchronous alert delivery off the detection loop.
+
+        Alerts are queued with submit_alert() and handled on a background
+        asyncio event loop: JPEG encoding, disk writes and HTTP calls run on
+        a bounded thread pool, failed sink deliveries are retried with
+        exponential backoff, and at most ALERT_QUEUE_SIZE alerts are pending
+        at once. When the queue is full new alerts are rejected instead of
+        blocking, so a slow network never stalls inference.
+
+        Each saved alert is fanned out to all sinks concurrently. By default
+        these are WhatsApp (Twilio + Imgur) when credentials are set, the
+        ALERT_WEBHOOKS URLs and the ALERT_LOG_FILE; with no sinks alerts are
+        only saved to disk.
+
+        Args:
+            config: Config class or instance
+            sinks (Optional[List[NotificationSink]]): Sinks to use instead of
+                the ones configured
+        """
+        self.logger = logging.getLogger(__name__)
+        self.config = config
+        self.output_dir = Path(config.DETECTED_FIRES_DIR)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        self.max_pending = config.ALERT_QUEUE_SIZE
+        self.retries = config.ALERT_RETRIES
+        self.retry_backoff = config.ALERT_RETRY_BACKOFF
+        self.timeout = config.ALERT_TIMEOUT
+
+        self.session = make_session(config.ALERT_WORKERS)
+        self.whatsapp = WhatsAppSink(config, self.session, self.timeout)
+        self.sinks = sinks if sinks is not None else sinks_from_config(
+            config, self.session, self.timeout)
+        self.executor = ThreadPoolExecutor(max_workers=config.ALERT_WORKERS,
+                                           thread_name_prefix='alert-worker')
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, daemon=True,
+                                        name='alert-loop')
+        self._thread.start()
+
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._idle = threading.Event()
+        self._idle.set()
+
+        self.alerts_submitted = 0
+        self.alerts_sent = 0
+        self.alerts_failed = 0
+        self.alerts_dropped = 0
+        self._sequence = itertools.count(1)
+        self.sink_stats = {sink.name: {'sent': 0, 'failed': 0} for sink in self.sinks}
+
+        if self.sinks:
+            self.logger.info(f"Alert sinks: {', '.join(sink.name for sink in self.sinks)}")
+        else:
+            self.logger.info("No alert sinks configured, alerts are only saved to disk")
+
+    @property
+    def messaging_enabled(self) -> bool:
+        return self.whatsapp.configured
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def save_frame(self, frame: np.ndarray, prefix: str = 'fire_detected') -> Path:
+        """
+        Encode a frame as JPEG and write it to the detected fires directory.
+
+        Args:
+            frame (np.ndarray): Frame to save
+            prefix (str): File name prefix
+
+        Returns:
+            Path: Path of the saved image
+        """
+        timestamp = time.strftime("%Y%m%d-%H%M%S")
+        # Sequence number keeps alerts raised in the same second apart
+        path = self.output_dir / f'{prefix}_{timestamp}_{next(self._sequence)}.jpg'
+        with STAGE_SECONDS.time(stage='write'):
+            ok, encoded = cv2.imencode('.jpg', frame)
+            if not ok:
+                raise ValueError("Failed to encode frame as JPEG")
+            path.write_bytes(encoded.tobytes())
+        self.logger.info(f"Detection saved to: {path}")
+        return path
+
+    def upload_image(self, image_path: Path) -> Optional[str]:
+        """
+        Upload an image to Imgur so it can be attached to a WhatsApp message.
+
+        Args:
+            image_path (Path): Image to upload
+
+        Returns:
+            Optional[str]: Public image URL, or None on failure
+        """
+        return self.whatsapp.upload_image(image_path)
+
+    def send_message(self, body: str, media_url: Optional[str] = None) -> bool:
+        """Send a WhatsApp message, see WhatsAppSink.send_message"""
+        return self.whatsapp.send_message(body, media_url)
+
+    async def _call(self, fn: Callable[..., Any], *args) -> Any:
+        return await self.loop.run_in_executor(self.executor, fn, *args)
+
+    async def _with_retries(self, fn: Callable[..., Any], *args) -> Any:
+        """Run a blocking call on the pool, retrying falsy results with backoff"""
+        for attempt in range(self.retries + 1):
+            try:
+                result = await self._call(fn, *args)
+            except Exception as e:
+                self.logger.error(f"{fn.__name__} raised: {e}")
+                result = None
+            if result:
+                return result
+            if attempt < self.retries:
+                # Waiting on the event loop keeps the worker threads free
+                await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+        return result
+
+    async def _send_to_sink(self, sink: NotificationSink, alert: Alert) -> bool:
+        sent = bool(await self._with_retries(sink.send, alert))
+        with self._lock:
+            self.sink_stats[sink.name]['sent' if sent else 'failed'] += 1
+        return sent
+
+    async def _deliver(self, frame: np.ndarray, detection: str, prefix: str) -> bool:
+        """Save one alert and fan it out to every sink"""
+        timestamp = time.time()
+        path = await self._call(self.save_frame, frame, prefix)
+        if not self.sinks:
+            return True
+
+        alert = Alert(detection, timestamp, prefix, path)
+        start = time.perf_counter()
+        results = await asyncio.gather(*(self._send_to_sink(sink, alert) for sink in self.sinks))
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage='notify')
+        return all(results)
+
+    async def _deliver_tracked(self, frame: np.ndarray, detection: str, prefix: str) -> bool:
+        try:
+            sent = await self._deliver(frame, detection, prefix)
+        except Exception as e:
+            self.logger.error(f"Alert delivery failed: {e}")
+            sent = False
+
+        with self._lock:
+            if sent:
+                self.alerts_sent += 1
+            else:
+                self.alerts_failed += 1
+            self._pending -= 1
+            if self._pending == 0:
+                self._idle.set()
+        return sent
+
+    def _reserve(self) -> bool:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.alerts_dropped += 1
+                return False
+            self._pending += 1
+            self.alerts_submitted += 1
+            self._idle.clear()
+            return True
+
+    def submit_alert(self, frame: np.ndarray, detection: str, prefix: str = 'fire_detected') -> bool:
+        """
+        Queue an alert without blocking the caller.
+
+        The frame is used as-is on a worker thread, so the caller must not
+        modify it afterwards (annotated frames are fresh copies already).
+
+        Args:
+            frame (np.ndarray): Annotated frame to save and send
+            detection (str): Detection status, e.g. "Fire"
+            prefix (str): File name prefix of the saved image
+
+        Returns:
+            bool: False if the alert was dropped because the queue is full
+        """
+        if not self._reserve():
+            self.logger.warning(f"Alert queue full ({self.max_pending}), dropping {detection} alert")
+            return False
+        asyncio.run_coroutine_threadsafe(
+            self._deliver_tracked(frame, detection, prefix), self.loop)
+        return True
+
+    def send_alert(self, frame: np.ndarray, detection: str, timeout: Optional[float] = None) -> bool:
+        """
+        Save and send an alert, waiting for the result.
+
+        Args:
+            frame (np.ndarray): Annotated frame to save and send
+            detection (str): Detection status, e.g. "Fire"
+            timeout (Optional[float]): Seconds to wait, None waits indefinitely
+
+        Returns:
+            bool: True if the alert was delivered, False if it failed, was
+                dropped or is still being delivered after timeout seconds
+        """
+        if not self._reserve():
+            return False
+        future = asyncio.run_coroutine_threadsafe(
+            self._deliver_tracked(frame, detection, 'fire_detected'), self.loop)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            # Delivery carries on in the background and is counted when done
+            self.logger.warning(f"{detection} alert not delivered within {timeout}s, still pending")
+            return False
+
+    def send_whatsapp_alert(self, frame: np.ndarray, detection: str = 'Fire') -> bool:
+        """Send an existing frame over WhatsApp, waiting for the result"""
+        return self.send_alert(frame, detection)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'pending': self._pending,
+                'submitted': self.alerts_submitted,
+                'sent': self.alerts_sent,
+                'failed': self.alerts_failed,
+                'dropped': self.alerts_dropped,
+                'sinks': {name: dict(counts) for name, counts in self.sink_stats.items()},
+            }
+
+    def cleanup(self, timeout: float = 30.0) -> None:
+        """
+        Wait for pending alerts, then stop the event loop and worker pool.
+
+        Args:
+            timeout (float): Seconds to wait for pending alerts
+        """
+        if not self._idle.wait(timeout):
+            self.logger.warning(f"{self._pending} alerts still pending at shutdown")
+
+        if not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout=5)
+            self.loop.close()
+        self.executor.shutdown(wait=False)
+        for sink in self.sinks:
+            sink.close()
+        self.session.close()
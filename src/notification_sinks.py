@@ -0,0 +1,252 @@
+import json
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+IMGUR_UPLOAD_URL = 'https://api.imgur.com/3/image'
+TWILIO_MESSAGES_URL = 'https://api.twilio.com/2010-04-01/Accounts/{sid}/Messages.json'
+
+
+@dataclass
+class Alert:
+    """One alert as seen by the sinks"""
+    detection: str
+    timestamp: float          # time.time() when the alert was raised
+    source: str               # Stream or file prefix, e.g. "alert_stream0"
+    image_path: Path          # Saved JPEG
+    image_url: Optional[str] = None  # Set once a sink has uploaded the image
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'detection': self.detection,
+            'timestamp': self.timestamp,
+            'source': self.source,
+            'image_path': str(self.image_path),
+            'image_url': self.image_url,
+        }
+
+
+def make_session(pool_size: int = 10) -> requests.Session:
+    """
+    HTTP session with keep-alive connection pools shared by all sinks.
+
+    Args:
+        pool_size (int): Connections kept per host, at least the number of
+            concurrent alert workers
+
+    Returns:
+        requests.Session: Session reusing TCP/TLS connections between alerts
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class NotificationSink:
+    """Destination for alerts; send() runs on an alert worker thread"""
+
+    name = 'sink'
+
+    def send(self, alert: Alert) -> bool:
+        """Deliver an alert, returning False (or raising) to have it retried"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class WhatsAppSink(NotificationSink):
+    def __init__(self, config, session: requests.Session, timeout: float = 10.0):
+        """
+        WhatsApp message through the Twilio REST API with the frame on Imgur.
+
+        Args:
+            config: Config with the TWILIO_*, RECEIVER_WHATSAPP_NUMBER and
+                IMGUR_CLIENT_ID settings
+            session (requests.Session): Shared HTTP session
+            timeout (float): Per-request timeout in seconds
+        """
+        self.name = 'whatsapp'
+        self.logger = logging.getLogger(__name__)
+        self.config = config
+        self.session = session
+        self.timeout = timeout
+
+    @property
+    def configured(self) -> bool:
+        return all(getattr(self.config, name, None) for name in (
+            'TWILIO_ACCOUNT_SID', 'TWILIO_AUTH_TOKEN', 'TWILIO_WHATSAPP_NUMBER',
+            'RECEIVER_WHATSAPP_NUMBER', 'IMGUR_CLIENT_ID'))
+
+    def upload_image(self, image_path: Path) -> Optional[str]:
+        """
+        Upload an image to Imgur so it can be attached to a WhatsApp message.
+
+        Args:
+            image_path (Path): Image to upload
+
+        Returns:
+            Optional[str]: Public image URL, or None on failure
+        """
+        try:
+            with open(image_path, 'rb') as f:
+                response = self.session.post(
+                    IMGUR_UPLOAD_URL,
+                    headers={'Authorization': f'Client-ID {self.config.IMGUR_CLIENT_ID}'},
+                    files={'image': f},
+                    timeout=self.timeout
+                )
+            response.raise_for_status()
+            return response.json()['data']['link']
+        except Exception as e:
+            self.logger.error(f"Image upload failed: {e}")
+            return None
+
+    def send_message(self, body: str, media_url: Optional[str] = None) -> bool:
+        """
+        Send a WhatsApp message through the Twilio REST API.
+
+        Args:
+            body (str): Message text
+            media_url (Optional[str]): Public URL of an image to attach
+
+        Returns:
+            bool: True if Twilio accepted the message
+        """
+        data = {
+            'From': f'whatsapp:{self.config.TWILIO_WHATSAPP_NUMBER}',
+            'To': f'whatsapp:{self.config.RECEIVER_WHATSAPP_NUMBER}',
+            'Body': body,
+        }
+        if media_url:
+            data['MediaUrl'] = media_url
+
+        try:
+            response = self.session.post(
+                TWILIO_MESSAGES_URL.format(sid=self.config.TWILIO_ACCOUNT_SID),
+                data=data,
+                auth=(self.config.TWILIO_ACCOUNT_SID, self.config.TWILIO_AUTH_TOKEN),
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            return True
+        except Exception as e:
+            self.logger.error(f"WhatsApp message failed: {e}")
+            return False
+
+    def send(self, alert: Alert) -> bool:
+        # Keep the uploaded URL on the alert so a retry only resends the message
+        if alert.image_url is None:
+            alert.image_url = self.upload_image(alert.image_path)
+            if alert.image_url is None:
+                return False
+        stamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(alert.timestamp))
+        return self.send_message(f"🔥 {alert.detection} detected at {stamp}", alert.image_url)
+
+
+class WebhookSink(NotificationSink):
+    def __init__(self, url: str, session: requests.Session, timeout: float = 10.0,
+                 headers: Optional[Dict[str, str]] = None):
+        """
+        POST alerts as JSON to an HTTP endpoint.
+
+        Args:
+            url (str): Receiver URL
+            session (requests.Session): Shared keep-alive session
+            timeout (float): Per-request timeout in seconds
+            headers (Optional[Dict[str, str]]): Extra headers, e.g. auth tokens
+        """
+        self.name = f'webhook:{url}'
+        self.logger = logging.getLogger(__name__)
+        self.url = url
+        self.session = session
+        self.timeout = timeout
+        self.headers = headers or {}
+
+    def send(self, alert: Alert) -> bool:
+        try:
+            response = self.session.post(self.url, json=alert.to_dict(),
+                                         headers=self.headers, timeout=self.timeout)
+            response.raise_for_status()
+            return True
+        except Exception as e:
+            self.logger.error(f"Webhook {self.url} failed: {e}")
+            return False
+
+
+class FileSink(NotificationSink):
+    def __init__(self, path: Path):
+        """
+        Append alerts as JSON lines to a local file.
+
+        Args:
+            path (Path): Output .jsonl file, created if missing
+        """
+        self.name = f'file:{path}'
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def send(self, alert: Alert) -> bool:
+        line = json.dumps(alert.to_dict())
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+        return True
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class MemorySink(NotificationSink):
+    def __init__(self, maxlen: Optional[int] = None):
+        """
+        Keep alerts in memory, for tests and local experiments.
+
+        Args:
+            maxlen (Optional[int]): Keep only the newest N alerts
+        """
+        self.name = 'memory'
+        self.alerts: deque = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def send(self, alert: Alert) -> bool:
+        with self._lock:
+            self.alerts.append(alert)
+        return True
+
+
+def sinks_from_config(config, session: requests.Session, timeout: float) -> List[NotificationSink]:
+    """
+    Build the sinks enabled in the configuration.
+
+    Args:
+        config: Config class or instance
+        session (requests.Session): Shared HTTP session
+        timeout (float): Per-request timeout in seconds
+
+    Returns:
+        list: WhatsApp (when credentials are set), one webhook per
+        ALERT_WEBHOOKS URL and a file sink for ALERT_LOG_FILE
+    """
+    sinks: List[NotificationSink] = []
+    whatsapp = WhatsAppSink(config, session, timeout)
+    if whatsapp.configured:
+        sinks.append(whatsapp)
+    for url in getattr(config, 'ALERT_WEBHOOKS', None) or []:
+        sinks.append(WebhookSink(url, session, timeout))
+    log_file = getattr(config, 'ALERT_LOG_FILE', None)
+    if log_file:
+        sinks.append(FileSink(log_file))
+    return sinks
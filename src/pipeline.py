@@ -0,0 +1,175 @@
+import logging
+import queue
+import threading
+from typing import Any, Callable, Iterator, Tuple
+
+import numpy as np
+
+try:
+    from .metrics import DROPPED_FRAMES, STAGE_SECONDS
+except ImportError:  # Imported as a top-level module by src/main.py
+    from metrics import DROPPED_FRAMES, STAGE_SECONDS
+
+DROP_POLICIES = ('block', 'oldest', 'newest')
+
+# Marks the end of the stream inside the stage queues
+_END = object()
+
+
+class FramePipeline:
+    def __init__(
+        self,
+        capture,
+        process_fn: Callable[[np.ndarray], Any],
+        queue_size: int = 2,
+        drop_policy: str = 'oldest'
+        ):
+        """
+        Staged capture -> inference -> output pipeline with bounded queues.
+
+        Capture and inference each run on their own thread, while the output
+        stage (display, alert saving) is whoever iterates over the pipeline,
+        so decode, inference and disk I/O overlap instead of running serially.
+
+        Args:
+            capture: Opened cv2.VideoCapture (anything with read())
+            process_fn (Callable): Inference function applied to each frame,
+                e.g. Detector.detect
+            queue_size (int): Capacity of each stage queue
+            drop_policy (str): What to do when inference falls behind
+                capture: 'block' waits (no frame loss, for video files),
+                'oldest' discards the stalest queued frame and 'newest'
+                discards the incoming frame (both keep live cameras from
+                building latency). Only frames waiting for inference are
+                dropped; inference results, which may carry an alert, always
+                reach the output stage
+        """
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(
+                f"Unknown drop policy '{drop_policy}', expected one of {DROP_POLICIES}")
+
+        self.logger = logging.getLogger(__name__)
+        self.capture = capture
+        self.process_fn = process_fn
+        self.drop_policy = drop_policy
+
+        self._frames = queue.Queue(maxsize=queue_size)
+        self._results = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._threads = []
+
+        self._stats_lock = threading.Lock()
+        self.frames_read = 0
+        self.frames_processed = 0
+        self.frames_dropped = 0
+
+    def start(self) -> 'FramePipeline':
+        """Start the capture and inference threads"""
+        self._threads = [
+            threading.Thread(target=self._capture_loop,
+                             name="pipeline-capture", daemon=True),
+            threading.Thread(target=self._inference_loop,
+                             name="pipeline-inference", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Signal all stages to stop and wait for the worker threads"""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def __iter__(self) -> Iterator[Tuple[np.ndarray, Any]]:
+        """Yield (frame, result) pairs until the source is exhausted or stop() is called"""
+        while not self._stop.is_set():
+            try:
+                item = self._results.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is _END:
+                return
+            yield item
+
+    def _put(self, stage: queue.Queue, item: Any, drop_policy: str) -> None:
+        """Hand an item to the next stage according to a drop policy"""
+        if drop_policy == 'block':
+            while not self._stop.is_set():
+                try:
+                    stage.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+            return
+
+        if drop_policy == 'newest':
+            try:
+                stage.put_nowait(item)
+            except queue.Full:
+                self._count_drop()
+            return
+
+        # 'oldest': make room by discarding the stalest queued frame
+        while True:
+            try:
+                stage.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    stage.get_nowait()
+                    self._count_drop()
+                except queue.Empty:
+                    pass
+
+    def _finish(self, stage: queue.Queue) -> None:
+        """Deliver the end-of-stream marker regardless of the drop policy"""
+        while not self._stop.is_set():
+            try:
+                stage.put(_END, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _count_drop(self) -> None:
+        with self._stats_lock:
+            self.frames_dropped += 1
+        DROPPED_FRAMES.inc()
+
+    def _capture_loop(self) -> None:
+        try:
+            while not self._stop.is_set():
+                with STAGE_SECONDS.time(stage='capture'):
+                    ret, frame = self.capture.read()
+                if not ret:
+                    break
+                with self._stats_lock:
+                    self.frames_read += 1
+                self._put(self._frames, frame, self.drop_policy)
+        except Exception as e:
+            self.logger.error(f"Capture stage failed: {e}")
+        finally:
+            self._finish(self._frames)
+
+    def _inference_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                frame = self._frames.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if frame is _END:
+                break
+
+            try:
+                result = self.process_fn(frame)
+            except Exception as e:
+                self.logger.error(f"Error processing frame: {e}")
+                continue
+
+            with self._stats_lock:
+                self.frames_processed += 1
+            # Never drop results: a dropped result can be a missed alert
+            self._put(self._results, (frame, result), 'block')
+
+        self._finish(self._results)
@@ -0,0 +1,354 @@
+"""
+INT8 quantization of the exported ONNX model with an accuracy regression check.
+
+Usage:
+    python src/quantization.py --model models/best_nano_111.pt \
+        --calibration data --eval-split path/to/dataset/valid
+
+The FP32 ONNX model is exported from the .pt weights if needed, quantized
+with static calibration on the given images, and both models are evaluated
+on a YOLO-format split (images/ + labels/). The report lists mAP@50,
+mAP@50-95 and fire/smoke recall at the detector's operating thresholds,
+together with the INT8 - FP32 deltas.
+"""
+import argparse
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+try:
+    from .backends import export_model, letterbox, load_backend
+    from .tracker import box_iou
+except ImportError:  # Run as a script from src/
+    from backends import export_model, letterbox, load_backend
+    from tracker import box_iou
+
+IMAGE_SUFFIXES = ('.jpg', '.jpeg', '.png', '.bmp', '.webp')
+IOU_THRESHOLDS = np.linspace(0.5, 0.95, 10)
+
+logger = logging.getLogger(__name__)
+
+
+def list_images(directory: Path) -> List[Path]:
+    """Images in a directory, or in its images/ subdirectory for dataset splits"""
+    directory = Path(directory)
+    if (directory / 'images').is_dir():
+        directory = directory / 'images'
+    return sorted(p for p in directory.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+
+
+class ImageCalibrationReader:
+    def __init__(self, images: List[Path], input_name: str, imgsz: int = 640):
+        """
+        Feed letterboxed calibration images to onnxruntime's static quantizer.
+
+        Args:
+            images (List[Path]): Calibration images
+            input_name (str): Name of the model input
+            imgsz (int): Model input size
+        """
+        self.images = images
+        self.input_name = input_name
+        self.imgsz = imgsz
+        self._iterator: Optional[Iterator[Path]] = None
+
+    def get_next(self) -> Optional[Dict[str, np.ndarray]]:
+        if self._iterator is None:
+            self._iterator = iter(self.images)
+        for path in self._iterator:
+            frame = cv2.imread(str(path))
+            if frame is None:
+                logger.warning(f"Skipping unreadable calibration image: {path}")
+                continue
+            padded, _, _ = letterbox(frame, self.imgsz)
+            tensor = padded[:, :, ::-1].transpose(2, 0, 1).astype(np.float32) / 255.0
+            return {self.input_name: tensor[None]}
+        return None
+
+    def rewind(self) -> None:
+        self._iterator = None
+
+
+def quantize_model(
+    fp32_path: Path,
+    int8_path: Path,
+    calibration_dir: Path,
+    max_images: int = 200,
+    per_channel: bool = True
+) -> Path:
+    """
+    Statically quantize an ONNX model to INT8 (QDQ format).
+
+    Args:
+        fp32_path (Path): FP32 .onnx model
+        int8_path (Path): Output path of the INT8 model
+        calibration_dir (Path): Directory (or dataset split) with calibration images
+        max_images (int): Maximum number of calibration images
+        per_channel (bool): Quantize weights per output channel
+
+    Returns:
+        Path: The INT8 model path
+    """
+    import onnx
+    from onnxruntime.quantization import (CalibrationMethod, QuantFormat,
+                                          QuantType, quantize_static)
+
+    model = onnx.load(str(fp32_path))
+    model_input = model.graph.input[0]
+    imgsz = model_input.type.tensor_type.shape.dim[2].dim_value or 640
+
+    images = list_images(calibration_dir)[:max_images]
+    if not images:
+        raise FileNotFoundError(f"No calibration images found in {calibration_dir}")
+    logger.info(f"Calibrating on {len(images)} images from {calibration_dir}")
+
+    reader = ImageCalibrationReader(images, model_input.name, imgsz)
+    quantize_static(
+        str(fp32_path), str(int8_path), reader,
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=per_channel,
+        calibrate_method=CalibrationMethod.MinMax,
+    )
+
+    # Keep the class names and input size metadata written by ultralytics
+    quantized = onnx.load(str(int8_path))
+    onnx.helper.set_model_props(
+        quantized, {prop.key: prop.value for prop in model.metadata_props})
+    onnx.save(quantized, str(int8_path))
+    return Path(int8_path)
+
+
+def load_labels(label_path: Path, width: int, height: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Read a YOLO label file into pixel xyxy boxes and class ids"""
+    if not label_path.exists():
+        return np.empty((0, 4), dtype=np.float32), np.empty(0, dtype=int)
+
+    rows = [line.split() for line in label_path.read_text().splitlines() if line.strip()]
+    rows = [row[:5] for row in rows if len(row) >= 5]
+    if not rows:
+        return np.empty((0, 4), dtype=np.float32), np.empty(0, dtype=int)
+
+    data = np.array(rows, dtype=np.float32)
+    cx, cy, w, h = data[:, 1] * width, data[:, 2] * height, data[:, 3] * width, data[:, 4] * height
+    boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+    return boxes, data[:, 0].astype(int)
+
+
+def match_predictions(
+    pred_boxes: np.ndarray,
+    pred_classes: np.ndarray,
+    gt_boxes: np.ndarray,
+    gt_classes: np.ndarray
+) -> np.ndarray:
+    """
+    Mark predictions as true positives at each IoU threshold.
+
+    Returns:
+        np.ndarray: (num_predictions, 10) boolean matrix for IoU 0.50:0.95
+    """
+    correct = np.zeros((len(pred_boxes), len(IOU_THRESHOLDS)), dtype=bool)
+    if len(pred_boxes) == 0 or len(gt_boxes) == 0:
+        return correct
+
+    iou = box_iou(gt_boxes, pred_boxes)
+    iou[gt_classes[:, None] != pred_classes[None, :]] = 0.0
+    for k, threshold in enumerate(IOU_THRESHOLDS):
+        gt_idx, pred_idx = np.nonzero(iou >= threshold)
+        if not len(gt_idx):
+            continue
+        # Highest IoU pairs first, each prediction and ground truth used once
+        order = np.argsort(-iou[gt_idx, pred_idx], kind='stable')
+        gt_idx, pred_idx = gt_idx[order], pred_idx[order]
+        _, first = np.unique(pred_idx, return_index=True)
+        gt_idx, pred_idx = gt_idx[first], pred_idx[first]
+        order = np.argsort(-iou[gt_idx, pred_idx], kind='stable')
+        _, first = np.unique(gt_idx[order], return_index=True)
+        correct[pred_idx[order][first], k] = True
+    return correct
+
+
+def average_precision(recall: np.ndarray, precision: np.ndarray) -> float:
+    """101-point interpolated average precision (COCO style)"""
+    if not len(recall):
+        return 0.0
+    # Precision envelope: best precision at this recall or higher
+    envelope = np.flip(np.maximum.accumulate(np.flip(precision)))
+    idx = np.searchsorted(recall, np.linspace(0, 1, 101), side='left')
+    sampled = np.where(idx < len(recall), envelope[np.minimum(idx, len(recall) - 1)], 0.0)
+    return float(sampled.mean())
+
+
+def compute_metrics(
+    correct: np.ndarray,
+    confidences: np.ndarray,
+    pred_classes: np.ndarray,
+    gt_classes: np.ndarray,
+    names: Dict[int, str],
+    operating_conf: Dict[str, float]
+) -> Dict[str, object]:
+    """
+    Aggregate matched predictions into mAP and per-class recall.
+
+    Args:
+        correct (np.ndarray): (N, 10) true-positive matrix from match_predictions
+        confidences (np.ndarray): (N,) prediction confidences
+        pred_classes (np.ndarray): (N,) predicted class ids
+        gt_classes (np.ndarray): (M,) ground truth class ids
+        names (Dict[int, str]): Class names
+        operating_conf (Dict[str, float]): Lower-case class name -> confidence
+            threshold the detector alerts at, used for the recall figures
+
+    Returns:
+        dict: mAP50, mAP50-95 and per-class AP/recall
+    """
+    order = np.argsort(-confidences, kind='stable')
+    correct, confidences, pred_classes = correct[order], confidences[order], pred_classes[order]
+
+    per_class = {}
+    ap50, ap = [], []
+    for class_id, name in sorted(names.items()):
+        n_gt = int((gt_classes == class_id).sum())
+        mask = pred_classes == class_id
+        if n_gt == 0:
+            continue
+
+        tp = correct[mask]
+        tpc = tp.cumsum(axis=0)
+        fpc = (~tp).cumsum(axis=0)
+        recall = tpc / n_gt
+        precision = tpc / np.maximum(tpc + fpc, 1)
+        class_ap = np.array([average_precision(recall[:, k], precision[:, k])
+                             for k in range(len(IOU_THRESHOLDS))])
+
+        threshold = operating_conf.get(name.lower(), 0.5)
+        operating = confidences[mask] >= threshold
+        per_class[name] = {
+            'ground_truth': n_gt,
+            'ap50': float(class_ap[0]),
+            'ap50_95': float(class_ap.mean()),
+            'recall': float(tp[operating, 0].sum() / n_gt),
+            'recall_conf': threshold,
+        }
+        ap50.append(class_ap[0])
+        ap.append(class_ap.mean())
+
+    return {
+        'map50': float(np.mean(ap50)) if ap50 else 0.0,
+        'map50_95': float(np.mean(ap)) if ap else 0.0,
+        'classes': per_class,
+    }
+
+
+def evaluate(
+    backend,
+    split_dir: Path,
+    operating_conf: Dict[str, float],
+    conf: float = 0.001,
+    iou: float = 0.7,
+    max_images: Optional[int] = None
+) -> Dict[str, object]:
+    """
+    Evaluate a backend on a YOLO-format dataset split.
+
+    Args:
+        backend: Inference backend from backends.load_backend
+        split_dir (Path): Split directory with images/ and labels/
+        operating_conf (Dict[str, float]): Alerting threshold per class name
+        conf (float): Confidence threshold for the mAP sweep
+        iou (float): NMS IoU threshold
+        max_images (Optional[int]): Evaluate only the first N images
+
+    Returns:
+        dict: Metrics from compute_metrics plus the image count
+    """
+    split_dir = Path(split_dir)
+    images = list_images(split_dir)[:max_images]
+    labels_dir = split_dir / 'labels'
+
+    correct, confidences, pred_classes, gt_classes = [], [], [], []
+    for path in images:
+        frame = cv2.imread(str(path))
+        if frame is None:
+            continue
+        height, width = frame.shape[:2]
+        gt_boxes, gt_ids = load_labels(labels_dir / f'{path.stem}.txt', width, height)
+        boxes, class_ids, scores = backend([frame], iou=iou, conf=conf)[0]
+
+        correct.append(match_predictions(boxes, class_ids, gt_boxes, gt_ids))
+        confidences.append(scores)
+        pred_classes.append(class_ids)
+        gt_classes.append(gt_ids)
+
+    if not correct:
+        raise FileNotFoundError(f"No evaluation images found in {split_dir}")
+
+    metrics = compute_metrics(
+        np.concatenate(correct), np.concatenate(confidences),
+        np.concatenate(pred_classes), np.concatenate(gt_classes),
+        backend.names, operating_conf)
+    metrics['images'] = len(correct)
+    return metrics
+
+
+def compare(fp32: Dict[str, object], int8: Dict[str, object]) -> Dict[str, object]:
+    """INT8 minus FP32 deltas for mAP and per-class recall"""
+    deltas = {
+        'map50': int8['map50'] - fp32['map50'],
+        'map50_95': int8['map50_95'] - fp32['map50_95'],
+    }
+    for name, stats in fp32['classes'].items():
+        if name in int8['classes']:
+            deltas[f'{name.lower()}_recall'] = int8['classes'][name]['recall'] - stats['recall']
+    return deltas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="INT8 quantization with accuracy check")
+    parser.add_argument('--model', type=Path, required=True,
+                        help=".pt weights or FP32 .onnx model")
+    parser.add_argument('--output', type=Path, help="INT8 model path (default: <model>_int8.onnx)")
+    parser.add_argument('--calibration', type=Path, required=True,
+                        help="Directory or dataset split with calibration images")
+    parser.add_argument('--calibration-images', type=int, default=200)
+    parser.add_argument('--eval-split', type=Path,
+                        help="YOLO-format split (images/ + labels/) for the accuracy check")
+    parser.add_argument('--eval-images', type=int, default=None)
+    parser.add_argument('--fire-conf', type=float, default=0.5)
+    parser.add_argument('--smoke-conf', type=float, default=0.75)
+    parser.add_argument('--report', type=Path, help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s: %(message)s')
+
+    fp32_path = args.model if args.model.suffix == '.onnx' else args.model.with_suffix('.onnx')
+    if not fp32_path.exists():
+        fp32_path = export_model(args.model, 'onnx')
+    int8_path = args.output or fp32_path.with_name(f'{fp32_path.stem}_int8.onnx')
+    quantize_model(fp32_path, int8_path, args.calibration, args.calibration_images)
+    logger.info(f"INT8 model written to {int8_path}")
+
+    report = {'fp32_model': str(fp32_path), 'int8_model': str(int8_path)}
+    if args.eval_split:
+        operating_conf = {'fire': args.fire_conf, 'smoke': args.smoke_conf}
+        fp32_backend = load_backend(fp32_path, 'onnx')
+        int8_backend = load_backend(int8_path, 'onnx')
+        report['fp32'] = evaluate(fp32_backend, args.eval_split, operating_conf,
+                                  max_images=args.eval_images)
+        report['int8'] = evaluate(int8_backend, args.eval_split, operating_conf,
+                                  max_images=args.eval_images)
+        report['delta'] = compare(report['fp32'], report['int8'])
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.report:
+        args.report.write_text(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,377 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Tuple, Union
+
+import cv2
+import numpy as np
+
+try:
+    from .metrics import STAGE_SECONDS
+    from .pipeline import FramePipeline
+except ImportError:  # Imported as a top-level module by src/main.py
+    from metrics import STAGE_SECONDS
+    from pipeline import FramePipeline
+
+BOUNDARY = 'frame'
+CONTENT_TYPE = f'multipart/x-mixed-replace; boundary={BOUNDARY}'
+
+
+class StreamViewer:
+    __slots__ = ('qualities', 'level', 'frames_sent', 'frames_skipped', '_streak', 'recover_after')
+
+    def __init__(self, qualities: Sequence[int], recover_after: int = 30):
+        """
+        Per-client state of an MJPEG stream.
+
+        A viewer always receives the newest frame, so a slow client simply
+        skips frames. Every time frames were skipped its JPEG quality steps
+        down one level; after recover_after frames in a row without skips it
+        steps back up.
+
+        Args:
+            qualities (Sequence[int]): JPEG quality levels, best first
+            recover_after (int): Frames without skips before raising quality
+        """
+        self.qualities = tuple(qualities)
+        self.recover_after = recover_after
+        self.level = 0
+        self.frames_sent = 0
+        self.frames_skipped = 0
+        self._streak = 0
+
+    @property
+    def quality(self) -> int:
+        return self.qualities[self.level]
+
+    def update(self, skipped: int) -> None:
+        """Record a sent frame and how many frames were skipped before it"""
+        self.frames_sent += 1
+        self.frames_skipped += skipped
+        if skipped:
+            self.level = min(self.level + 1, len(self.qualities) - 1)
+            self._streak = 0
+            return
+        self._streak += 1
+        if self._streak >= self.recover_after and self.level > 0:
+            self.level -= 1
+            self._streak = 0
+
+
+class FrameBroadcaster:
+    def __init__(self, qualities: Sequence[int] = (80, 60, 40), keepalive: float = 5.0):
+        """
+        Fan out the newest frame to any number of MJPEG viewers.
+
+        The producer publishes raw frames; each frame is JPEG encoded at most
+        once per quality level, on demand, and the bytes are shared by every
+        viewer at that level. Frames nobody asks for are never encoded.
+
+        Args:
+            qualities (Sequence[int]): JPEG quality levels, best first
+            keepalive (float): Seconds without a new frame after which the
+                current frame is resent, so disconnected clients are noticed
+        """
+        if not qualities:
+            raise ValueError("At least one JPEG quality level is required")
+        self.logger = logging.getLogger(__name__)
+        self.qualities = tuple(qualities)
+        self.keepalive = keepalive
+
+        self._cond = threading.Condition()
+        self._encode_lock = threading.Lock()
+        self._frame: Optional[np.ndarray] = None
+        self._seq = 0
+        self._encoded: Dict[int, bytes] = {}
+        self.closed = False
+
+        self.viewers = 0
+        self.frames_published = 0
+        self.frames_encoded = 0
+        self.frames_sent = 0
+
+    def publish(self, frame: np.ndarray) -> None:
+        """Make frame the current one; it must not be modified afterwards"""
+        with self._cond:
+            self._frame = frame
+            self._seq += 1
+            self._encoded = {}
+            self.frames_published += 1
+            self._cond.notify_all()
+
+    def close(self) -> None:
+        """End every viewer's stream"""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def reopen(self) -> None:
+        with self._cond:
+            self.closed = False
+
+    def join(self, recover_after: int = 30) -> StreamViewer:
+        with self._cond:
+            self.viewers += 1
+        return StreamViewer(self.qualities, recover_after)
+
+    def leave(self, viewer: StreamViewer) -> None:
+        with self._cond:
+            self.viewers -= 1
+
+    def wait(self, after: int, timeout: Optional[float] = None) -> int:
+        """
+        Wait for a frame newer than sequence number after.
+
+        Returns:
+            int: Current sequence number, unchanged on timeout or close
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq > after or self.closed, timeout)
+            return self._seq
+
+    def encoded(self, quality: int) -> Tuple[int, Optional[bytes]]:
+        """
+        Current frame as JPEG at the given quality, encoding it if needed.
+
+        Returns:
+            Tuple[int, Optional[bytes]]: Sequence number and JPEG bytes, or
+                None if nothing was published yet
+        """
+        with self._cond:
+            seq, frame = self._seq, self._frame
+            jpeg = self._encoded.get(quality)
+        if jpeg is not None or frame is None:
+            return seq, jpeg
+
+        # One encoder at a time, so concurrent viewers share the result
+        with self._encode_lock:
+            with self._cond:
+                if self._seq == seq and quality in self._encoded:
+                    return seq, self._encoded[quality]
+            with STAGE_SECONDS.time(stage='encode'):
+                ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            if not ok:
+                raise ValueError("Failed to encode frame as JPEG")
+            jpeg = buffer.tobytes()
+            with self._cond:
+                self.frames_encoded += 1
+                if self._seq == seq:
+                    self._encoded[quality] = jpeg
+        return seq, jpeg
+
+    def mjpeg(self, viewer: StreamViewer) -> Iterator[bytes]:
+        """
+        Multipart MJPEG body for one viewer that has already joined.
+
+        Leaves the broadcaster when the stream ends or the client goes away
+        (the WSGI server closes the generator).
+        """
+        try:
+            sent = 0
+            while True:
+                latest = self.wait(sent, self.keepalive)
+                if self.closed:
+                    return
+                # No new frame within keepalive: resend to probe the connection
+                resend = latest == sent
+                seq, jpeg = self.encoded(viewer.quality)
+                if jpeg is None:
+                    continue
+                viewer.update(0 if resend or not sent else max(seq - sent - 1, 0))
+                sent = seq
+                with self._cond:
+                    self.frames_sent += 1
+                yield (f'--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n'
+                       f'Content-Length: {len(jpeg)}\r\n\r\n').encode() + jpeg + b'\r\n'
+        finally:
+            self.leave(viewer)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                'viewers': self.viewers,
+                'frames_published': self.frames_published,
+                'frames_encoded': self.frames_encoded,
+                'frames_sent': self.frames_sent,
+            }
+
+
+class DetectionStream:
+    def __init__(
+        self,
+        source: Union[int, str],
+        detect_fn: Callable[[np.ndarray], Any],
+        annotate_fn: Callable[[np.ndarray, Any], np.ndarray],
+        qualities: Sequence[int] = (80, 60, 40),
+        idle_timeout: float = 5.0
+        ):
+        """
+        Annotated live stream of one source, shared by all its viewers.
+
+        Capture and detection run on a FramePipeline that drops stale frames;
+        annotated frames are published to a FrameBroadcaster. The pipeline
+        starts with the first viewer and stops idle_timeout seconds after the
+        last one leaves, or when the source ends.
+
+        Args:
+            source (Union[int, str]): Camera index, file path or stream URL
+            detect_fn (Callable): Detector.detect or a MicroBatcher
+            annotate_fn (Callable): Detector.annotate
+            qualities (Sequence[int]): JPEG quality levels, best first
+            idle_timeout (float): Seconds to keep running without viewers
+        """
+        self.logger = logging.getLogger(__name__)
+        self.source = source
+        self.detect_fn = detect_fn
+        self.annotate_fn = annotate_fn
+        self.idle_timeout = idle_timeout
+        self.broadcaster = FrameBroadcaster(qualities)
+
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._retired: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def open(self) -> Iterator[bytes]:
+        """
+        Join as a viewer, starting capture if needed.
+
+        Returns:
+            Iterator[bytes]: Multipart MJPEG body
+
+        Raises:
+            IOError: If the source cannot be opened
+        """
+        retired = self._retired
+        if retired is not None:
+            # Let an idle pipeline release the camera before reopening it
+            retired.join(2.0)
+        with self._lock:
+            if self._thread is None:
+                capture = cv2.VideoCapture(self.source)
+                if not capture.isOpened():
+                    capture.release()
+                    raise IOError(f"Failed to open video source: {self.source}")
+                self._stop.clear()
+                self.broadcaster.reopen()
+                self._thread = threading.Thread(
+                    target=self._run, args=(capture,), daemon=True,
+                    name=f"mjpeg-{self.source}")
+                self._thread.start()
+                self.logger.info(f"Streaming source {self.source}")
+            viewer = self.broadcaster.join()
+        return self.broadcaster.mjpeg(viewer)
+
+    def _should_exit(self, idle_since: Optional[float]) -> bool:
+        if self._stop.is_set():
+            return True
+        if idle_since is None or time.monotonic() - idle_since < self.idle_timeout:
+            return False
+        with self._lock:
+            # Decided under the lock so a joining viewer restarts the stream
+            if self.broadcaster.viewers == 0:
+                self._retired, self._thread = self._thread, None
+                return True
+        return False
+
+    def _run(self, capture) -> None:
+        pipeline = FramePipeline(capture, self.detect_fn, drop_policy='oldest').start()
+        idle_since = None
+        try:
+            for frame, detections in pipeline:
+                self.broadcaster.publish(self.annotate_fn(frame, detections))
+                if self.broadcaster.viewers:
+                    idle_since = None
+                elif idle_since is None:
+                    idle_since = time.monotonic()
+                if self._should_exit(idle_since):
+                    return
+            self.logger.info(f"Source {self.source} ended")
+        except Exception as e:
+            self.logger.error(f"Stream of {self.source} failed: {e}")
+        finally:
+            pipeline.stop()
+            capture.release()
+            with self._lock:
+                if self._thread is threading.current_thread():
+                    self._thread = None
+                    # Source ended or failed: end the viewers' streams too
+                    self.broadcaster.close()
+            self.logger.info(f"Stopped streaming source {self.source}")
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        self.broadcaster.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {'source': self.source, 'running': self.running, **self.broadcaster.stats()}
+
+
+class StreamHub:
+    def __init__(
+        self,
+        detect_fn: Callable[[np.ndarray], Any],
+        annotate_fn: Callable[[np.ndarray, Any], np.ndarray],
+        qualities: Sequence[int] = (80, 60, 40),
+        idle_timeout: float = 5.0
+        ):
+        """
+        One DetectionStream per source, created on first request.
+
+        Args:
+            detect_fn (Callable): Shared detection function for all sources
+            annotate_fn (Callable): Detector.annotate
+            qualities (Sequence[int]): JPEG quality levels, best first
+            idle_timeout (float): Seconds a source keeps running without viewers
+        """
+        self.detect_fn = detect_fn
+        self.annotate_fn = annotate_fn
+        self.qualities = tuple(qualities)
+        self.idle_timeout = idle_timeout
+        self.streams: Dict[Union[int, str], DetectionStream] = {}
+        self._lock = threading.Lock()
+
+    def open(self, source: Union[int, str]) -> Iterator[bytes]:
+        """Join the stream of a source, see DetectionStream.open"""
+        with self._lock:
+            stream = self.streams.get(source)
+            if stream is None:
+                stream = self.streams[source] = DetectionStream(
+                    source, self.detect_fn, self.annotate_fn,
+                    self.qualities, self.idle_timeout)
+        try:
+            return stream.open()
+        except IOError:
+            with self._lock:
+                if not stream.running and not stream.broadcaster.viewers:
+                    self.streams.pop(source, None)
+            raise
+
+    def is_streaming(self, source: Union[int, str]) -> bool:
+        """Whether a source is currently being captured"""
+        with self._lock:
+            stream = self.streams.get(source)
+        return stream is not None and stream.running
+
+    def viewers(self) -> int:
+        with self._lock:
+            streams = list(self.streams.values())
+        return sum(stream.broadcaster.viewers for stream in streams)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            streams = list(self.streams.values())
+        return {str(stream.source): stream.stats() for stream in streams}
+
+    def stop(self) -> None:
+        with self._lock:
+            streams = list(self.streams.values())
+        for stream in streams:
+            stream.stop()
@@ -0,0 +1,226 @@
+import numpy as np
+from collections import deque
+from typing import Any, Callable, List, Optional, Tuple
+
+
+def box_iou(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """
+    Pairwise IoU between two sets of [x1, y1, x2, y2] boxes.
+
+    Args:
+        boxes_a (np.ndarray): (N, 4) boxes
+        boxes_b (np.ndarray): (M, 4) boxes
+
+    Returns:
+        np.ndarray: (N, M) IoU matrix
+    """
+    a = boxes_a[:, None, :]
+    b = boxes_b[None, :, :]
+    inter_w = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    inter_h = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = inter_w * inter_h
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    union = area_a + area_b - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+
+class Track:
+    """One tracked fire/smoke region with smoothed box and hit history"""
+
+    __slots__ = ('track_id', 'class_id', 'box', 'velocity', 'confidence',
+                 'hits', '_measured', '_since_measured', 'misses')
+
+    def __init__(self, track_id: int, class_id: int, box: np.ndarray,
+                 confidence: float, window: int):
+        self.track_id = track_id
+        self.class_id = class_id
+        self.box = box.astype(np.float32)
+        self.velocity = np.zeros(4, dtype=np.float32)
+        self.confidence = float(confidence)
+        self.hits = deque([True], maxlen=window)
+        self._measured = self.box.copy()
+        self._since_measured = 0
+        self.misses = 0
+
+    def advance(self) -> None:
+        """Move the box one frame along its estimated velocity"""
+        self.box = self.box + self.velocity
+        self._since_measured += 1
+
+    def correct(self, box: np.ndarray, confidence: float, smoothing: float) -> None:
+        """Blend a new measurement into the track"""
+        steps = max(self._since_measured, 1)
+        measured_velocity = (box - self._measured) / steps
+        self.velocity = smoothing * measured_velocity + (1 - smoothing) * self.velocity
+        self.box = smoothing * box + (1 - smoothing) * self.box
+        self.confidence = smoothing * float(confidence) + (1 - smoothing) * self.confidence
+        self._measured = box.astype(np.float32)
+        self._since_measured = 0
+        self.hits.append(True)
+        self.misses = 0
+
+    def miss(self) -> None:
+        self.hits.append(False)
+        self.misses += 1
+
+
+class DetectionTracker:
+    def __init__(
+        self,
+        classify: Callable[[np.ndarray, np.ndarray], Optional[str]],
+        iou_threshold: float = 0.3,
+        smoothing: float = 0.6,
+        confirm_hits: int = 3,
+        window: int = 5,
+        max_misses: int = 5
+        ):
+        """
+        Lightweight IoU tracker that smooths detections over time.
+
+        Detections are associated with existing tracks of the same class by
+        greedy IoU matching. Boxes, velocities and confidences are smoothed
+        with an exponential moving average, and a track only counts once it
+        was matched in confirm_hits of the last window detector runs. Between
+        detector runs, predict() moves tracks along their velocity so the
+        display stays smooth while the model runs at a lower rate.
+
+        Args:
+            classify (Callable): Maps sorted class ids and confidences to the
+                overall verdict, e.g. Detector.classify
+            iou_threshold (float): Minimum IoU to associate a detection with a track
+            smoothing (float): EMA weight of new measurements
+            confirm_hits (int): K in "confirmed after K of N detector runs"
+            window (int): N in "confirmed after K of N detector runs"
+            max_misses (int): Consecutive misses before a track is dropped
+        """
+        self.classify = classify
+        self.iou_threshold = iou_threshold
+        self.smoothing = smoothing
+        self.confirm_hits = confirm_hits
+        self.window = max(window, confirm_hits)
+        self.max_misses = max_misses
+
+        self.tracks: List[Track] = []
+        self._next_id = 0
+        self._template = None
+
+    def _is_confirmed(self, track: Track) -> bool:
+        return sum(track.hits) >= self.confirm_hits
+
+    def _match(self, boxes: np.ndarray, class_ids: np.ndarray) -> List[Tuple[int, int]]:
+        """Greedy IoU association of detections with same-class tracks"""
+        if not self.tracks or len(boxes) == 0:
+            return []
+
+        track_boxes = np.stack([track.box for track in self.tracks])
+        track_classes = np.array([track.class_id for track in self.tracks])
+        iou = box_iou(track_boxes, boxes.astype(np.float32))
+        iou[track_classes[:, None] != class_ids[None, :]] = 0.0
+
+        matches = []
+        used_tracks, used_detections = set(), set()
+        for flat in np.argsort(-iou, axis=None):
+            t, d = np.unravel_index(flat, iou.shape)
+            if iou[t, d] < self.iou_threshold:
+                break
+            if t in used_tracks or d in used_detections:
+                continue
+            matches.append((int(t), int(d)))
+            used_tracks.add(t)
+            used_detections.add(d)
+        return matches
+
+    def update(self, detections: Any) -> Any:
+        """
+        Feed a fresh detector result into the tracker.
+
+        Args:
+            detections: Detections for the current frame
+
+        Returns:
+            Detections of the same type holding the smoothed boxes of
+            confirmed tracks and the verdict derived from them
+        """
+        self._template = detections
+        boxes = np.asarray(detections.boxes, dtype=np.float32).reshape(-1, 4)
+        class_ids = np.asarray(detections.class_ids, dtype=int)
+        confidences = np.asarray(detections.confidences, dtype=np.float32)
+
+        for track in self.tracks:
+            track.advance()
+
+        matches = self._match(boxes, class_ids)
+        matched_tracks = {t for t, _ in matches}
+        matched_detections = {d for _, d in matches}
+
+        for t, d in matches:
+            self.tracks[t].correct(boxes[d], confidences[d], self.smoothing)
+
+        for t, track in enumerate(self.tracks):
+            if t not in matched_tracks:
+                track.miss()
+
+        for d in range(len(boxes)):
+            if d not in matched_detections:
+                self.tracks.append(Track(self._next_id, class_ids[d], boxes[d],
+                                         confidences[d], self.window))
+                self._next_id += 1
+
+        self.tracks = [track for track in self.tracks if track.misses <= self.max_misses]
+        return self._output()
+
+    def predict(self) -> Any:
+        """
+        Interpolate track boxes for a frame the detector did not run on.
+
+        Returns:
+            Detections of confirmed tracks moved along their velocity
+        """
+        for track in self.tracks:
+            track.advance()
+        return self._output()
+
+    def _output(self) -> Any:
+        confirmed = sorted((track for track in self.tracks if self._is_confirmed(track)),
+                           key=lambda track: -track.confidence)
+        if confirmed:
+            boxes = np.stack([track.box for track in confirmed]).astype(np.float32)
+        else:
+            boxes = np.empty((0, 4), dtype=np.float32)
+        class_ids = np.array([track.class_id for track in confirmed], dtype=int)
+        confidences = np.array([track.confidence for track in confirmed], dtype=np.float32)
+
+        if self._template is None:
+            return None
+        return self._template._replace(
+            boxes=boxes,
+            class_ids=class_ids,
+            confidences=confidences,
+            detection=self.classify(class_ids, confidences)
+        )
+
+    def wrap(
+        self,
+        detect_fn: Callable[[np.ndarray], Any],
+        should_infer: Optional[Callable[[np.ndarray], bool]] = None
+    ) -> Callable[[np.ndarray], Any]:
+        """
+        Combine a detector with the tracker for a single stream.
+
+        Args:
+            detect_fn (Callable): Inference function, e.g. Detector.detect
+            should_infer (Optional[Callable]): Decides per frame whether to run
+                the detector (e.g. MotionGate.should_infer); frames it skips are
+                interpolated by the tracker. Runs the detector on every frame
+                when omitted
+
+        Returns:
+            Callable: Function mapping a frame to tracked Detections
+        """
+        def tracked(frame: np.ndarray) -> Any:
+            if should_infer is None or should_infer(frame) or self._template is None:
+                return self.update(detect_fn(frame))
+            return self.predict()
+
+        return tracked
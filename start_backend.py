@@ -1,17 +1,37 @@
 #!/usr/bin/env python3
 """
 Simple script to start the Flask backend server
+
+    python start_backend.py                # development server with debug
+    python start_backend.py --production   # gunicorn, see gunicorn.conf.py
 """
+import argparse
 import sys
 import os
 
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
 # Add the current directory to Python path
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
 
-# Import and run the Flask app
-from app import app
 
-if __name__ == '__main__':
+def run_production():
+    """Serve with gunicorn: preloaded model, several workers, threaded requests"""
+    try:
+        from gunicorn.app.wsgiapp import run
+    except ImportError:
+        print("Production mode needs gunicorn (Linux/macOS): pip install gunicorn")
+        sys.exit(1)
+
+    sys.argv = ['gunicorn', '-c', os.path.join(PROJECT_ROOT, 'gunicorn.conf.py'),
+                '--chdir', PROJECT_ROOT, 'wsgi:app']
+    run()
+
+
+def run_development():
+    # Import and run the Flask app
+    from app import app
+
     print("Starting Fire-Smoke Detection Backend Server...")
     print("Server will be available at: http://localhost:5000")
     print("Health Check: http://localhost:5000/health")
@@ -23,3 +43,15 @@ if __name__ == '__main__':
         print("\nServer stopped by user")
     except Exception as e:
         print(f"Error starting server: {e}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Start the Fire-Smoke Detection backend")
+    parser.add_argument('--production', action='store_true',
+                        help="Serve with gunicorn instead of the Flask development server")
+    args = parser.parse_args()
+
+    if args.production:
+        run_production()
+    else:
+        run_development()
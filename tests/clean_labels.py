@@ -1,15 +1,441 @@
+import argparse
+import hashlib
+import io
+import json
+import locale
 import os
+import re
 import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import List, NamedTuple, Optional, Tuple
 import numpy as np
 import logging
 from tests import TEST_DATA_DIR
 
+
+class LabelTask(NamedTuple):
+    split: str
+    path: str
+    # Content hash from the manifest; a file with this hash needs no cleaning
+    sha256: Optional[str] = None
+    # Same size and mtime as in the manifest, only read to compare the hash
+    racy: bool = False
+
+
+class LabelFileResult(NamedTuple):
+    split: str
+    label_file: str
+    lines: int
+    invalid: int
+    converted: int
+    duplicates: int
+    had_duplicates: bool
+    written: bool
+    messages: List[Tuple[int, str]]
+    # Manifest entry describing the file as it is after this run
+    entry: Optional[dict] = None
+    # Not cleaned because it is unchanged since the last run
+    skipped: bool = False
+
+    @property
+    def processed(self):
+        return self.invalid + self.converted + self.duplicates
+
+
+# Incremental runs: per-file state of the last run, kept in the dataset root
+MANIFEST_NAME = '.clean_labels_manifest.json'
+MANIFEST_VERSION = 1
+# A file modified this soon before the manifest was written may have changed
+# again within the same mtime tick, so its size and mtime are not trusted
+RACY_NS = 2 * 10 ** 9
+# Backup snapshot directories are named after their creation time
+SNAPSHOT_NAME = re.compile(r'\d{8}-\d{6}(?:-\d+)?')
+
+# Label files are read and written like open() in text mode does
+ENCODING = locale.getpreferredencoding(False)
+
+# Line outcomes: (line to write or None, what it counts as, message to log)
+KEEP, INVALID, CONVERTED, DROPPED = 'keep', 'invalid', 'converted', 'dropped'
+
+ENGINES = ('numpy', 'python')
+
+# Line status codes in the engines' arrays
+_KEEP, _INVALID, _CONVERTED, _DROPPED = range(4)
+STATUS = {KEEP: _KEEP, INVALID: _INVALID, CONVERTED: _CONVERTED, DROPPED: _DROPPED}
+# Only used inside clean_lines_numpy()
+_SLOW, _UNPROCESSABLE, _BAD_CONVERSION = range(4, 7)
+
+# A label line the NumPy engine parses directly: an integer class and
+# decimal coordinates separated by single spaces. Anything else (tabs,
+# nan/inf, underscores, Windows line ends) takes the per-line path.
+# Possessive quantifiers keep matching linear on large batches.
+DECIMAL = r'[+-]?+(?:[0-9]++(?:\.[0-9]*+)?+|\.[0-9]++)(?:[eE][+-]?+[0-9]++)?+'
+PLAIN_LINE = rf'[0-9]{{1,15}}+(?: {DECIMAL})++\n'
+PLAIN_TEXT = re.compile(rf'(?:{PLAIN_LINE})*+')
+PLAIN_LINE = re.compile(PLAIN_LINE)
+
+
+def is_valid_bbox(bbox_coords):
+    """Validate YOLO bbox coordinates"""
+    return (len(bbox_coords) == 4 and
+            all(0 <= coord <= 1 for coord in bbox_coords))
+
+
+def clean_label_line(line, label_file):
+    """
+    Validate and clean one label line; the reference for the NumPy engine.
+
+    Returns:
+        Tuple[Optional[str], str, Optional[Tuple[int, str]]]: Line to write
+            (None to drop it), its outcome and the message to log
+    """
+    parts = line.strip().split()
+
+    # Validate basic label structure
+    if len(parts) < 5:
+        return None, INVALID, (logging.WARNING, f"Invalid label in {label_file}: {line.strip()}")
+
+    try:
+        class_idx = int(parts[0])
+        coords = list(map(float, parts[1:]))
+
+        # Standard YOLO bbox
+        if is_valid_bbox(coords):
+            return line, KEEP, None
+
+        # Polygon conversion attempt
+        if len(coords) >= 6 and len(coords) % 2 == 0:
+            x_coords = coords[0::2]
+            y_coords = coords[1::2]
+
+            x_min, x_max = min(x_coords), max(x_coords)
+            y_min, y_max = min(y_coords), max(y_coords)
+
+            width = round(x_max - x_min, 5)
+            height = round(y_max - y_min, 5)
+
+            center_x = round(x_min + width / 2, 5)
+            center_y = round(y_min + height / 2, 5)
+
+            new_bbox = [center_x, center_y, width, height]
+
+            if is_valid_bbox(new_bbox):
+                new_line = f"{class_idx} {new_bbox[0]} {new_bbox[1]} {new_bbox[2]} {new_bbox[3]}\n"
+                return new_line, CONVERTED, None
+            return None, DROPPED, (logging.WARNING, f"Invalid converted bbox in {label_file}")
+
+        return None, DROPPED, (logging.WARNING, f"Unprocessable label in {label_file}: {line.strip()}")
+
+    except (ValueError, IndexError) as e:
+        return None, DROPPED, (logging.ERROR, f"Error processing label in {label_file}: {line.strip()} - {e}")
+
+
+def round5(values):
+    """
+    round(value, 5) for every element, with the same results as Python.
+
+    rint(x * 1e5) / 1e5 is the double nearest to the rounded decimal, as
+    round() returns, unless x * 1e5 is too close to a tie for the product's
+    rounding error to be ruled out; those elements use round() itself.
+    """
+    scaled = values * 1e5
+    rounded = np.rint(scaled) / 1e5
+    unsure = ((np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < 1e-3)
+              | (np.abs(scaled) >= 2.0 ** 40))
+    for index in zip(*np.nonzero(unsure)):
+        rounded[index] = round(float(values[index]), 5)
+    return rounded
+
+
+def clean_lines_python(lines, label_files):
+    """
+    Clean label lines one by one with clean_label_line().
+
+    Args:
+        lines (List[str]): Lines of one or more label files
+        label_files (List[str]): File name of every line, for messages
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, Dict[int, Tuple[int, str]]]: Line to
+            write for every line (None to drop it), status codes, and
+            messages by line number
+    """
+    output = np.empty(len(lines), dtype=object)
+    status = np.empty(len(lines), dtype=np.int8)
+    messages = {}
+    for i, (line, label_file) in enumerate(zip(lines, label_files)):
+        output[i], outcome, message = clean_label_line(line, label_file)
+        status[i] = STATUS[outcome]
+        if message is not None:
+            messages[i] = message
+    return output, status, messages
+
+
+def clean_lines_numpy(lines, label_files):
+    """
+    Clean label lines with array operations.
+
+    All plain lines (see PLAIN_LINE) are parsed into one float array in a
+    single call, then grouped by their number of fields, so range checks and
+    polygon-to-bbox conversion run once per group instead of once per line.
+    Other lines, and coordinates that overflow to infinity, go through
+    clean_label_line(), so the result is identical to clean_lines_python().
+
+    Args:
+        lines (List[str]): Lines of one or more label files
+        label_files (List[str]): File name of every line, for messages
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, Dict[int, Tuple[int, str]]]: Line to
+            write for every line (None to drop it), status codes, and
+            messages by line number
+    """
+    status = np.full(len(lines), _SLOW, dtype=np.int8)
+    output = np.empty(len(lines), dtype=object)
+    output[:] = lines
+
+    text = ''.join(lines)
+    lines_ = lines
+    if text.count('\n') != len(lines):
+        # The last line of a file may lack its newline
+        lines_ = [line if line[-1:] == '\n' else line + '\n' for line in lines]
+        text = ''.join(lines_)
+    if PLAIN_TEXT.fullmatch(text):
+        plain = np.arange(len(lines))
+    else:
+        plain = np.flatnonzero([PLAIN_LINE.fullmatch(line) is not None for line in lines_])
+
+    if plain.size:
+        plain_lines = [lines_[i] for i in plain] if plain.size < len(lines) else lines_
+        sizes = np.fromiter(map(str.count, plain_lines, [' '] * len(plain_lines)),
+                            dtype=np.int64, count=len(plain_lines)) + 1
+        starts = np.cumsum(sizes) - sizes
+        try:
+            # Every field is a separate number
+            values = np.fromstring(''.join(plain_lines), sep=' ')
+        except ValueError:
+            values = None
+        if values is None or values.size != sizes.sum():
+            plain = sizes = starts = plain[:0]
+
+        status[plain[sizes < 5]] = _INVALID
+        for size in np.unique(sizes[sizes >= 5]).tolist():
+            group = np.flatnonzero(sizes == size)
+            coords = values[starts[group, None] + np.arange(1, size)]
+            # 1e400 parses to infinity; leave such lines to the reference path
+            finite = np.isfinite(coords).all(axis=1)
+            group, coords = group[finite], coords[finite]
+            indices = plain[group]
+            count = size - 1
+
+            if count == 4:
+                valid = ((coords >= 0) & (coords <= 1)).all(axis=1)
+                status[indices] = np.where(valid, _KEEP, _UNPROCESSABLE)
+                continue
+            if count < 6 or count % 2:
+                status[indices] = _UNPROCESSABLE
+                continue
+
+            x_min, x_max = coords[:, 0::2].min(axis=1), coords[:, 0::2].max(axis=1)
+            y_min, y_max = coords[:, 1::2].min(axis=1), coords[:, 1::2].max(axis=1)
+            width = round5(x_max - x_min)
+            height = round5(y_max - y_min)
+            bboxes = np.stack([round5(x_min + width / 2), round5(y_min + height / 2), width, height], axis=1)
+            valid = ((bboxes >= 0) & (bboxes <= 1)).all(axis=1)
+            status[indices] = np.where(valid, _CONVERTED, _BAD_CONVERSION)
+
+            classes = values[starts[group[valid]]].astype(np.int64).tolist()
+            output[indices[valid]] = [f"{class_idx} {bbox[0]} {bbox[1]} {bbox[2]} {bbox[3]}\n"
+                                      for class_idx, bbox in zip(classes, bboxes[valid].tolist())]
+
+    messages = {}
+    for i in np.flatnonzero(status == _SLOW).tolist():
+        # Lines the arrays could not take
+        output[i], outcome, message = clean_label_line(lines[i], label_files[i])
+        status[i] = STATUS[outcome]
+        if message is not None:
+            messages[i] = message
+    for i in np.flatnonzero(status == _INVALID).tolist():
+        if i not in messages:
+            messages[i] = (logging.WARNING, f"Invalid label in {label_files[i]}: {lines[i].strip()}")
+    for i in np.flatnonzero(status == _UNPROCESSABLE).tolist():
+        messages[i] = (logging.WARNING, f"Unprocessable label in {label_files[i]}: {lines[i].strip()}")
+    for i in np.flatnonzero(status == _BAD_CONVERSION).tolist():
+        messages[i] = (logging.WARNING, f"Invalid converted bbox in {label_files[i]}")
+
+    output[(status != _KEEP) & (status != _CONVERTED)] = None
+    status[status >= _DROPPED] = _DROPPED
+    return output, status, messages
+
+
+def write_atomic(path, data):
+    """
+    Replace a file's content in one step.
+
+    Readers see the old or the new file, never a partial one, and the new
+    content goes to a new inode, so hard links to the old file (backup
+    snapshots) keep the old content.
+    """
+    directory, name = os.path.split(path)
+    tmp_path = os.path.join(directory, f'.{name}.{os.getpid()}.tmp')
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        if os.path.exists(path):
+            shutil.copymode(path, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def file_entry(st, sha256, lines, had_duplicates):
+    """Manifest entry of a label file"""
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': sha256,
+            'lines': lines, 'had_duplicates': had_duplicates}
+
+
+def clean_label_files(tasks, engine='numpy'):
+    """
+    Validate and clean label files, reading each file once.
+
+    The lines of all files go through the engine together, so the NumPy
+    engine's per-call overhead is shared by the batch. Runs in the worker
+    processes of YOLODatasetPreprocessor, so log messages are returned with
+    the results and logged by the parent in file order. Files whose content
+    hash matches the one in their task were cleaned by an earlier run and
+    are skipped.
+
+    Args:
+        tasks (List[LabelTask]): Split name and path of each file, and its
+            hash from the manifest
+        engine (str): 'numpy' (clean_lines_numpy) or 'python'
+            (clean_lines_python); both write identical files
+
+    Returns:
+        List[LabelFileResult]: Counts of invalid, converted and duplicate
+            labels, whether the file was rewritten, the messages to log and
+            the file's new manifest entry
+    """
+    tasks = [LabelTask(*task) for task in tasks]
+    results = [None] * len(tasks)
+    fresh = []
+    lines, label_files, bounds = [], [], [0]
+    for k, task in enumerate(tasks):
+        label_file = os.path.basename(task.path)
+        with open(task.path, 'rb') as f:
+            data = f.read()
+            st = os.fstat(f.fileno())
+        sha256 = hashlib.sha256(data).hexdigest()
+        file_lines = io.TextIOWrapper(io.BytesIO(data), encoding=ENCODING).readlines()
+
+        # What validate_dataset() reports: duplicate lines as read
+        had_duplicates = len(set(file_lines)) != len(file_lines)
+        entry = file_entry(st, sha256, len(file_lines), had_duplicates)
+
+        if sha256 == task.sha256:
+            # Only touched since the last run
+            results[k] = LabelFileResult(task.split, label_file, len(file_lines), 0, 0, 0,
+                                         had_duplicates, False, [], entry, True)
+            continue
+
+        file_messages = []
+        if task.racy:
+            # Cleaned without a new backup snapshot being taken first
+            file_messages.append((logging.WARNING, f"{label_file} changed without its size or mtime changing"))
+        fresh.append((k, label_file, had_duplicates, entry, file_messages))
+        lines.extend(file_lines)
+        label_files.extend([label_file] * len(file_lines))
+        bounds.append(len(lines))
+
+    clean = clean_lines_numpy if engine == 'numpy' else clean_lines_python
+    output, status, messages = clean(lines, label_files)
+    # Plain lists from here: slicing them per file is cheaper than arrays
+    kept_lines = np.where((status == _KEEP) | (status == _CONVERTED), output, None).tolist()
+
+    file_index = np.repeat(np.arange(len(fresh)), np.diff(bounds))
+    invalid_counts = np.bincount(file_index[status == _INVALID], minlength=len(fresh)).tolist()
+    converted_counts = np.bincount(file_index[status == _CONVERTED], minlength=len(fresh)).tolist()
+    message_lines = sorted(messages)
+    message_bounds = np.searchsorted(message_lines, bounds).tolist()
+
+    for j, (k, label_file, had_duplicates, entry, file_messages) in enumerate(fresh):
+        task = tasks[k]
+        lo, hi = bounds[j], bounds[j + 1]
+        cleaned_lines = [line for line in kept_lines[lo:hi] if line is not None]
+        file_messages.extend(messages[i] for i in message_lines[message_bounds[j]:message_bounds[j + 1]])
+        invalid, converted = invalid_counts[j], converted_counts[j]
+
+        # Keep the first of each duplicate, in file order, so reruns and
+        # parallel runs write identical files
+        unique_lines = list(dict.fromkeys(cleaned_lines))
+        duplicates = len(cleaned_lines) - len(unique_lines)
+        if duplicates:
+            file_messages.append((logging.WARNING, f"Duplicates detected in {label_file}: {duplicates} duplicates"))
+
+        # Only write if changes were detected
+        written = bool(invalid or converted or duplicates)
+        if written:
+            data = ''.join(unique_lines).replace('\n', os.linesep).encode(ENCODING)
+            write_atomic(task.path, data)
+            file_messages.append((logging.INFO,
+                                  f"Processed {label_file}: {invalid + converted + duplicates} labels"))
+            entry = file_entry(os.stat(task.path), hashlib.sha256(data).hexdigest(),
+                               len(unique_lines), False)
+
+        results[k] = LabelFileResult(task.split, label_file, hi - lo, invalid, converted, duplicates,
+                                     had_duplicates, written, file_messages, entry)
+    return results
+
+
+def clean_label_file(task, engine='numpy'):
+    """Validate and clean one label file, see clean_label_files()"""
+    return clean_label_files([task], engine)[0]
+
+
 class YOLODatasetPreprocessor:
-    def __init__(self, dataset_path):
+    def __init__(self, dataset_path, workers=None, engine='numpy', batch_size=1000,
+                 incremental=True, keep_backups=5):
+        """
+        Clean and validate a YOLO dataset (train/valid/test splits).
+
+        Runs are incremental: the size, mtime and content hash of every label
+        file are kept in a manifest in the dataset root with the file's
+        result, and a rerun only reads files that are new or whose size or
+        mtime changed. Of those, files whose content hash still matches are
+        not cleaned again.
+
+        Args:
+            dataset_path (str): Dataset root
+            workers (int): Processes cleaning label files, defaults to the
+                number of cores; 1 cleans in this process
+            engine (str): Label engine, 'numpy' or the per-line 'python'
+                reference; both write identical files
+            batch_size (int): Most label files cleaned in one engine call
+            incremental (bool): Skip files unchanged since the last run; False
+                cleans every file and rebuilds the manifest
+            keep_backups (int): Backup snapshots kept
+
+        Raises:
+            ValueError: If the engine is unknown
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown label engine: {engine}, expected one of {ENGINES}")
         self.dataset_path = dataset_path
         self.splits = ['train', 'valid', 'test']
+        self.workers = workers or os.cpu_count() or 1
+        self.engine = engine
+        self.batch_size = batch_size
+        self.incremental = incremental
+        self.keep_backups = keep_backups
+        self.manifest_path = os.path.join(dataset_path, MANIFEST_NAME)
+        self.backup_root = os.path.join(dataset_path, 'backup')
 
         # Configure logging
+        os.makedirs('logs', exist_ok=True)
         log_filename = f'logs/dataset_preprocessing.log'
         logging.basicConfig(
             level=logging.INFO,
@@ -23,14 +449,41 @@ class YOLODatasetPreprocessor:
 
     def is_valid_bbox(self, bbox_coords):
         """Validate YOLO bbox coordinates"""
-        return (len(bbox_coords) == 4 and
-                all(0 <= coord <= 1 for coord in bbox_coords))
+        return is_valid_bbox(bbox_coords)
+
+    def clean_files(self, tasks):
+        """
+        Clean label files, in parallel when there are several workers.
+
+        Args:
+            tasks (List[LabelTask]): Split name and path of each file, and its
+                hash from the manifest
+
+        Returns:
+            List[LabelFileResult]: Results in the order of tasks
+        """
+        clean = partial(clean_label_files, engine=self.engine)
+        workers = min(self.workers, len(tasks))
+        # Batches of files share the engine's per-call overhead; several
+        # batches per worker keep the pool balanced
+        size = self.batch_size
+        if workers > 1:
+            size = min(size, max(1, len(tasks) // (workers * 4)))
+        batches = [tasks[i:i + size] for i in range(0, len(tasks), size)]
+        if workers <= 1:
+            results = [result for batch in batches for result in clean(batch)]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = [result for batch_results in pool.map(clean, batches) for result in batch_results]
 
-    def process_labels(self):
-        """Robust label processing with strict validation"""
-        total_processed_files = 0
-        total_converted_labels = 0
+        for result in results:
+            for level, message in result.messages:
+                self.logger.log(level, message)
+        return results
 
+    def label_tasks(self):
+        """Split name and path of every label file"""
+        tasks = []
         for split in self.splits:
             labels_dir = os.path.join(self.dataset_path, split, 'labels')
 
@@ -39,81 +492,132 @@ class YOLODatasetPreprocessor:
                     f"Labels directory not found for split {split}")
                 continue
 
-            for label_file in os.listdir(labels_dir):
-                label_path = os.path.join(labels_dir, label_file)
-
-                with open(label_path, 'r') as f:
-                    lines = f.readlines()
+            for label_file in sorted(os.listdir(labels_dir)):
+                # Skip temporary files of interrupted atomic writes
+                if not label_file.startswith('.'):
+                    tasks.append((split, os.path.join(labels_dir, label_file)))
+        return tasks
+
+    def load_manifest(self):
+        """Manifest of the last run; empty if there is none or it is unusable"""
+        try:
+            with open(self.manifest_path, 'r') as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable manifest {self.manifest_path}: {e}")
+            return {}
+        if not isinstance(manifest, dict) or manifest.get('version') != MANIFEST_VERSION:
+            self.logger.warning(f"Ignoring manifest {self.manifest_path} of another version")
+            return {}
+        return manifest
+
+    def save_manifest(self, results):
+        """Record the state of every label file after this run"""
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'engine': self.engine,
+            'written_at_ns': time.time_ns(),
+            'files': {f'{result.split}/labels/{result.label_file}': result.entry for result in results}
+        }
+        write_atomic(self.manifest_path, json.dumps(manifest).encode())
+
+    def plan(self, tasks):
+        """
+        Split label files into those to read and those unchanged since the
+        last run, using only their size and mtime.
+
+        Args:
+            tasks (List[Tuple[str, str]]): Split name and path of each file
+
+        Returns:
+            Tuple[List[LabelTask], List[LabelFileResult]]: Files to read, with
+                their last known hash, and results of the unchanged files
+        """
+        manifest = self.load_manifest() if self.incremental else {}
+        files = manifest.get('files', {})
+        # Modified just before the last run finished: the same size and mtime
+        # do not prove the file has not changed since
+        trusted_before = manifest.get('written_at_ns', 0) - RACY_NS
+
+        pending, unchanged = [], []
+        for split, label_path in tasks:
+            label_file = os.path.basename(label_path)
+            entry = files.get(f'{split}/labels/{label_file}')
+            if entry is None:
+                pending.append(LabelTask(split, label_path))
+                continue
+            st = os.stat(label_path)
+            same_stat = st.st_size == entry['size'] and st.st_mtime_ns == entry['mtime_ns']
+            if same_stat and st.st_mtime_ns < trusted_before:
+                unchanged.append(LabelFileResult(split, label_file, entry['lines'], 0, 0, 0,
+                                                 entry['had_duplicates'], False, [], entry, True))
+            else:
+                pending.append(LabelTask(split, label_path, entry['sha256'], racy=same_stat))
+        return pending, unchanged
+
+    def process_labels(self, pending=None, unchanged=None):
+        """
+        Robust label processing with strict validation.
+
+        Args:
+            pending (List[LabelTask]): Files to read, as returned by plan();
+                planned here by default
+            unchanged (List[LabelFileResult]): Results of the files plan()
+                found unchanged
+
+        Returns:
+            List[LabelFileResult]: Results of every label file, in split and
+                file order
+        """
+        if pending is None:
+            pending, unchanged = self.plan(self.label_tasks())
+        results = self.clean_files(pending) + list(unchanged or [])
+        split_order = {split: i for i, split in enumerate(self.splits)}
+        results.sort(key=lambda result: (split_order[result.split], result.label_file))
+        self.save_manifest(results)
+        written = [result for result in results if result.written]
+
+        self.logger.info(f"Unchanged files skipped: {sum(result.skipped for result in results)} of {len(results)}")
+        self.logger.info(f"Total processed files: {len(written)}")
+        self.logger.info(f"Total converted labels: {sum(result.processed for result in written)}")
+        return results
+
+    def missing_files(self):
+        """
+        Splits without images/labels directories and images without labels.
+
+        Only lists directories; no label file is read.
+
+        Returns:
+            Tuple[List[str], dict]: Missing splits and missing labels per split
+        """
+        missing_directories = []
+        missing_labels = {}
 
-                cleaned_lines = []
-                processed_count = 0
+        for split in self.splits:
+            images_dir = os.path.join(self.dataset_path, split, 'images')
+            labels_dir = os.path.join(self.dataset_path, split, 'labels')
 
-                for line in lines:
-                    parts = line.strip().split()
+            if not (os.path.exists(images_dir) and os.path.exists(labels_dir)):
+                self.logger.warning(f"Missing directories in {split}")
+                missing_directories.append(split)
+                continue
 
-                    # Validate basic label structure
-                    if len(parts) < 5:
-                        self.logger.warning(f"Invalid label in {label_file}: {line.strip()}")
-                        processed_count+=1
-                        continue
+            image_files = set(os.listdir(images_dir))
+            label_files = set(os.listdir(labels_dir))
 
-                    try:
-                        class_idx = int(parts[0])
-                        coords = list(map(float, parts[1:]))
+            # Check matching images and labels
+            expected_labels = {
+                f.rsplit('.', 1)[0] + '.txt' for f in image_files}
+            missing = expected_labels - label_files
 
-                        # Standard YOLO bbox
-                        if self.is_valid_bbox(coords):
-                            cleaned_lines.append(line)
-                            continue
+            if missing:
+                self.logger.warning(f"Missing labels in {split}: {missing}")
+                missing_labels[split] = missing
 
-                        # Polygon conversion attempt
-                        if len(coords) >= 6 and len(coords) % 2 == 0:
-                            x_coords = coords[0::2]
-                            y_coords = coords[1::2]
-
-                            x_min, x_max = min(x_coords), max(x_coords)
-                            y_min, y_max = min(y_coords), max(y_coords)
-
-                            width = round(x_max - x_min, 5)
-                            height = round(y_max - y_min, 5)
-
-                            center_x = round(x_min + width / 2, 5)
-                            center_y = round(y_min + height / 2, 5)
-
-                            new_bbox = [center_x, center_y, width, height]
-
-                            if self.is_valid_bbox(new_bbox):
-                                new_line = f"{class_idx} {new_bbox[0]} {
-                                    new_bbox[1]} {new_bbox[2]} {new_bbox[3]}\n"
-                                cleaned_lines.append(new_line)
-                                processed_count += 1
-                            else:
-                                self.logger.warning(
-                                    f"Invalid converted bbox in {label_file}")
-                        else:
-                            self.logger.warning(f"Unprocessable label in {
-                                                label_file}: {line.strip()}")
-
-                    except (ValueError, IndexError) as e:
-                        self.logger.error(f"Error processing label in {
-                                          label_file}: {line.strip()} - {e}")
-
-                # Only write if changes were detected
-                if len(set(cleaned_lines)) != len(cleaned_lines):
-                    self.logger.warning(f"Duplicates detected in {label_file}: {
-                                        len(lines)-len(set(cleaned_lines))} duplicates")
-                    processed_count += (len(cleaned_lines) - len(set(cleaned_lines)))
-                    cleaned_lines = list(set(cleaned_lines))
-
-                if processed_count:
-                    with open(label_path, 'w') as f:
-                        f.writelines(cleaned_lines)
-                    self.logger.info(f"Processed {label_file}: {processed_count} labels")
-                    total_processed_files += 1
-                    total_converted_labels += processed_count
-
-        self.logger.info(f"Total processed files: {total_processed_files}")
-        self.logger.info(f"Total converted labels: {total_converted_labels}")
+        return missing_directories, missing_labels
 
     def validate_dataset(self):
         """Comprehensive dataset validation"""
@@ -143,8 +647,7 @@ class YOLODatasetPreprocessor:
             missing_labels = expected_labels - label_files
 
             if missing_labels:
-                self.logger.warning(f"Missing labels in {
-                                    split}: {missing_labels}")
+                self.logger.warning(f"Missing labels in {split}: {missing_labels}")
                 validation_report['missing_labels'][split] = missing_labels
                 is_valid = False
 
@@ -164,34 +667,109 @@ class YOLODatasetPreprocessor:
 
         return is_valid, validation_report
 
+    def snapshots(self):
+        """Backup snapshot directories, oldest first"""
+        if not os.path.isdir(self.backup_root):
+            return []
+        return sorted(name for name in os.listdir(self.backup_root)
+                      if SNAPSHOT_NAME.fullmatch(name)
+                      and os.path.isdir(os.path.join(self.backup_root, name)))
+
+    def latest_backup(self):
+        snapshots = self.snapshots()
+        return os.path.join(self.backup_root, snapshots[-1]) if snapshots else None
+
     def backup_dataset(self):
-        """Create a backup of the entire dataset"""
-        backup_dir = os.path.join(
-            self.dataset_path, 'backup')
-        shutil.copytree(self.dataset_path, backup_dir, dirs_exist_ok=True)
-        self.logger.info(f"Dataset backed up to {backup_dir}")
-        return backup_dir
+        """
+        Snapshot the entire dataset into backup/<timestamp>.
+
+        Files with the same size and mtime as in the previous snapshot are
+        hard links to it, so only new and changed files are copied. Cleaning
+        replaces label files instead of writing into them, so a snapshot
+        never shares data with the live dataset. Only the newest
+        keep_backups snapshots are kept.
+
+        Returns:
+            str: Snapshot directory
+        """
+        previous = self.latest_backup()
+        name = time.strftime('%Y%m%d-%H%M%S')
+        snapshot = os.path.join(self.backup_root, name)
+        n = 1
+        while os.path.exists(snapshot):
+            snapshot = os.path.join(self.backup_root, f'{name}-{n}')
+            n += 1
+
+        copied = linked = 0
+        for dirpath, dirnames, filenames in os.walk(self.dataset_path):
+            relative = os.path.relpath(dirpath, self.dataset_path)
+            if relative == '.':
+                dirnames[:] = [d for d in dirnames if d != 'backup']
+                filenames = [f for f in filenames if f != MANIFEST_NAME]
+            target_dir = os.path.normpath(os.path.join(snapshot, relative))
+            os.makedirs(target_dir, exist_ok=True)
+
+            for filename in filenames:
+                source = os.path.join(dirpath, filename)
+                target = os.path.join(target_dir, filename)
+                if previous is not None:
+                    earlier = os.path.join(previous, relative, filename)
+                    try:
+                        st, earlier_st = os.stat(source), os.stat(earlier)
+                        if (st.st_size, st.st_mtime_ns) == (earlier_st.st_size, earlier_st.st_mtime_ns):
+                            os.link(earlier, target)
+                            linked += 1
+                            continue
+                    except OSError:
+                        # Not in the previous snapshot, or no hard links here
+                        pass
+                shutil.copy2(source, target)
+                copied += 1
+
+        snapshots = self.snapshots()
+        for old in snapshots[:max(0, len(snapshots) - self.keep_backups)]:
+            shutil.rmtree(os.path.join(self.backup_root, old))
+
+        self.logger.info(f"Dataset backed up to {snapshot} ({copied} files copied, {linked} unchanged linked)")
+        return snapshot
 
     def preprocess(self):
-        """Run full preprocessing pipeline"""
+        """
+        Run full preprocessing pipeline.
+
+        Label files are validated and cleaned in one pass, reading each file
+        once; the initial and final validation reports are built from that
+        pass instead of reading the dataset twice more. Files unchanged since
+        the last run are not read at all, and when no file changed no backup
+        is taken either.
+        """
         self.logger.info("Starting dataset preprocessing...")
+        start = time.perf_counter()
 
-        # Backup dataset
-        backup_path = self.backup_dataset()
+        pending, unchanged = self.plan(self.label_tasks())
 
-        # Initial validation
-        self.logger.info("Performing initial dataset validation...")
-        initial_valid, initial_report = self.validate_dataset()
-        self.logger.info(f"Initial dataset validation: {
-                         'Valid' if initial_valid else 'Invalid'}")
+        # Backup dataset; files only read to confirm they did not change
+        # (e.g. written by the last run just before it ended) need none
+        if any(not task.racy for task in pending):
+            backup_path = self.backup_dataset()
+        else:
+            backup_path = self.latest_backup()
+            self.logger.info("No label file changed since the last run, skipping backup")
 
-        # Process labels
-        self.logger.info("Processing labels...")
-        self.process_labels()
+        self.logger.info(f"Validating and processing {len(pending)} label files with {self.workers} workers...")
+        missing_directories, missing_labels = self.missing_files()
+        results = self.process_labels(pending, unchanged)
 
-        # Final validation
-        self.logger.info("Performing final dataset validation...")
-        final_valid, final_report = self.validate_dataset()
+        initial_report = {
+            'missing_directories': missing_directories,
+            'missing_labels': missing_labels,
+            'duplicate_labels': [result.label_file for result in results if result.had_duplicates]
+        }
+        # Rewritten files have no duplicates left; missing files stay missing
+        final_report = dict(initial_report, duplicate_labels=[
+            result.label_file for result in results if result.had_duplicates and not result.written])
+        initial_valid = not any(initial_report.values())
+        final_valid = not any(final_report.values())
 
         # Generate comprehensive report
         self.generate_preprocessing_report(
@@ -201,9 +779,37 @@ class YOLODatasetPreprocessor:
             final_valid,
             final_report
         )
+        self.summary = self.summarize(results, final_report, backup_path, time.perf_counter() - start)
+        self.logger.info(f"Summary: {json.dumps(self.summary)}")
 
         return final_valid
 
+    def summarize(self, results, final_report, backup_path, elapsed):
+        """Totals of a preprocessing run, JSON serializable"""
+        per_split = {}
+        for result in results:
+            split = per_split.setdefault(result.split, {'files': 0, 'labels': 0, 'rewritten': 0})
+            split['files'] += 1
+            split['labels'] += result.lines
+            split['rewritten'] += result.written
+
+        return {
+            'dataset': str(self.dataset_path),
+            'workers': self.workers,
+            'engine': self.engine,
+            'backup': backup_path,
+            'files': len(results),
+            'unchanged_files': sum(result.skipped for result in results),
+            'rewritten_files': sum(result.written for result in results),
+            'invalid_labels': sum(result.invalid for result in results),
+            'converted_labels': sum(result.converted for result in results),
+            'duplicate_labels': sum(result.duplicates for result in results),
+            'splits': per_split,
+            'missing_directories': final_report['missing_directories'],
+            'missing_labels': {split: sorted(files) for split, files in final_report['missing_labels'].items()},
+            'seconds': round(elapsed, 3),
+            'files_per_second': round(len(results) / elapsed, 1) if elapsed else None
+        }
 
     def generate_preprocessing_report(self, backup_path, initial_valid, initial_report, final_valid, final_report):
         """Generate a comprehensive preprocessing report"""
@@ -215,32 +821,44 @@ class YOLODatasetPreprocessor:
         self.logger.info(f"Backup Path: {backup_path}")
 
         self.logger.info("Initial Validation:")
-        self.logger.info(f"Overall Status: {
-                        'Valid' if initial_valid else 'Invalid'}")
-        self.logger.info(f"Missing Directories: {
-                        initial_report['missing_directories']}")
+        self.logger.info(f"Overall Status: {'Valid' if initial_valid else 'Invalid'}")
+        self.logger.info(f"Missing Directories: {initial_report['missing_directories']}")
         self.logger.info(f"Missing Labels: {initial_report['missing_labels']}")
         self.logger.info(f"Duplicate Labels: {initial_report['duplicate_labels']}")
 
         self.logger.info("Final Validation:")
-        self.logger.info(f"Overall Status: {
-                        'Valid' if final_valid else 'Invalid'}")
-        self.logger.info(f"Missing Directories: {
-                        final_report['missing_directories']}")
+        self.logger.info(f"Overall Status: {'Valid' if final_valid else 'Invalid'}")
+        self.logger.info(f"Missing Directories: {final_report['missing_directories']}")
         self.logger.info(f"Missing Labels: {final_report['missing_labels']}")
         self.logger.info(f"Duplicate Labels: {final_report['duplicate_labels']}")
 
 
 def main():
-    dataset_path = str(TEST_DATA_DIR)
+    parser = argparse.ArgumentParser(description="Clean and validate YOLO dataset labels")
+    parser.add_argument('--dataset', default=str(TEST_DATA_DIR), help="Dataset root with train/valid/test splits")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Processes cleaning label files (default: number of cores)")
+    parser.add_argument('--engine', choices=ENGINES, default='numpy',
+                        help="Label engine; 'python' parses line by line")
+    parser.add_argument('--full', action='store_true',
+                        help="Clean every label file, ignoring the manifest of the last run")
+    parser.add_argument('--keep-backups', type=int, default=5, help="Backup snapshots kept")
+    parser.add_argument('--report', help="Write the JSON summary to this file")
+    args = parser.parse_args()
+
     try:
-        preprocessor = YOLODatasetPreprocessor(dataset_path)
+        preprocessor = YOLODatasetPreprocessor(args.dataset, workers=args.workers, engine=args.engine,
+                                               incremental=not args.full, keep_backups=args.keep_backups)
         is_valid = preprocessor.preprocess()
 
+        if args.report:
+            with open(args.report, 'w') as f:
+                json.dump(preprocessor.summary, f, indent=2)
+
         if is_valid:
             print("Dataset preprocessing completed successfully!")
         else:
-            print(f"Dataset preprocessing completed with some issues. Check the logs for details at 'datasetpreprocessing_*.log'.")
+            print(f"Dataset preprocessing completed with some issues. Check the logs for details at 'logs/dataset_preprocessing.log'.")
 
     except Exception as e:
         logging.error(f"Preprocessing Failed: {e}")
@@ -0,0 +1,127 @@
+"""
+Local stand-in for alert webhooks.
+
+Accepts JSON POSTs on any path, optionally after a delay or with a given
+failure rate, and records when each alert arrived. Used by the notification
+tests and bench/bench_alerts.py; it can also run standalone:
+
+    python tests/mock_receiver.py --port 8099 --delay-ms 50
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+
+class MockReceiver:
+    def __init__(self, host: str = '127.0.0.1', port: int = 0,
+                 delay_ms: float = 0.0, failure_rate: float = 0.0):
+        """
+        Threaded HTTP server recording received alerts.
+
+        Args:
+            host (str): Interface to bind
+            port (int): Port, 0 picks a free one
+            delay_ms (float): Artificial processing delay per request
+            failure_rate (float): Fraction of requests answered with HTTP 503
+        """
+        self.delay_ms = delay_ms
+        self.failure_rate = failure_rate
+        self.records: List[Dict[str, Any]] = []
+        self.failures = 0
+        self._lock = threading.Lock()
+
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # Keep-alive
+            # Headers and body are separate writes; avoid Nagle/delayed-ACK stalls
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                body = self.rfile.read(length)
+                if receiver.delay_ms:
+                    time.sleep(receiver.delay_ms / 1000)
+
+                if random.random() < receiver.failure_rate:
+                    with receiver._lock:
+                        receiver.failures += 1
+                    self._reply(503, b'{"status": "unavailable"}')
+                    return
+
+                try:
+                    payload = json.loads(body) if body else None
+                except ValueError:
+                    payload = None
+                with receiver._lock:
+                    receiver.records.append({
+                        'path': self.path,
+                        'received_at': time.time(),
+                        'payload': payload,
+                    })
+                self._reply(200, b'{"status": "ok"}')
+
+            def _reply(self, status: int, body: bytes):
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> 'MockReceiver':
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True,
+                                        name='mock-receiver')
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def received(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self.records)
+
+    def __enter__(self) -> 'MockReceiver':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock alert webhook receiver")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--delay-ms', type=float, default=0.0)
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    receiver = MockReceiver(args.host, args.port, args.delay_ms, args.failure_rate).start()
+    print(f"Mock receiver listening on {receiver.url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(5)
+            print(f"received {len(receiver.received())}, failed {receiver.failures}")
+    except KeyboardInterrupt:
+        receiver.stop()
+
+
+if __name__ == '__main__':
+    main()
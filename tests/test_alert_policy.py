@@ -0,0 +1,76 @@
+import numpy as np
+from typing import NamedTuple, Optional
+from src.alert_policy import AlertPolicy
+
+NAMES = {0: 'Fire', 1: 'Smoke'}
+
+
+class Result(NamedTuple):
+    boxes: np.ndarray
+    class_ids: np.ndarray
+    confidences: np.ndarray
+    detection: Optional[str]
+
+
+def seen(detection, x=100):
+    class_id = 0 if detection == "Fire" else 1
+    return Result(np.array([[x, 100, x + 50, 150]], dtype=np.float32),
+                  np.array([class_id]), np.array([0.9], dtype=np.float32), detection)
+
+
+def test_camera_token_bucket():
+    """Test a camera allows its burst, then one alert per cooldown"""
+    policy = AlertPolicy(camera_cooldown=10, camera_burst=2, class_cooldown=0,
+                         dedup_window=0, names=NAMES)
+    assert policy.evaluate("cam", seen("Fire"), now=0)
+    assert policy.evaluate("cam", seen("Fire", x=300), now=1)
+    assert policy.evaluate("cam", seen("Fire", x=500), now=2) is None
+    assert policy.evaluate("cam", seen("Fire", x=700), now=12)
+    assert policy.stats()['suppressed_rate'] == 1
+
+
+def test_class_token_bucket():
+    """Test each class is limited on its own within the camera limit"""
+    policy = AlertPolicy(camera_cooldown=0, class_cooldown=60, dedup_window=0,
+                         escalation=False, names=NAMES)
+    assert policy.evaluate("cam", seen("Fire"), now=0)
+    assert policy.evaluate("cam", seen("Smoke"), now=1)
+    assert policy.evaluate("cam", seen("Fire", x=400), now=30) is None
+    assert policy.evaluate("cam", seen("Fire", x=400), now=61)
+
+
+def test_escalation_bypasses_limits():
+    """Test fire after a smoke alert is reported despite the cooldown"""
+    policy = AlertPolicy(camera_cooldown=45, names=NAMES)
+    assert policy.evaluate("cam", seen("Smoke"), now=0).reason == "new"
+    decision = policy.evaluate("cam", seen("Fire"), now=5)
+    assert decision == ("Fire", "escalation")
+    # Escalated fire is now the last alert, so repeats are limited again
+    assert policy.evaluate("cam", seen("Fire", x=400), now=10) is None
+    assert policy.stats()['escalations'] == 1
+
+
+def test_duplicates_suppressed_by_overlap():
+    """Test the same region is suppressed within the window, a new one is not"""
+    policy = AlertPolicy(camera_cooldown=0, class_cooldown=0, dedup_iou=0.5,
+                         dedup_window=300, names=NAMES)
+    assert policy.evaluate("cam", seen("Fire", x=100), now=0)
+    assert policy.evaluate("cam", seen("Fire", x=105), now=50) is None
+    assert policy.evaluate("cam", seen("Fire", x=400), now=60)
+    assert policy.evaluate("cam", seen("Fire", x=400), now=361)
+    assert policy.stats()['suppressed_duplicate'] == 1
+
+
+def test_streams_are_independent():
+    """Test many streams share one policy without sharing limits"""
+    policy = AlertPolicy(names=NAMES)
+    for index in range(1000):
+        assert policy.evaluate(f"cam{index}", seen("Fire"), now=0)
+    assert policy.evaluate("cam0", seen("Fire", x=400), now=1) is None
+    assert policy.evaluate("cam0", Result(np.empty((0, 4)), np.empty(0), np.empty(0), None),
+                           now=2) is None
+
+    policy.forget("cam0")
+    stats = policy.stats()
+    assert stats['streams'] == 999
+    assert stats['alerts'] == 1000
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+from src.backends import LetterboxBuffer, letterbox, load_backend, nms, postprocess
+
+
+def test_nms_suppresses_overlaps():
+    """Test overlapping lower-score boxes are removed"""
+    boxes = np.array([[0, 0, 10, 10], [1, 1, 11, 11], [50, 50, 60, 60]], dtype=np.float32)
+    scores = np.array([0.9, 0.8, 0.7], dtype=np.float32)
+    assert nms(boxes, scores, 0.5).tolist() == [0, 2]
+
+
+def test_letterbox_shape_and_padding():
+    """Test frames are scaled to fit and padded to a square"""
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    padded, ratio, (left, top) = letterbox(frame, 640)
+    assert padded.shape == (640, 640, 3)
+    assert ratio == 1.0
+    assert (left, top) == (0, 80)
+    assert padded[0, 0].tolist() == [114, 114, 114]
+
+
+def test_letterbox_buffer_matches_letterbox():
+    """Test the reusable buffer produces the same tensor as letterbox()"""
+    rng = np.random.default_rng(0)
+    buffer = LetterboxBuffer(320)
+    for shape in ((240, 320, 3), (720, 1280, 3), (500, 300, 3), (240, 320, 3)):
+        frame = rng.integers(0, 256, shape, dtype=np.uint8)
+        tensor, [(ratio, pad)] = buffer.fill([frame])
+
+        padded, expected_ratio, expected_pad = letterbox(frame, 320)
+        expected = padded[:, :, ::-1].transpose(2, 0, 1).astype(np.float32) / 255.0
+        np.testing.assert_array_equal(tensor[0], expected)
+        assert (ratio, pad) == (expected_ratio, expected_pad)
+
+
+def test_letterbox_buffer_reuses_memory():
+    """Test a steady stream of frames does not allocate new tensors"""
+    buffer = LetterboxBuffer(64, capacity=2)
+    frames = [np.zeros((48, 64, 3), dtype=np.uint8)] * 2
+    first, _ = buffer.fill(frames)
+    second, _ = buffer.fill(frames[:1])
+    assert np.shares_memory(first, second)
+
+    grown, transforms = buffer.fill(frames * 2)
+    assert grown.shape == (4, 3, 64, 64)
+    assert len(transforms) == 4
+
+
+def test_postprocess_maps_boxes_to_frame():
+    """Test raw YOLO output is decoded back to original frame pixels"""
+    # One anchor centred at (320, 320) in the letterboxed image, class 1
+    output = np.zeros((6, 3), dtype=np.float32)
+    output[:, 0] = [320, 320, 100, 50, 0.1, 0.9]
+    output[:, 1] = [320, 320, 100, 50, 0.05, 0.2]  # Below threshold
+
+    boxes, class_ids, confidences = postprocess(
+        output, ratio=0.5, pad=(0, 80), shape=(960, 1280), conf=0.5, iou=0.5)
+
+    np.testing.assert_allclose(boxes, [[540, 430, 740, 530]])
+    assert class_ids.tolist() == [1]
+    np.testing.assert_allclose(confidences, [0.9])
+
+
+def test_onnx_backend_end_to_end(tmp_path):
+    """Test the ONNX backend on a tiny graph that emits a fixed prediction"""
+    onnx = pytest.importorskip("onnx")
+    pytest.importorskip("onnxruntime")
+    from onnx import TensorProto, helper
+
+    raw = np.zeros((1, 6, 4), dtype=np.float32)
+    raw[0, :, 0] = [320, 320, 64, 64, 0.95, 0.01]
+    graph = helper.make_graph(
+        [
+            helper.make_node('ReduceMean', ['images'], ['mean'], axes=[1, 2, 3], keepdims=1),
+            helper.make_node('Reshape', ['mean', 'shape'], ['flat']),
+            helper.make_node('Mul', ['flat', 'zero'], ['scaled']),
+            helper.make_node('Add', ['scaled', 'raw'], ['output0']),
+        ],
+        'fake_yolo',
+        [helper.make_tensor_value_info('images', TensorProto.FLOAT, ['batch', 3, 640, 640])],
+        [helper.make_tensor_value_info('output0', TensorProto.FLOAT, ['batch', 6, 4])],
+        [helper.make_tensor('shape', TensorProto.INT64, [3], [-1, 1, 1]),
+         helper.make_tensor('zero', TensorProto.FLOAT, [], [0.0]),
+         helper.make_tensor('raw', TensorProto.FLOAT, raw.shape, raw.flatten())],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid('', 13)])
+    model.ir_version = 8
+    helper.set_model_props(model, {'names': "{0: 'fire', 1: 'smoke'}"})
+    path = tmp_path / 'fake.onnx'
+    onnx.save(model, str(path))
+
+    backend = load_backend(path)
+    assert backend.names == {0: 'fire', 1: 'smoke'}
+
+    frames = [np.zeros((480, 640, 3), dtype=np.uint8), np.zeros((640, 640, 3), dtype=np.uint8)]
+    (boxes_a, ids_a, _), (boxes_b, ids_b, _) = backend(frames, iou=0.5, conf=0.5)
+    np.testing.assert_allclose(boxes_a, [[288, 208, 352, 272]])
+    np.testing.assert_allclose(boxes_b, [[288, 288, 352, 352]])
+    assert ids_a.tolist() == ids_b.tolist() == [0]
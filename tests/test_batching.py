@@ -0,0 +1,80 @@
+import threading
+import time
+import pytest
+from src.batching import MicroBatcher
+
+
+@pytest.fixture
+def batch_calls():
+    return []
+
+
+@pytest.fixture
+def batcher(batch_calls):
+    def double(items):
+        batch_calls.append(list(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(double, max_batch_size=4, max_wait_ms=50)
+    yield batcher
+    batcher.stop(timeout=1)
+
+
+def test_single_item_result(batcher):
+    """Test a lone item is returned after the max wait"""
+    assert batcher(21, timeout=1) == 42
+
+
+def test_concurrent_items_share_batches(batcher, batch_calls):
+    """Test concurrent callers are grouped into batches no larger than the limit"""
+    results = {}
+
+    def call(value):
+        results[value] = batcher(value, timeout=2)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {i: i * 2 for i in range(8)}
+    assert all(len(batch) <= 4 for batch in batch_calls)
+    assert len(batch_calls) < 8
+
+
+def test_stats(batcher):
+    """Test batch statistics reflect processed items"""
+    futures = [batcher.submit(i) for i in range(3)]
+    assert [future.result(timeout=1) for future in futures] == [0, 2, 4]
+
+    stats = batcher.stats()
+    assert stats['items'] == 3
+    assert stats['queue_depth'] == 0
+    assert sum(size * count for size, count in stats['batch_size_histogram'].items()) == 3
+
+
+def test_batch_errors_reach_callers():
+    """Test an exception in the batch function is raised for every caller"""
+    def fail(items):
+        raise RuntimeError("model crashed")
+
+    batcher = MicroBatcher(fail, max_batch_size=2, max_wait_ms=1)
+    try:
+        with pytest.raises(RuntimeError):
+            batcher(1, timeout=1)
+    finally:
+        batcher.stop(timeout=1)
+
+
+def test_max_wait_flushes_partial_batch(batch_calls):
+    """Test a partial batch is flushed once the wait expires"""
+    batcher = MicroBatcher(lambda items: batch_calls.append(items) or items,
+                           max_batch_size=100, max_wait_ms=20)
+    try:
+        start = time.monotonic()
+        assert batcher('frame', timeout=1) == 'frame'
+        assert time.monotonic() - start < 1
+        assert batch_calls == [['frame']]
+    finally:
+        batcher.stop(timeout=1)
@@ -0,0 +1,199 @@
+import builtins
+import os
+import random
+import shutil
+
+import numpy as np
+import pytest
+from tests import clean_labels
+from tests.clean_labels import (YOLODatasetPreprocessor, clean_label_file, clean_lines_numpy,
+                                clean_lines_python, round5)
+
+LABELS = {
+    'valid.txt': "0 0.5 0.5 0.3 0.4\n1 0.2 0.3 0.1 0.2\n",
+    'invalid_coords.txt': "0 1.2 0.5 0.3 0.4\n1 -0.1 1.3 0.1\n0 0.5 0.5 0.3 0.4\n",
+    'polygon.txt': "0 0.1 0.2 0.3 0.4 0.5 0.6 0.7 0.8\n1 0.2 0.3 0.4 0.5 0.6 0.7 0.8 0.9\n",
+    'duplicates.txt': "0 0.5 0.5 0.3 0.4\n0 0.5 0.5 0.3 0.4\n1 0.2 0.3 0.1 0.2\n1 0.2 0.3 0.1 0.2\n",
+    'mixed.txt': "0 0.5 0.5 0.3 0.4\n1 1.5 0.2 0.1 0.2\n0 0.1 0.2 0.3 0.4 0.5 0.6 0.7 0.8\n",
+}
+
+
+@pytest.fixture
+def dataset(tmp_path, monkeypatch):
+    """Small dataset with one label file per cleaning case, run from tmp_path"""
+    monkeypatch.chdir(tmp_path)
+    root = tmp_path / 'dataset'
+    for split, copies in (('train', 20), ('valid', 5)):
+        (root / split / 'images').mkdir(parents=True)
+        (root / split / 'labels').mkdir(parents=True)
+        for i in range(copies):
+            for name, text in LABELS.items():
+                stem = f'{i}_{name[:-4]}'
+                (root / split / 'labels' / f'{stem}.txt').write_text(text)
+                (root / split / 'images' / f'{stem}.jpg').write_bytes(b'jpeg')
+    (root / 'valid' / 'images' / 'unlabelled.jpg').write_bytes(b'jpeg')
+    return root
+
+
+def read_labels(root):
+    return {path.relative_to(root): path.read_bytes()
+            for path in sorted(root.glob('*/labels/*.txt'))}
+
+
+def test_clean_label_file(tmp_path):
+    """Test invalid labels are dropped, polygons converted and duplicates removed in order"""
+    path = tmp_path / 'mixed.txt'
+    path.write_text("0 0.5 0.5 0.3 0.4\n1 0.2 0.3\n"
+                    "0 0.1 0.2 0.3 0.4 0.5 0.6 0.7 0.8\n0 0.5 0.5 0.3 0.4\n")
+    result = clean_label_file(('train', str(path)))
+    assert (result.invalid, result.converted, result.duplicates) == (1, 1, 1)
+    assert result.had_duplicates and result.written
+    assert path.read_text() == "0 0.5 0.5 0.3 0.4\n0 0.4 0.5 0.6 0.6\n"
+
+
+def test_unchanged_file_is_not_written(tmp_path):
+    path = tmp_path / 'valid.txt'
+    path.write_text(LABELS['valid.txt'])
+    assert not clean_label_file(('train', str(path))).written
+
+
+def test_parallel_matches_serial(dataset, tmp_path):
+    """Test a process pool and both engines write the same files as a serial run"""
+    serial_root = tmp_path / 'serial'
+    shutil.copytree(dataset, serial_root)
+    python_root = tmp_path / 'python'
+    shutil.copytree(dataset, python_root)
+
+    YOLODatasetPreprocessor(str(serial_root), workers=1, batch_size=7).process_labels()
+    YOLODatasetPreprocessor(str(python_root), workers=1, engine='python').process_labels()
+    YOLODatasetPreprocessor(str(dataset), workers=4).process_labels()
+    assert read_labels(dataset) == read_labels(serial_root) == read_labels(python_root)
+
+
+def random_label_line(rng):
+    """Label lines of every kind: boxes, polygons, out of range, malformed"""
+    def field():
+        kind = rng.random()
+        if kind < 0.6:
+            return repr(rng.uniform(-0.2, 1.2))
+        if kind < 0.85:
+            return f'{rng.random():.{rng.randint(1, 7)}f}'
+        return rng.choice(['nan', 'inf', 'x', '1e400', '-0', '1_0', '0.000005', '0.999995', '2.5e-06'])
+
+    size = rng.choice([0, 3, 4, 5, 5, 5, 6, 7, 9, 9, 13])
+    fields = [rng.choice(['0', '1', '1', '2', 'a', '0.0'])] + [field() for _ in range(size - 1)]
+    return rng.choice([' ', ' ', '\t', '  ']).join(fields[:size]) + rng.choice(['\n', '\n', ' \n', ''])
+
+
+def test_numpy_engine_matches_python():
+    """Test the array engine gives the per-line engine's lines, counts and messages"""
+    rng = random.Random(0)
+    for _ in range(300):
+        lines = [random_label_line(rng) for _ in range(rng.randint(0, 30))]
+        label_files = [f'{i % 3}.txt' for i in range(len(lines))]
+        output, status, messages = clean_lines_numpy(lines, label_files)
+        expected_output, expected_status, expected_messages = clean_lines_python(lines, label_files)
+        assert output.tolist() == expected_output.tolist()
+        assert status.tolist() == expected_status.tolist()
+        assert messages == expected_messages
+
+
+def test_round5_matches_round():
+    """Test vectorized rounding agrees with round() around ties"""
+    rng = np.random.default_rng(0)
+    values = np.concatenate([rng.random(10000),
+                             rng.integers(0, 10 ** 6, 10000) / 10 ** 6,
+                             [0.000005, 0.123455, 0.999995, -0.000015, 2.5e-06, 1e12 + 0.5]])
+    assert round5(values).tolist() == [round(value, 5) for value in values.tolist()]
+
+
+def test_unknown_engine(dataset):
+    with pytest.raises(ValueError):
+        YOLODatasetPreprocessor(str(dataset), engine='cython')
+
+
+def test_each_file_read_once(dataset, monkeypatch):
+    """Test preprocessing validates and cleans without re-reading label files"""
+    reads = []
+    real_open = builtins.open
+
+    def counting_open(file, mode='r', *args, **kwargs):
+        if str(file).endswith('.txt') and 'r' in mode:
+            reads.append(str(file))
+        return real_open(file, mode, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, 'open', counting_open)
+    # Backups copy every file by design
+    monkeypatch.setattr(YOLODatasetPreprocessor, 'backup_dataset', lambda self: None)
+    YOLODatasetPreprocessor(str(dataset), workers=1).preprocess()
+    assert len(reads) == len(set(reads)) == 25 * len(LABELS)
+
+    # Nothing is read again while the files are unchanged
+    monkeypatch.setattr(clean_labels, 'RACY_NS', 0)
+    reads.clear()
+    YOLODatasetPreprocessor(str(dataset), workers=1).preprocess()
+    assert reads == []
+
+
+def test_preprocess_summary(dataset):
+    """Test the one-pass run reports what was found and fixed"""
+    preprocessor = YOLODatasetPreprocessor(str(dataset), workers=2)
+    assert not preprocessor.preprocess()
+
+    summary = preprocessor.summary
+    assert summary['files'] == 25 * len(LABELS)
+    assert summary['rewritten_files'] == 25 * 4
+    assert summary['converted_labels'] == 25 * 3
+    assert summary['duplicate_labels'] == 25 * 2
+    assert summary['splits']['valid']['files'] == 5 * len(LABELS)
+    assert summary['missing_labels'] == {'valid': ['unlabelled.txt']}
+    assert os.path.exists(os.path.join(summary['backup'], 'train', 'labels', '0_valid.txt'))
+
+    # Nothing left to fix on a second run
+    preprocessor.preprocess()
+    assert preprocessor.summary['rewritten_files'] == 0
+
+
+def test_rerun_cleans_only_changed_files(dataset, monkeypatch):
+    """Test a rerun cleans new and modified files and rehashes touched ones"""
+    monkeypatch.setattr(clean_labels, 'RACY_NS', 0)
+    preprocessor = YOLODatasetPreprocessor(str(dataset), workers=1)
+    preprocessor.preprocess()
+    first_backup = preprocessor.summary['backup']
+    cleaned = read_labels(dataset)
+
+    labels = dataset / 'train' / 'labels'
+    (labels / '0_valid.txt').write_text(LABELS['mixed.txt'])
+    (labels / 'new.txt').write_text(LABELS['duplicates.txt'])
+    touched = labels / '1_valid.txt'
+    os.utime(touched, ns=(touched.stat().st_atime_ns, touched.stat().st_mtime_ns - 10 ** 9))
+
+    preprocessor.preprocess()
+    summary = preprocessor.summary
+    assert summary['files'] == 25 * len(LABELS) + 1
+    # The touched file is read to compare its hash, but not cleaned
+    assert summary['unchanged_files'] == 25 * len(LABELS) - 1
+    assert summary['rewritten_files'] == 2
+    assert (summary['converted_labels'], summary['duplicate_labels']) == (1, 2)
+    assert (labels / '0_valid.txt').read_bytes() == cleaned[labels.relative_to(dataset) / '0_mixed.txt']
+
+    # The new snapshot links what did not change and keeps the old content
+    second_backup = summary['backup']
+    assert second_backup != first_backup
+    old, new = (os.path.join(backup, 'train', 'labels') for backup in (first_backup, second_backup))
+    assert os.stat(os.path.join(old, '2_valid.txt')).st_ino == os.stat(os.path.join(new, '2_valid.txt')).st_ino
+    assert os.stat(os.path.join(old, '0_valid.txt')).st_ino != os.stat(os.path.join(new, '0_valid.txt')).st_ino
+    with open(os.path.join(new, '0_valid.txt')) as f:
+        assert f.read() == LABELS['mixed.txt']
+
+    # Nothing changed: no backup, nothing read
+    preprocessor.preprocess()
+    assert preprocessor.summary['unchanged_files'] == summary['files']
+    assert preprocessor.summary['backup'] == second_backup
+
+
+def test_full_run_ignores_manifest(dataset, monkeypatch):
+    monkeypatch.setattr(clean_labels, 'RACY_NS', 0)
+    YOLODatasetPreprocessor(str(dataset), workers=1).process_labels()
+    results = YOLODatasetPreprocessor(str(dataset), workers=1, incremental=False).process_labels()
+    assert not any(result.skipped for result in results)
@@ -32,3 +32,36 @@ def test_process_frame(fire_detector, sample_frame):
     processed_frame, detection = fire_detector.process_frame(sample_frame)
     assert isinstance(processed_frame, np.ndarray)
     assert isinstance(detection, (str, type(None)))
+
+
+def test_detect_returns_structured_results(fire_detector, sample_frame):
+    """Test detection without annotation"""
+    detections = fire_detector.detect(sample_frame)
+    assert detections.boxes.shape == (len(detections.class_ids), 4)
+    assert len(detections.confidences) == len(detections.class_ids)
+    assert detections.detection in ("Fire", "Smoke", None)
+
+
+def test_annotate(fire_detector, sample_frame):
+    """Test lazy annotation of detection results"""
+    original = sample_frame.copy()
+    detections = fire_detector.detect(sample_frame)
+    annotated = fire_detector.annotate(sample_frame, detections)
+    assert annotated.shape[0] == 640
+    assert np.array_equal(sample_frame, original)
+
+
+def test_draw_detections_matches_full_frame_blend(fire_detector):
+    """Test ROI blending gives the same pixels as blending the whole frame"""
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 256, (480, 640, 3), dtype=np.uint8)
+    box = np.array([100, 120, 300, 360])
+    color = fire_detector.colors["fire"]
+
+    expected = frame.copy()
+    overlay = expected.copy()
+    cv2.rectangle(overlay, (100, 120), (300, 360), color, -1)
+    cv2.addWeighted(overlay, 0.2, expected, 0.8, 0, expected)
+
+    fire_detector._blend_box(frame, tuple(box), color)
+    assert np.array_equal(frame, expected)
@@ -0,0 +1,98 @@
+import time
+
+import cv2
+import numpy as np
+import pytest
+from src.health import HealthMonitor
+from src.metrics import STAGE_SECONDS
+
+
+class FakeBatcher:
+    queue_depth = 0
+
+
+@pytest.fixture
+def model_file(tmp_path):
+    path = tmp_path / 'model.pt'
+    path.write_bytes(b'weights')
+    return path
+
+
+@pytest.fixture
+def video_file(tmp_path):
+    """Write a short MJPG video standing in for a camera"""
+    path = tmp_path / 'cam.avi'
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'MJPG'), 10, (64, 48))
+    for _ in range(3):
+        writer.write(np.zeros((48, 64, 3), dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def test_healthy_snapshot(model_file, video_file):
+    """Test a working model, detector and camera report healthy"""
+    monitor = HealthMonitor(model_file, detector=object(), batcher=FakeBatcher(),
+                            camera_source=str(video_file))
+    monitor.refresh()
+    status = monitor.snapshot()
+    assert status['status'] == 'healthy'
+    assert status['camera'] == 'ok'
+    assert status['camera_accessible'] and status['model_available']
+
+
+def test_problems_degrade_health(tmp_path):
+    """Test a missing model, detector, camera and a full queue are reported"""
+    batcher = FakeBatcher()
+    batcher.queue_depth = 100
+    monitor = HealthMonitor(tmp_path / 'missing.pt', batcher=batcher,
+                            camera_source=str(tmp_path / 'missing.avi'))
+    status = monitor.refresh()
+    assert status['status'] == 'degraded'
+    assert status['camera'] == 'unavailable'
+    assert set(status['problems']) == {'model file missing', 'detector not loaded',
+                                       'camera not accessible', 'inference queue backed up'}
+
+
+def test_busy_camera_is_not_probed(model_file, tmp_path):
+    """Test the camera is reported in use instead of being opened"""
+    probes = []
+    monitor = HealthMonitor(model_file, detector=object(), camera_busy=lambda: True,
+                            camera_source=str(tmp_path / 'missing.avi'))
+    monitor.probe_camera = lambda: probes.append(1) or 'unavailable'
+    status = monitor.refresh()
+    assert status['camera'] == 'in_use' and status['camera_accessible']
+    assert probes == []
+
+
+def test_camera_probed_on_its_own_interval(model_file, video_file):
+    """Test repeated checks reuse the last camera probe"""
+    probes = []
+    monitor = HealthMonitor(model_file, detector=object(), camera_source=str(video_file),
+                            camera_interval=60)
+    monitor.probe_camera = lambda: probes.append(1) or 'ok'
+    for _ in range(5):
+        monitor.refresh()
+    assert probes == [1]
+
+
+def test_inference_latency_since_last_check(model_file):
+    """Test latency is the mean of inferences since the previous check"""
+    monitor = HealthMonitor(model_file, detector=object(), max_inference_ms=100)
+    STAGE_SECONDS.observe(0.2, stage='inference')
+    STAGE_SECONDS.observe(0.4, stage='inference')
+    status = monitor.refresh(probe_camera=False)
+    assert status['inference_ms'] == pytest.approx(300)
+    assert 'inference slow' in status['problems']
+
+
+def test_snapshot_is_cached_and_goes_stale(model_file):
+    """Test snapshots are served from cache and a stopped monitor is unhealthy"""
+    monitor = HealthMonitor(model_file, detector=object(), interval=0.05).start()
+    try:
+        checks = monitor.checks
+        monitor.snapshot()
+        assert monitor.checks == checks
+    finally:
+        monitor.stop()
+    time.sleep(0.2)
+    assert monitor.snapshot()['status'] == 'unhealthy'
@@ -0,0 +1,84 @@
+import json
+import threading
+
+from src.job_output import JobOutput, parse_result
+
+
+def parse_events(body):
+    """Split a Server-Sent Events body into (id, event, data) tuples"""
+    events = []
+    for block in body.decode().split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.splitlines() if not line.startswith(':'))
+        if 'event' in fields:
+            events.append((int(fields.get('id', 0)), fields['event'], json.loads(fields['data'])))
+    return events
+
+
+def test_parse_video_result():
+    """Test a video frame line is parsed into counts per class"""
+    result = parse_result('video 1/1 (frame 12/300) /data/cam 1.mp4: 384x640 1 Fire, 2 Smokes, 45.2ms')
+    assert result == {
+        'source': '/data/cam 1.mp4', 'frame': 12, 'frames': 300, 'shape': [384, 640],
+        'detections': {'Fire': 1, 'Smoke': 2}, 'inference_ms': 45.2
+    }
+
+
+def test_parse_stream_and_image_results():
+    """Test camera and image lines, with and without detections"""
+    assert parse_result('0: 480x640 1 Smoke, 30.1ms')['source'] == 0
+    result = parse_result('image 1/3 /data/house.png: 480x640 (no detections), 12.0ms')
+    assert result['source'] == '/data/house.png' and result['detections'] == {}
+    assert parse_result('Speed: 1.2ms preprocess, 30.1ms inference per image') is None
+    assert parse_result('Results saved to runs/detect/predict') is None
+
+
+def test_results_and_totals():
+    """Test lines become log events and result lines also result events"""
+    output = JobOutput()
+    output.append_line('\x1b[34mUltralytics 8.3.0\x1b[0m\n')
+    output.append_line('0: 480x640 1 Fire, 30.1ms\n')
+    output.append_line('0: 480x640 2 Fires, 31.0ms\n')
+    output.close({'status': 'completed'})
+    events = parse_events(b''.join(output.events()))
+    assert [event for _, event, _ in events] == ['log', 'log', 'result', 'log', 'result', 'end']
+    assert events[0][2]['line'] == 'Ultralytics 8.3.0'
+    assert [data['frame'] for _, event, data in events if event == 'result'] == [1, 2]
+    assert events[-1][2] == {'status': 'completed'}
+    stats = output.stats()
+    assert stats['results'] == 2 and stats['detections'] == {'Fire': 3}
+
+
+def test_buffer_is_bounded():
+    """Test only the newest events are kept and late joiners learn of the gap"""
+    output = JobOutput(maxlen=10)
+    for i in range(100):
+        output.append_line(f'line {i}')
+    output.close()
+    assert output.stats()['buffered_events'] == 10
+    events = parse_events(b''.join(output.events()))
+    assert events[0] == (0, 'gap', {'missed': 91})
+    assert events[1][2]['line'] == 'line 91'
+
+
+def test_resume_after_last_event_id():
+    """Test a reconnecting client only gets events it has not seen"""
+    output = JobOutput()
+    for i in range(5):
+        output.append_line(f'line {i}')
+    output.close()
+    events = parse_events(b''.join(output.events(after=3)))
+    assert [event_id for event_id, _, _ in events] == [4, 5, 6]
+
+
+def test_follow_live_output():
+    """Test a client receives events as they are produced"""
+    output = JobOutput(keepalive=0.05)
+    received = []
+    follower = threading.Thread(target=lambda: received.extend(output.events()))
+    follower.start()
+    output.append_line('0: 480x640 1 Fire, 30.1ms')
+    output.close()
+    follower.join(5)
+    assert not follower.is_alive()
+    events = parse_events(b''.join(received))
+    assert [event for _, event, _ in events] == ['log', 'result', 'end']
@@ -0,0 +1,106 @@
+import multiprocessing
+import os
+import subprocess
+import sys
+
+import pytest
+from src.job_registry import JobRegistry, pid_alive
+
+
+@pytest.fixture
+def dead_pid():
+    """Pid of a process that has exited, e.g. a crashed worker"""
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+@pytest.fixture
+def sleeper():
+    process = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])
+    yield process
+    process.kill()
+    process.wait()
+
+
+def test_register_and_list(tmp_path, sleeper):
+    """Test a job is visible through a second registry on the same directory"""
+    JobRegistry(tmp_path).register('yolo', sleeper.pid, command=['yolo', 'predict'])
+    other_worker = JobRegistry(tmp_path)
+    record = other_worker.get('yolo')
+    assert record['pid'] == sleeper.pid
+    assert record['owner'] == os.getpid()
+    assert record['command'] == ['yolo', 'predict']
+    assert [job['name'] for job in other_worker.jobs()] == ['yolo']
+
+
+@pytest.mark.skipif(os.name == 'nt', reason="Liveness checks need POSIX signals")
+def test_dead_jobs_are_marked_exited(tmp_path, dead_pid):
+    """Test running jobs of a vanished worker are marked exited when read"""
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    registry = JobRegistry(tmp_path)
+    registry.register('yolo', process.pid, owner=dead_pid)
+    assert not pid_alive(process.pid)
+    assert registry.get('yolo')['status'] == 'exited'
+    assert registry.running('yolo') is None
+    assert registry.jobs('running') == []
+    assert [job['name'] for job in registry.jobs('exited')] == ['yolo']
+
+
+@pytest.mark.skipif(os.name == 'nt', reason="Liveness checks need POSIX signals")
+def test_live_owner_records_exit(tmp_path):
+    """Test jobs of a live worker stay running until that worker records the exit"""
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    registry = JobRegistry(tmp_path)
+    registry.register('yolo', process.pid)
+    assert registry.get('yolo')['status'] == 'running'
+
+
+def test_update_fields(tmp_path, sleeper):
+    """Test updates are merged into the stored record"""
+    registry = JobRegistry(tmp_path)
+    registry.register('yolo', sleeper.pid)
+    registry.update('yolo', stop_requested=True)
+    record = JobRegistry(tmp_path).get('yolo')
+    assert record['stop_requested'] and record['status'] == 'running'
+    assert registry.update('missing', status='stopped') is None
+
+
+def update_field(directory, field):
+    registry = JobRegistry(directory)
+    for i in range(1, 301):
+        registry.update('yolo', **{field: i})
+
+
+@pytest.mark.skipif(os.name == 'nt', reason="Locking across workers needs fcntl")
+def test_concurrent_updates_are_not_lost(tmp_path, sleeper):
+    """Test updates from separate workers to one record do not overwrite each other"""
+    JobRegistry(tmp_path).register('yolo', sleeper.pid, a=0, b=0)
+    workers = [multiprocessing.get_context('fork').Process(target=update_field, args=(tmp_path, field))
+               for field in 'ab']
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    record = JobRegistry(tmp_path).get('yolo')
+    assert (record['a'], record['b']) == (300, 300)
+
+
+def test_remove_only_own_record(tmp_path, sleeper):
+    """Test a finished job does not remove the record of its successor"""
+    registry = JobRegistry(tmp_path)
+    registry.register('yolo', sleeper.pid)
+    registry.remove('yolo', pid=sleeper.pid + 1)
+    assert registry.get('yolo') is not None
+    registry.remove('yolo', pid=sleeper.pid)
+    assert registry.get('yolo') is None
+
+
+def test_rejects_path_names(tmp_path):
+    """Test job names cannot escape the registry directory"""
+    with pytest.raises(ValueError):
+        JobRegistry(tmp_path).register('../yolo', 1)
+    with pytest.raises(ValueError):
+        JobRegistry(tmp_path).get('.hidden')
@@ -0,0 +1,132 @@
+import os
+import sys
+import time
+
+import pytest
+from src.job_registry import JobRegistry
+from src.jobs import JobLimitError, JobManager
+
+SLEEP = [sys.executable, '-c', 'import time; time.sleep(30)']
+
+pytestmark = pytest.mark.skipif(os.name == 'nt', reason="Jobs are stopped with POSIX signals")
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = JobManager(JobRegistry(tmp_path), max_jobs=2, threads_per_job=1, stop_timeout=5)
+    yield manager
+    manager.shutdown(timeout=1)
+
+
+def wait_for(manager, job_id, status, timeout=10):
+    deadline = time.monotonic() + timeout
+    while manager.get(job_id)['status'] != status:
+        assert time.monotonic() < deadline, manager.get(job_id)
+        time.sleep(0.05)
+    return manager.get(job_id)
+
+
+def test_jobs_get_unique_ids(manager):
+    """Test concurrent jobs are tracked separately"""
+    first = manager.start(SLEEP, kind='yolo')
+    second = manager.start(SLEEP)
+    assert first['name'] != second['name']
+    assert first['kind'] == 'yolo' and first['status'] == 'running'
+    assert {job['name'] for job in manager.running()} == {first['name'], second['name']}
+    assert first['slot'] != second['slot']
+
+
+def test_job_limit(manager, tmp_path):
+    """Test the cap holds across managers sharing a registry"""
+    manager.start(SLEEP)
+    manager.start(SLEEP)
+    with pytest.raises(JobLimitError):
+        manager.start(SLEEP)
+    with pytest.raises(JobLimitError):
+        JobManager(JobRegistry(tmp_path), max_jobs=2).start(SLEEP)
+
+
+def test_stop_reaps_job(manager):
+    """Test a stopped job is reaped and frees its slot"""
+    job = manager.start(SLEEP)
+    manager.start(SLEEP)
+    record = manager.stop(job['name'])
+    assert record['status'] == 'stopped'
+    assert record['returncode'] == -15
+    with pytest.raises(ChildProcessError):
+        os.waitpid(job['pid'], os.WNOHANG)
+    manager.start(SLEEP)
+
+
+def test_stop_kills_jobs_ignoring_sigterm(manager):
+    """Test a job that ignores SIGTERM is killed after the timeout"""
+    job = manager.start([sys.executable, '-c',
+                         'import signal, sys, time\n'
+                         'signal.signal(signal.SIGTERM, signal.SIG_IGN)\n'
+                         'print("ready", flush=True)\n'
+                         'time.sleep(30)'])
+    time.sleep(0.5)
+    record = manager.stop(job['name'], timeout=0.5)
+    assert record['status'] == 'stopped'
+    assert record['returncode'] == -9
+
+
+def test_stop_from_another_manager(manager, tmp_path):
+    """Test a job can be stopped through a manager that did not start it"""
+    job = manager.start(SLEEP)
+    record = JobManager(JobRegistry(tmp_path)).stop(job['name'])
+    assert record['status'] == 'stopped'
+    assert manager.stop('unknown') is None
+
+
+def test_exit_status(manager):
+    """Test finished jobs are recorded as completed or failed"""
+    completed = manager.start([sys.executable, '-c', 'pass'])
+    failed = manager.start([sys.executable, '-c', 'raise SystemExit(3)'])
+    assert wait_for(manager, completed['name'], 'completed')['returncode'] == 0
+    assert wait_for(manager, failed['name'], 'failed')['returncode'] == 3
+
+
+def test_thread_limits(manager):
+    """Test jobs run with their thread pools limited"""
+    job = manager.start([sys.executable, '-c', 'import os, sys; '
+                         'sys.exit(int(os.environ["OMP_NUM_THREADS"]))'])
+    assert wait_for(manager, job['name'], 'failed')['returncode'] == 1
+    assert job['threads'] == 1
+
+
+def test_output_is_streamed(manager):
+    """Test job output and results are available while and after the job runs"""
+    job = manager.start([sys.executable, '-c', 'import time\n'
+                         'for i in range(3):\n'
+                         '    print(f"0: 480x640 {i + 1} Fire, 30.0ms")\n'
+                         '    time.sleep(0.1)'])
+    output = manager.output(job['name'])
+    body = b''.join(output.events())
+    assert body.count(b'event: result') == 3
+    assert output.stats()['detections'] == {'Fire': 6}
+    assert b'"status": "completed"' in body
+
+
+def test_history_is_pruned(tmp_path):
+    """Test only the newest finished jobs are kept"""
+    manager = JobManager(JobRegistry(tmp_path), max_jobs=1, history=2)
+    finished = []
+    for _ in range(4):
+        job = manager.start([sys.executable, '-c', 'pass'])
+        finished.append(wait_for(manager, job['name'], 'completed')['name'])
+    running = manager.start(SLEEP)
+    try:
+        assert [job['name'] for job in manager.jobs()] == finished[-2:] + [running['name']]
+        assert manager.output(finished[0]) is None
+        assert manager.output(finished[-1]) is not None
+    finally:
+        manager.shutdown(timeout=1)
+
+
+def test_shutdown_stops_own_jobs(manager):
+    """Test shutting down stops every job the manager started"""
+    jobs = [manager.start(SLEEP), manager.start(SLEEP)]
+    manager.shutdown(timeout=5)
+    assert [manager.get(job['name'])['status'] for job in jobs] == ['stopped', 'stopped']
+    assert manager.running() == []
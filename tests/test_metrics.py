@@ -0,0 +1,122 @@
+import multiprocessing
+import os
+import urllib.request
+
+import pytest
+from src.metrics import MetricsRegistry, SharedMetrics, start_http_server
+
+
+def test_counter_renders_total_per_label():
+    """Test counters accumulate per label set and render with a _total suffix"""
+    registry = MetricsRegistry()
+    detections = registry.counter('detections', 'Detections by class', ('class_name',))
+    detections.inc(class_name='Fire')
+    detections.inc(2, class_name='Smoke')
+    detections.inc(class_name='Fire')
+
+    text = registry.render()
+    assert '# TYPE detections counter' in text
+    assert 'detections_total{class_name="Fire"} 2' in text
+    assert 'detections_total{class_name="Smoke"} 2' in text
+
+
+def test_unlabelled_counter_starts_at_zero():
+    """Test scrapes see a zero before the first increment"""
+    registry = MetricsRegistry()
+    registry.counter('dropped', 'Dropped frames')
+    assert 'dropped_total 0' in registry.render()
+
+
+def test_histogram_buckets_are_cumulative():
+    """Test bucket counts, sum and count in the exposition format"""
+    registry = MetricsRegistry()
+    latency = registry.histogram('latency', 'Stage latency', ('stage',), buckets=(0.01, 0.1))
+    for value in (0.005, 0.05, 0.5):
+        latency.observe(value, stage='inference')
+
+    text = registry.render()
+    assert 'latency_bucket{stage="inference",le="0.01"} 1' in text
+    assert 'latency_bucket{stage="inference",le="0.1"} 2' in text
+    assert 'latency_bucket{stage="inference",le="+Inf"} 3' in text
+    assert 'latency_sum{stage="inference"} 0.555' in text
+    assert 'latency_count{stage="inference"} 3' in text
+
+
+def test_histogram_timer_and_label_validation():
+    """Test the timer context manager observes once and labels are checked"""
+    registry = MetricsRegistry()
+    latency = registry.histogram('latency', 'Stage latency', ('stage',))
+    with latency.time(stage='resize'):
+        pass
+    assert latency.count(stage='resize') == 1
+
+    with pytest.raises(ValueError):
+        latency.observe(0.1, camera='front')
+
+
+def test_registry_reuses_metrics_by_name():
+    """Test registering the same name twice returns the existing metric"""
+    registry = MetricsRegistry()
+    assert registry.gauge('depth', 'Queue depth') is registry.gauge('depth', 'Queue depth')
+    with pytest.raises(ValueError):
+        registry.counter('depth', 'Queue depth')
+
+
+def test_http_server_serves_metrics():
+    """Test the standalone scrape endpoint"""
+    registry = MetricsRegistry()
+    registry.counter('frames', 'Frames').inc(3)
+    server = start_http_server(0, host='127.0.0.1', registry=registry)
+    try:
+        port = server.server_address[1]
+        body = urllib.request.urlopen(f'http://127.0.0.1:{port}/metrics').read().decode()
+    finally:
+        server.shutdown()
+    assert 'frames_total 3' in body
+
+
+def make_registry():
+    registry = MetricsRegistry()
+    registry.counter('frames', 'Frames')
+    registry.histogram('latency', 'Stage latency', ('stage',), buckets=(0.01, 0.1))
+    registry.gauge('queue_depth', 'Queue depth')
+    return registry
+
+
+def exited_worker(directory):
+    """Record like a gunicorn worker, write a snapshot and exit"""
+    registry = make_registry()
+    registry.counter('frames', 'Frames').inc(3)
+    registry.histogram('latency', 'Stage latency', ('stage',), buckets=(0.01, 0.1)).observe(0.5, stage='inference')
+    registry.gauge('queue_depth', 'Queue depth').set(7)
+    SharedMetrics(directory, registry).write()
+
+
+@pytest.mark.skipif(os.name == 'nt', reason="Worker processes are forked")
+def test_shared_metrics_merge_workers(tmp_path):
+    """Test a scrape of any worker reports the totals of all workers"""
+    worker = multiprocessing.get_context('fork').Process(target=exited_worker, args=(tmp_path,))
+    worker.start()
+    worker.join()
+
+    registry = make_registry()
+    registry.counter('frames', 'Frames').inc(2)
+    registry.histogram('latency', 'Stage latency', ('stage',), buckets=(0.01, 0.1)).observe(0.005, stage='inference')
+    registry.gauge('queue_depth', 'Queue depth').set(1)
+    text = SharedMetrics(tmp_path, registry).render()
+
+    # Counters of exited workers are kept so totals never go backwards
+    assert 'frames_total 5' in text
+    assert 'latency_bucket{stage="inference",le="0.01"} 1' in text
+    assert 'latency_count{stage="inference"} 2' in text
+    # Gauges only of live workers, one series each
+    assert f'queue_depth{{worker="{os.getpid()}"}} 1' in text
+    assert 'queue_depth{worker="%d"}' % worker.pid not in text
+
+
+def test_reset_forgets_values():
+    """Test values inherited over fork() can be dropped"""
+    registry = make_registry()
+    registry.counter('frames', 'Frames').inc(4)
+    registry.reset()
+    assert 'frames_total 0' in registry.render()
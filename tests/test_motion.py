@@ -0,0 +1,41 @@
+import numpy as np
+from src.motion import MotionGate
+
+
+def static_frame():
+    return np.full((240, 320, 3), 80, dtype=np.uint8)
+
+
+def test_static_scene_infers_every_nth_frame():
+    """Test idle scenes only run inference on every Nth frame"""
+    gate = MotionGate(infer_every=5)
+    decisions = [gate.should_infer(static_frame()) for _ in range(20)]
+    assert decisions.count(True) == 4
+    assert decisions[0] is True
+    assert gate.frames_seen == 20
+
+
+def test_motion_triggers_immediate_inference():
+    """Test a scene change runs inference straight away"""
+    gate = MotionGate(infer_every=100)
+    assert gate.should_infer(static_frame())
+    assert not gate.should_infer(static_frame())
+
+    changed = static_frame()
+    changed[50:200, 50:250] = 255
+    assert gate.should_infer(changed)
+    assert gate.motion_triggers == 2
+
+
+def test_wrap_reuses_last_result():
+    """Test the wrapped function only calls the detector when needed"""
+    calls = []
+    gated = MotionGate(infer_every=3).wrap(lambda frame: calls.append(1) or len(calls))
+    results = [gated(static_frame()) for _ in range(6)]
+    assert results == [1, 1, 1, 2, 2, 2]
+
+
+def test_infer_every_one_disables_gating():
+    """Test infer_every=1 runs inference on every frame"""
+    gate = MotionGate(infer_every=1)
+    assert all(gate.should_infer(static_frame()) for _ in range(10))
@@ -0,0 +1,55 @@
+import cv2
+import numpy as np
+import pytest
+from src.multi_stream import MultiStreamMonitor
+
+
+@pytest.fixture
+def video_files(tmp_path):
+    """Write three short MJPG videos with different frame counts"""
+    paths = []
+    for index, count in enumerate((5, 10, 15)):
+        path = tmp_path / f'cam{index}.avi'
+        writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'MJPG'),
+                                 10, (64, 48))
+        for _ in range(count):
+            writer.write(np.full((48, 64, 3), index * 50, dtype=np.uint8))
+        writer.release()
+        paths.append(path)
+    return paths
+
+
+def test_monitor_processes_every_stream(video_files):
+    """Test all frames of all files are batched through one shared function"""
+    batch_sizes = []
+
+    def batch_fn(frames):
+        batch_sizes.append(len(frames))
+        return [int(frame.mean()) for frame in frames]
+
+    monitor = MultiStreamMonitor(video_files, batch_fn, max_batch_size=2).start()
+    try:
+        seen = {}
+        for reader, frame, result in monitor:
+            seen[reader.name] = seen.get(reader.name, 0) + 1
+    finally:
+        monitor.stop()
+
+    assert seen == {'stream0': 5, 'stream1': 10, 'stream2': 15}
+    assert max(batch_sizes) <= 2
+
+
+
+def test_unreachable_source_is_skipped(video_files, tmp_path):
+    """Test a source that fails to open does not stop the others"""
+    sources = [video_files[0], tmp_path / 'missing.avi', video_files[1]]
+    monitor = MultiStreamMonitor(sources, lambda frames: [None] * len(frames)).start()
+    try:
+        names = {reader.name for reader, _, _ in monitor}
+    finally:
+        monitor.stop()
+    assert [reader.name for reader in monitor.readers] == ['stream0', 'stream2']
+    assert names == {'stream0', 'stream2'}
+
+    with pytest.raises(IOError):
+        MultiStreamMonitor([tmp_path / 'missing.avi'], lambda frames: frames)
@@ -1,6 +1,12 @@
+import threading
+import time
+from types import SimpleNamespace
+
 import pytest
 import cv2
+import numpy as np
 from src.notification_service import NotificationService
+from src.notification_sinks import WhatsAppSink
 from pathlib import Path
 from src.config import Config
 
@@ -33,6 +39,12 @@ def test_save_frame(notification_service, sample_frame):
     path.unlink()  # Cleanup
 
 
+requires_messaging = pytest.mark.skipif(
+    not WhatsAppSink(Config, session=None).configured,
+    reason="Twilio/Imgur credentials are not configured")
+
+
+@requires_messaging
 def test_imgur_upload(notification_service, sample_frame):
     """Test Imgur upload functionality"""
     path = notification_service.save_frame(sample_frame)
@@ -41,7 +53,95 @@ def test_imgur_upload(notification_service, sample_frame):
     path.unlink()  # Cleanup
 
 
+@requires_messaging
 def test_whatsapp_alert(notification_service, sample_frame):
     """Test WhatsApp alert sending"""
     result = notification_service.send_alert(sample_frame, '---TESTS---')
     assert result is True
+
+
+class FakeResponse:
+    def __init__(self, status=200, payload=None):
+        self.status_code = status
+        self._payload = payload or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def json(self):
+        return self._payload
+
+
+@pytest.fixture
+def offline_service(tmp_path):
+    """Service with fake credentials and no real network access"""
+    config = SimpleNamespace(
+        DETECTED_FIRES_DIR=tmp_path,
+        TWILIO_ACCOUNT_SID='AC123', TWILIO_AUTH_TOKEN='token',
+        TWILIO_WHATSAPP_NUMBER='+10000000000', RECEIVER_WHATSAPP_NUMBER='+10000000001',
+        IMGUR_CLIENT_ID='client',
+        ALERT_WORKERS=2, ALERT_QUEUE_SIZE=2, ALERT_RETRIES=2,
+        ALERT_RETRY_BACKOFF=0.01, ALERT_TIMEOUT=1,
+    )
+    service = NotificationService(config)
+    yield service
+    service.cleanup(timeout=5)
+
+
+def test_alert_retries_until_delivered(offline_service):
+    """Test a failed message is retried and the alert counted as sent"""
+    calls = []
+
+    def post(url, **kwargs):
+        calls.append(url)
+        if 'imgur' in url:
+            return FakeResponse(payload={'data': {'link': 'https://i.imgur.com/x.jpg'}})
+        # First message attempt fails, the retry succeeds
+        return FakeResponse(500 if len(calls) == 2 else 201)
+
+    offline_service.session.post = post
+    frame = np.zeros((32, 32, 3), dtype=np.uint8)
+    assert offline_service.send_alert(frame, 'Fire', timeout=5) is True
+    assert sum('twilio' in url for url in calls) == 2
+    assert offline_service.stats()['sent'] == 1
+    assert len(list(offline_service.output_dir.glob('fire_detected_*.jpg'))) == 1
+
+
+def test_submit_never_blocks_on_slow_network(offline_service):
+    """Test alerts beyond the queue size are dropped instead of blocking"""
+    release = threading.Event()
+
+    def slow_post(url, **kwargs):
+        release.wait(5)
+        return FakeResponse(payload={'data': {'link': 'https://i.imgur.com/x.jpg'}})
+
+    offline_service.session.post = slow_post
+    frame = np.zeros((32, 32, 3), dtype=np.uint8)
+
+    start = time.perf_counter()
+    accepted = [offline_service.submit_alert(frame, 'Smoke') for _ in range(5)]
+    assert time.perf_counter() - start < 0.5
+    assert accepted == [True, True, False, False, False]
+
+    release.set()
+    offline_service.cleanup(timeout=5)
+    stats = offline_service.stats()
+    assert stats['sent'] == 2
+    assert stats['dropped'] == 3
+    assert stats['pending'] == 0
+
+
+def test_alerts_saved_locally_without_credentials(tmp_path):
+    """Test alerts are only written to disk when messaging is not configured"""
+    config = SimpleNamespace(
+        DETECTED_FIRES_DIR=tmp_path, ALERT_WORKERS=1, ALERT_QUEUE_SIZE=4,
+        ALERT_RETRIES=0, ALERT_RETRY_BACKOFF=0, ALERT_TIMEOUT=1,
+    )
+    service = NotificationService(config)
+    try:
+        assert not service.messaging_enabled
+        assert service.submit_alert(np.zeros((8, 8, 3), dtype=np.uint8), 'Fire', prefix='alert')
+    finally:
+        service.cleanup(timeout=5)
+    assert len(list(tmp_path.glob('alert_*.jpg'))) == 1
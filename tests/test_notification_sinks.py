@@ -0,0 +1,118 @@
+import json
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from src.notification_service import NotificationService
+from src.notification_sinks import (Alert, FileSink, MemorySink, WebhookSink,
+                                    make_session, sinks_from_config)
+from tests.mock_receiver import MockReceiver
+
+
+def make_config(tmp_path, **overrides):
+    config = dict(
+        DETECTED_FIRES_DIR=tmp_path, ALERT_WEBHOOKS=[], ALERT_LOG_FILE='',
+        ALERT_WORKERS=4, ALERT_QUEUE_SIZE=16, ALERT_RETRIES=2,
+        ALERT_RETRY_BACKOFF=0.01, ALERT_TIMEOUT=2,
+    )
+    config.update(overrides)
+    return SimpleNamespace(**config)
+
+
+@pytest.fixture
+def frame():
+    return np.zeros((48, 64, 3), dtype=np.uint8)
+
+
+def test_sinks_from_config(tmp_path):
+    """Test webhooks and the log file are built from configuration"""
+    config = make_config(tmp_path, ALERT_WEBHOOKS=['http://a', 'http://b'],
+                         ALERT_LOG_FILE=str(tmp_path / 'alerts.jsonl'))
+    sinks = sinks_from_config(config, make_session(), timeout=1)
+    try:
+        assert [type(sink) for sink in sinks] == [WebhookSink, WebhookSink, FileSink]
+    finally:
+        for sink in sinks:
+            sink.close()
+
+
+def test_fan_out_to_memory_and_file_sinks(tmp_path, frame):
+    """Test every alert reaches every sink"""
+    memory = MemorySink()
+    log = FileSink(tmp_path / 'alerts.jsonl')
+    service = NotificationService(make_config(tmp_path), sinks=[memory, log])
+    try:
+        for detection in ('Fire', 'Smoke', 'Fire'):
+            assert service.submit_alert(frame, detection, prefix='cam0')
+    finally:
+        service.cleanup(timeout=5)
+
+    assert sorted(alert.detection for alert in memory.alerts) == ['Fire', 'Fire', 'Smoke']
+    records = [json.loads(line) for line in (tmp_path / 'alerts.jsonl').read_text().splitlines()]
+    assert len(records) == 3
+    assert all(record['source'] == 'cam0' for record in records)
+    assert len({alert.image_path for alert in memory.alerts}) == 3
+
+
+def test_webhooks_fan_out_with_retries(tmp_path, frame):
+    """Test webhook subscribers all receive alerts despite flaky responses"""
+    with MockReceiver(failure_rate=0.2) as receiver:
+        urls = [f'{receiver.url}/subscriber/{i}' for i in range(5)]
+        config = make_config(tmp_path, ALERT_WEBHOOKS=urls, ALERT_RETRIES=10)
+        service = NotificationService(config)
+        try:
+            for _ in range(4):
+                service.submit_alert(frame, 'Fire')
+        finally:
+            service.cleanup(timeout=10)
+        records = receiver.received()
+
+    assert len(records) == 20
+    assert {record['path'] for record in records} == {f'/subscriber/{i}' for i in range(5)}
+    assert records[0]['payload']['detection'] == 'Fire'
+    assert service.stats()['sent'] == 4
+
+
+def test_failed_sink_marks_alert_failed(tmp_path, frame):
+    """Test an alert counts as failed when a sink keeps failing"""
+    class BrokenSink(MemorySink):
+        def send(self, alert: Alert) -> bool:
+            raise ConnectionError("down")
+
+    memory = MemorySink()
+    broken = BrokenSink()
+    broken.name = 'broken'
+    service = NotificationService(make_config(tmp_path, ALERT_RETRIES=1),
+                                  sinks=[memory, broken])
+    try:
+        assert service.send_alert(frame, 'Fire', timeout=5) is False
+    finally:
+        service.cleanup(timeout=5)
+
+    stats = service.stats()
+    assert stats['failed'] == 1
+    assert stats['sinks']['broken'] == {'sent': 0, 'failed': 1}
+    assert len(memory.alerts) == 1
+
+
+def test_send_alert_timeout(tmp_path, frame):
+    """Test a slow delivery returns False after the timeout and completes in the background"""
+    release = threading.Event()
+
+    class SlowSink(MemorySink):
+        def send(self, alert: Alert) -> bool:
+            release.wait(5)
+            return super().send(alert)
+
+    slow = SlowSink()
+    service = NotificationService(make_config(tmp_path), sinks=[slow])
+    try:
+        assert service.send_alert(frame, 'Fire', timeout=0.1) is False
+        assert service.stats()['pending'] == 1
+        release.set()
+    finally:
+        service.cleanup(timeout=5)
+
+    assert len(slow.alerts) == 1
+    assert service.stats()['sent'] == 1
@@ -0,0 +1,91 @@
+import time
+import numpy as np
+import pytest
+from src.pipeline import FramePipeline
+
+
+class FakeCapture:
+    """Minimal stand-in for cv2.VideoCapture yielding numbered frames"""
+
+    def __init__(self, count, delay=0.0):
+        self.count = count
+        self.delay = delay
+        self.index = 0
+
+    def read(self):
+        if self.index >= self.count:
+            return False, None
+        time.sleep(self.delay)
+        frame = np.full((4, 4, 3), self.index, dtype=np.uint8)
+        self.index += 1
+        return True, frame
+
+
+def test_block_policy_keeps_every_frame():
+    """Test the block policy delivers all frames in order"""
+    pipeline = FramePipeline(FakeCapture(20), lambda f: int(f[0, 0, 0]),
+                             queue_size=2, drop_policy='block').start()
+    try:
+        results = [result for _, result in pipeline]
+    finally:
+        pipeline.stop()
+
+    assert results == list(range(20))
+    assert pipeline.frames_dropped == 0
+
+
+def test_oldest_policy_drops_stale_frames():
+    """Test a slow consumer makes the pipeline drop frames instead of lagging"""
+    pipeline = FramePipeline(FakeCapture(50), lambda f: int(f[0, 0, 0]),
+                             queue_size=1, drop_policy='oldest').start()
+    try:
+        results = []
+        for _, result in pipeline:
+            results.append(result)
+            time.sleep(0.01)
+    finally:
+        pipeline.stop()
+
+    assert results == sorted(results)
+    assert results[-1] == 49
+    assert pipeline.frames_dropped > 0
+    assert pipeline.frames_read == 50
+
+
+def test_results_are_never_dropped():
+    """Test frames are dropped before inference but every inferred result is delivered"""
+    pipeline = FramePipeline(FakeCapture(50), lambda f: int(f[0, 0, 0]),
+                             queue_size=1, drop_policy='oldest').start()
+    try:
+        results = []
+        for _, result in pipeline:
+            results.append(result)
+            time.sleep(0.01)
+    finally:
+        pipeline.stop()
+
+    assert pipeline.frames_dropped > 0
+    assert len(results) == pipeline.frames_processed
+    assert pipeline.frames_processed + pipeline.frames_dropped == pipeline.frames_read
+
+
+def test_processing_errors_skip_frame():
+    """Test a failing frame does not stop the pipeline"""
+    def flaky(frame):
+        if frame[0, 0, 0] == 3:
+            raise RuntimeError("bad frame")
+        return int(frame[0, 0, 0])
+
+    pipeline = FramePipeline(FakeCapture(6), flaky, drop_policy='block').start()
+    try:
+        results = [result for _, result in pipeline]
+    finally:
+        pipeline.stop()
+
+    assert results == [0, 1, 2, 4, 5]
+
+
+def test_unknown_drop_policy():
+    """Test invalid drop policies are rejected"""
+    with pytest.raises(ValueError):
+        FramePipeline(FakeCapture(1), lambda f: f, drop_policy='latest')
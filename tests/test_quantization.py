@@ -0,0 +1,100 @@
+import cv2
+import numpy as np
+import pytest
+from src.quantization import (compare, compute_metrics, evaluate, load_labels,
+                              match_predictions, quantize_model)
+
+NAMES = {0: 'Fire', 1: 'Smoke'}
+OPERATING_CONF = {'fire': 0.5, 'smoke': 0.75}
+
+
+def test_load_labels_to_pixels(tmp_path):
+    """Test YOLO labels are converted to pixel xyxy boxes"""
+    label = tmp_path / 'a.txt'
+    label.write_text("1 0.5 0.5 0.25 0.5\n\n")
+    boxes, class_ids = load_labels(label, width=200, height=100)
+    np.testing.assert_allclose(boxes, [[75, 25, 125, 75]])
+    assert class_ids.tolist() == [1]
+    assert load_labels(tmp_path / 'missing.txt', 200, 100)[0].shape == (0, 4)
+
+
+def test_match_predictions_uses_each_ground_truth_once():
+    """Test duplicate predictions of one object count as one true positive"""
+    gt = np.array([[0, 0, 10, 10]], dtype=np.float32)
+    preds = np.array([[0, 0, 10, 10], [0, 0, 10, 9], [0, 0, 10, 10]], dtype=np.float32)
+    correct = match_predictions(preds, np.array([0, 0, 1]), gt, np.array([0]))
+    assert correct[:, 0].tolist() == [True, False, False]
+    assert correct[0].all()
+
+
+def test_metrics_perfect_and_missed_detections():
+    """Test mAP and operating-point recall on hand-built matches"""
+    gt_classes = np.array([0, 0, 1])
+    # Fire: one hit, one miss. Smoke: hit, but below the smoke alert threshold
+    correct = np.array([[True] * 10, [True] * 10])
+    metrics = compute_metrics(correct, np.array([0.9, 0.6]), np.array([0, 1]),
+                              gt_classes, NAMES, OPERATING_CONF)
+
+    assert metrics['classes']['Fire']['ap50'] == pytest.approx(0.5, abs=0.01)
+    assert metrics['classes']['Fire']['recall'] == 0.5
+    assert metrics['classes']['Smoke']['ap50'] == pytest.approx(1.0)
+    assert metrics['classes']['Smoke']['recall'] == 0.0
+    assert metrics['map50'] == pytest.approx(0.75, abs=0.01)
+
+    deltas = compare(metrics, {**metrics, 'map50': metrics['map50'] - 0.1})
+    assert deltas['map50'] == pytest.approx(-0.1)
+    assert deltas['fire_recall'] == 0.0
+
+
+def test_quantize_and_evaluate_end_to_end(tmp_path):
+    """Test a tiny conv model quantizes to INT8 and evaluates like FP32"""
+    onnx = pytest.importorskip("onnx")
+    pytest.importorskip("onnxruntime.quantization")
+    from onnx import TensorProto, helper
+
+    from src.backends import load_backend
+
+    # Constant prediction of one fire box centred in the image; the conv gives
+    # the quantizer a weight to work on
+    raw = np.zeros((1, 6, 4), dtype=np.float32)
+    raw[0, :, 0] = [320, 320, 64, 64, 0.95, 0.01]
+    weight = np.random.default_rng(0).normal(size=(4, 3, 3, 3)).astype(np.float32)
+    graph = helper.make_graph(
+        [
+            helper.make_node('Conv', ['images', 'weight'], ['features'], strides=[32, 32]),
+            helper.make_node('ReduceMean', ['features'], ['mean'], axes=[1, 2, 3], keepdims=1),
+            helper.make_node('Reshape', ['mean', 'shape'], ['flat']),
+            helper.make_node('Mul', ['flat', 'zero'], ['scaled']),
+            helper.make_node('Add', ['scaled', 'raw'], ['output0']),
+        ],
+        'fake_yolo',
+        [helper.make_tensor_value_info('images', TensorProto.FLOAT, [1, 3, 640, 640])],
+        [helper.make_tensor_value_info('output0', TensorProto.FLOAT, [1, 6, 4])],
+        [helper.make_tensor('weight', TensorProto.FLOAT, weight.shape, weight.flatten()),
+         helper.make_tensor('shape', TensorProto.INT64, [3], [-1, 1, 1]),
+         helper.make_tensor('zero', TensorProto.FLOAT, [], [0.0]),
+         helper.make_tensor('raw', TensorProto.FLOAT, raw.shape, raw.flatten())],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid('', 13)])
+    model.ir_version = 8
+    helper.set_model_props(model, {'names': "{0: 'Fire', 1: 'Smoke'}"})
+    fp32_path = tmp_path / 'fake.onnx'
+    onnx.save(model, str(fp32_path))
+
+    split = tmp_path / 'valid'
+    (split / 'images').mkdir(parents=True)
+    (split / 'labels').mkdir()
+    for index in range(3):
+        frame = np.random.default_rng(index).integers(0, 255, (640, 640, 3), dtype=np.uint8)
+        cv2.imwrite(str(split / 'images' / f'{index}.png'), frame)
+        (split / 'labels' / f'{index}.txt').write_text("0 0.5 0.5 0.1 0.1\n")
+
+    int8_path = quantize_model(fp32_path, tmp_path / 'fake_int8.onnx', split)
+    int8 = load_backend(int8_path)
+    assert int8.names == NAMES
+
+    fp32_metrics = evaluate(load_backend(fp32_path), split, OPERATING_CONF)
+    int8_metrics = evaluate(int8, split, OPERATING_CONF)
+    assert fp32_metrics['images'] == 3
+    assert fp32_metrics['classes']['Fire']['recall'] == 1.0
+    assert compare(fp32_metrics, int8_metrics)['fire_recall'] == 0.0
@@ -0,0 +1,118 @@
+import threading
+
+import cv2
+import numpy as np
+import pytest
+from src.streaming import BOUNDARY, DetectionStream, FrameBroadcaster, StreamViewer
+
+
+@pytest.fixture
+def video_file(tmp_path):
+    """Write a short MJPG video"""
+    path = tmp_path / 'cam.avi'
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'MJPG'), 10, (64, 48))
+    for index in range(20):
+        writer.write(np.full((48, 64, 3), index * 10, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def frame(value=0):
+    return np.full((48, 64, 3), value, dtype=np.uint8)
+
+
+def parse_part(chunk):
+    header, jpeg = chunk.split(b'\r\n\r\n', 1)
+    assert header.startswith(f'--{BOUNDARY}\r\nContent-Type: image/jpeg'.encode())
+    jpeg = jpeg[:-2]
+    assert int(header.split(b'Content-Length: ')[1]) == len(jpeg)
+    return cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+def test_viewer_quality_adapts():
+    """Test quality drops when frames are skipped and recovers when keeping up"""
+    viewer = StreamViewer((80, 60, 40), recover_after=3)
+    viewer.update(2)
+    viewer.update(1)
+    viewer.update(5)
+    assert viewer.quality == 40
+    for _ in range(3):
+        viewer.update(0)
+    assert viewer.quality == 60
+    assert viewer.frames_skipped == 8
+
+
+def test_frame_encoded_once_for_all_viewers():
+    """Test viewers at one quality share a single encode per frame"""
+    broadcaster = FrameBroadcaster(qualities=(80, 40))
+    streams = [broadcaster.mjpeg(broadcaster.join()) for _ in range(5)]
+    broadcaster.publish(frame(100))
+
+    parts = [next(stream) for stream in streams]
+    assert broadcaster.frames_encoded == 1
+    assert len(set(parts)) == 1
+    decoded = parse_part(parts[0])
+    assert decoded.shape == (48, 64, 3)
+    assert abs(int(decoded.mean()) - 100) <= 2
+
+    for stream in streams:
+        stream.close()
+    assert broadcaster.stats()['viewers'] == 0
+
+
+def test_slow_viewer_skips_to_newest_frame():
+    """Test a viewer that falls behind gets the newest frame at lower quality"""
+    broadcaster = FrameBroadcaster(qualities=(80, 40))
+    viewer = broadcaster.join()
+    stream = broadcaster.mjpeg(viewer)
+    broadcaster.publish(frame(0))
+    next(stream)
+
+    for value in (50, 100, 150):
+        broadcaster.publish(frame(value))
+    decoded = parse_part(next(stream))
+    assert abs(int(decoded.mean()) - 150) <= 2
+    assert viewer.frames_skipped == 2
+    assert viewer.quality == 40
+    stream.close()
+
+
+def test_close_ends_streams():
+    """Test closing the broadcaster ends waiting viewers"""
+    broadcaster = FrameBroadcaster()
+    stream = broadcaster.mjpeg(broadcaster.join())
+    threading.Timer(0.1, broadcaster.close).start()
+    assert list(stream) == []
+    assert broadcaster.viewers == 0
+
+
+def test_detection_stream_runs_while_watched(video_file):
+    """Test a source is detected, annotated and served, then released"""
+    detected = []
+
+    def detect(image):
+        detected.append(image)
+        return int(image.mean())
+
+    def annotate(image, result):
+        return cv2.resize(image, (32, 24))
+
+    stream = DetectionStream(str(video_file), detect, annotate, idle_timeout=0.1)
+    body = stream.open()
+    thread = stream._thread
+    decoded = parse_part(next(body))
+    assert decoded.shape == (24, 32, 3)
+
+    body.close()
+    thread.join(5)
+    assert not stream.running
+    assert detected
+    stream.stop()
+
+
+def test_detection_stream_rejects_missing_source(tmp_path):
+    """Test an unopenable source raises before any viewer joins"""
+    stream = DetectionStream(str(tmp_path / 'missing.avi'), lambda f: None, lambda f, r: f)
+    with pytest.raises(IOError):
+        stream.open()
+    assert stream.broadcaster.viewers == 0
@@ -0,0 +1,80 @@
+import numpy as np
+from typing import NamedTuple, Optional
+from src.tracker import DetectionTracker, box_iou
+
+
+class Result(NamedTuple):
+    boxes: np.ndarray
+    class_ids: np.ndarray
+    confidences: np.ndarray
+    detection: Optional[str]
+
+
+def classify(class_ids, confidences):
+    return "Fire" if len(class_ids) and class_ids[0] == 0 else None
+
+
+def fire_at(x, confidence=0.9):
+    return Result(np.array([[x, 100, x + 50, 150]], dtype=np.float32),
+                  np.array([0]), np.array([confidence], dtype=np.float32), "Fire")
+
+
+def empty():
+    return Result(np.empty((0, 4), dtype=np.float32), np.empty(0, dtype=int),
+                  np.empty(0, dtype=np.float32), None)
+
+
+def test_box_iou():
+    """Test pairwise IoU values"""
+    a = np.array([[0, 0, 10, 10]], dtype=np.float32)
+    b = np.array([[0, 0, 10, 10], [5, 0, 15, 10], [20, 20, 30, 30]], dtype=np.float32)
+    np.testing.assert_allclose(box_iou(a, b), [[1.0, 1 / 3, 0.0]], rtol=1e-5)
+
+
+def test_confirmation_after_k_of_n():
+    """Test a detection is only reported after K matched detector runs"""
+    tracker = DetectionTracker(classify, confirm_hits=3, window=5)
+    assert tracker.update(fire_at(100)).detection is None
+    assert tracker.update(fire_at(102)).detection is None
+    confirmed = tracker.update(fire_at(104))
+    assert confirmed.detection == "Fire"
+    assert len(confirmed.boxes) == 1
+    assert len(tracker.tracks) == 1
+
+
+def test_single_frame_false_positive_is_suppressed():
+    """Test one-off detections never get confirmed"""
+    tracker = DetectionTracker(classify, confirm_hits=2, window=5)
+    assert tracker.update(fire_at(100)).detection is None
+    for _ in range(4):
+        assert tracker.update(empty()).detection is None
+
+
+def test_predict_interpolates_motion():
+    """Test predicted boxes follow the estimated velocity between detector runs"""
+    tracker = DetectionTracker(classify, confirm_hits=1, window=3, smoothing=1.0)
+    tracker.update(fire_at(100))
+    tracker.update(fire_at(110))
+    predicted = tracker.predict()
+    assert predicted.boxes[0, 0] == 120
+    assert predicted.detection == "Fire"
+
+
+def test_stale_tracks_are_dropped():
+    """Test tracks disappear after too many misses"""
+    tracker = DetectionTracker(classify, confirm_hits=1, max_misses=2)
+    tracker.update(fire_at(100))
+    for _ in range(3):
+        tracker.update(empty())
+    assert tracker.tracks == []
+
+
+def test_wrap_skips_detector_between_runs():
+    """Test the wrapped detector only runs when should_infer allows it"""
+    calls = []
+    tracker = DetectionTracker(classify, confirm_hits=1)
+    tracked = tracker.wrap(lambda frame: calls.append(frame) or fire_at(100),
+                           should_infer=lambda frame: frame % 3 == 0)
+    results = [tracked(i) for i in range(6)]
+    assert calls == [0, 3]
+    assert all(result.detection == "Fire" for result in results)
@@ -0,0 +1,10 @@
+"""
+WSGI entry point for production serving:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+The concurrency model and worker hooks are described in gunicorn.conf.py.
+"""
+from app import app
+
+__all__ = ['app']